@@ -1,12 +1,119 @@
-from flask import Flask, send_from_directory, jsonify, request
+from flask import Flask, abort, g, send_from_directory, jsonify, request, stream_with_context
+import atexit
+import functools
+import json
 import os
-from game_engine import GameState
+import time
+import memory
+import metrics
+import phases
+import profiler
+from autosave import AutosaveWriter
+from game_engine import ACTION_TYPES, GameState
+from sessions import SessionStore
 
 app = Flask(__name__, static_url_path='', static_folder='static')
 
-# Global game state
-game_state = GameState()
-game_state.process_start_of_week() # Initialize first week
+MAX_FAST_FORWARD_WEEKS = 520
+MAX_BATCH_ACTIONS = 100
+MAX_PROFILE_ACTIONS = 50
+MAX_PROFILE_SECONDS = 60
+SERVER_ACTIONS = frozenset({'save_game', 'list_saves', 'load_game', 'restart_game'})  # handled here, not by the game
+SESSION_COOKIE = 'pm_session'
+SESSION_HEADER = 'X-Session-Token'  # for API clients without cookies
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Saves are written off the request thread; pending ones are finished on exit
+save_writer = AutosaveWriter()
+atexit.register(save_writer.close)
+# One game per player session. Set PM_SIM_AUTOSAVE=1 to journal every action of every session.
+sessions = SessionStore(
+    max_sessions=int(os.environ.get('PM_SIM_MAX_SESSIONS', 100)),
+    memory_budget=int(os.environ.get('PM_SIM_SESSION_MEMORY_MB', 256)) * 2**20,
+    idle_timeout=float(os.environ.get('PM_SIM_SESSION_IDLE_SECONDS', 30 * 60)),
+    writer=save_writer,
+    journaled=bool(os.environ.get('PM_SIM_AUTOSAVE')),
+)
+atexit.register(sessions.close)  # runs before save_writer.close
+# Time the phases of every weekly turn from the start (otherwise switch it on per session at /api/debug/phases)
+phases.ENABLED_BY_DEFAULT = bool(os.environ.get('PM_SIM_PHASE_TIMINGS'))
+request_metrics = metrics.RequestMetrics()
+trace_snapshots = memory.TraceSnapshots()
+
+def current_session():
+    """The requesting player's session, opened on first use within a request."""
+    if 'session' not in g:
+        g.session = sessions.open(request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE))
+    return g.session
+
+def local_only(view):
+    """Serve the route to clients on this machine only (diagnostics and admin endpoints)."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.remote_addr not in ('127.0.0.1', '::1'):
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.before_request
+def start_timer():
+    g.started = time.perf_counter()
+
+@app.after_request
+def record_metrics(response):
+    # Streams last as long as the client listens, so their latency means nothing
+    if not request.path.startswith('/api/') or request.endpoint in ('stream', 'metrics_endpoint') or 'started' not in g:
+        return response
+    action = ''
+    if request.endpoint == 'perform_action':
+        data = request.get_json(silent=True)
+        action = data.get('type') if isinstance(data, dict) else None
+        action = action if action in ACTION_TYPES or action in SERVER_ACTIONS else 'unknown'  # bounded label values
+    error = response.status_code >= 400 or g.get('failed', False)
+    route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    request_metrics.observe(route, action, time.perf_counter() - g.started,
+                            response.calculate_content_length() or 0, error)
+    return response
+
+@app.after_request
+def remember_session(response):
+    session = g.get('session')
+    if session is not None and request.cookies.get(SESSION_COOKIE) != session.token:
+        response.set_cookie(SESSION_COOKIE, session.token, httponly=True, samesite='Lax')
+    return response
+
+@app.teardown_request
+def release_session(exc):
+    session = g.pop('session', None)
+    if session is not None:
+        sessions.release(session)
+
+def client_patch(snapshot):
+    """Patch for a client that sent `?since=<version>&state_id=<id>`, or None if it needs the full state."""
+    since = request.args.get('since', type=int)
+    if since is None or request.args.get('state_id') != snapshot.state_id:
+        return None
+    return snapshot.patch_since(since)
+
+def state_response(**payload):
+    """JSON response with `payload`, the state version and either a `"patch"` or the full `"state"`.
+
+    Built from the session's latest published snapshot, so it never waits
+    for a turn in progress. Clients following `/api/stream` send `?stream=1`
+    and get neither: the change reaches them on the stream.
+    """
+    snapshot = current_session().snapshot
+    g.failed = payload.get("status") == "error"
+    payload["version"] = snapshot.version
+    payload["state_id"] = snapshot.state_id
+    if request.args.get('stream') == '1':
+        return jsonify(payload)
+    patch = client_patch(snapshot)
+    if patch is not None:
+        payload["patch"] = patch
+        return app.response_class(json.dumps(payload), mimetype="application/json")
+    body = json.dumps(payload)[:-1] + ', "state": ' + snapshot.to_json() + "}"
+    return app.response_class(body, mimetype="application/json")
 
 @app.route('/')
 def index():
@@ -14,84 +121,225 @@ def index():
 
 @app.route('/api/state', methods=['GET'])
 def get_state():
-    return jsonify(game_state.to_dict())
+    session = current_session()
+    # PnL history is a tiered summary unless ?pnl=full asks for every week
+    if request.args.get('pnl') == 'full':
+        with session.lock:
+            return jsonify(session.game.to_dict(full_history=True))
+    # Delta mode: a versioned envelope with a patch when the client's version is still known
+    if 'since' in request.args:
+        return state_response()
+    snapshot = session.snapshot
+    etag = f"{snapshot.state_id}.{snapshot.version}"
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(snapshot.to_json(), mimetype="application/json")
+    response.set_etag(etag)
+    return response
 
 @app.route('/api/action', methods=['POST'])
 def perform_action():
-    global game_state
+    session = current_session()
     data = request.json
     action_type = data.get('type')
-    
-    if action_type == 'hire_quant':
-        success, message = game_state.hire_quant(data['name'], data['skill'], data['salary'])
-        status = "ok" if success else "error"
-        return jsonify({"status": status, "message": message, "state": game_state.to_dict()})
-    elif action_type == 'start_research':
-        game_state.start_research(data['style'], data['duration'])
-    elif action_type == 'upgrade_infra':
-        game_state.upgrade_infra(data['infra_type'])
-    elif action_type == 'update_portfolio':
-        game_state.update_portfolio(data['positions'])
-    elif action_type == 'clear_event':
-        game_state.clear_event()
-    elif action_type == 'handle_infra_request':
-        effect = data.get('effect', {})
-        result = game_state.handle_infra_request(effect.get('type'), effect.get('infra'))
-        return jsonify({"status": "ok", "message": result, "state": game_state.to_dict()})
-    elif action_type == 'handle_reset_offer':
-        decision = data.get('decision')
-        message = game_state.handle_reset_offer(decision)
-        return jsonify({"status": "ok", "message": message, "state": game_state.to_dict()})
-    elif action_type == 'start_trivia_game':
-        game_data = game_state.start_market_trivia()
-        return jsonify({"status": "ok", "game_data": game_data})
-    elif action_type == 'submit_trivia_game':
-        result = game_state.submit_market_trivia(data.get('choice'))
-        return jsonify({"status": "ok", "result": result, "state": game_state.to_dict()})
-    elif action_type == 'start_mini_game':
-        game_data = game_state.generate_sharpe_challenge()
-        return jsonify({"status": "ok", "game_data": game_data})
-    elif action_type == 'submit_mini_game':
-        result = game_state.submit_sharpe_guess(data['guess'])
-        return jsonify({"status": "ok", "result": result, "state": game_state.to_dict()})
-    elif action_type == 'start_mm_game':
-        game_data = game_state.start_market_making()
-        return jsonify({"status": "ok", "game_data": game_data})
-    elif action_type == 'submit_mm_action':
-        result = game_state.submit_market_making(data['spread'])
-        return jsonify({"status": "ok", "result": result, "state": game_state.to_dict()})
-    elif action_type == 'save_game':
+
+    if action_type == 'save_game':
         save_name = data.get('name', 'savegame')
-        game_state.save(save_name)
-        return jsonify({"status": "ok", "message": f"Saved '{save_name}'", "state": game_state.to_dict()})
+        save_format = data.get('format', 'binary')
+        if save_format not in ('binary', 'json'):
+            return state_response(status="error", message=f"Unknown save format '{save_format}'")
+        notify = lambda: session.post("saved", {"name": save_name, "format": save_format})  # noqa: E731
+        with session.lock:
+            save_writer.submit(session.game, save_name, format=save_format, on_written=notify,
+                               directory=sessions.slot_directory(session.token))
+        return state_response(status="ok", message=f"Saved '{save_name}'")
     elif action_type == 'list_saves':
-        saves = GameState.list_saves()
-        return jsonify({"status": "ok", "saves": saves})
+        save_writer.flush()
+        try:
+            total, slots = GameState.save_slots(
+                sort=data.get('sort', 'name'),
+                descending=bool(data.get('descending', False)),
+                offset=max(int(data.get('offset', 0)), 0),
+                limit=None if data.get('limit') is None else max(int(data['limit']), 0),
+                directory=sessions.slot_directory(session.token),
+            )
+        except ValueError as exc:
+            g.failed = True
+            return jsonify({"status": "error", "message": str(exc)})
+        return jsonify({"status": "ok", "saves": [slot["name"] for slot in slots], "slots": slots, "total": total})
     elif action_type == 'load_game':
         save_name = data.get('name', 'savegame')
-        game_state = GameState.load(save_name)
-        return jsonify({"status": "ok", "state": game_state.to_dict(), "message": f"Loaded '{save_name}'"})
+        save_writer.flush()
+        sessions.replace(session, GameState.load(save_name, sessions.slot_directory(session.token)))
+        return state_response(status="ok", message=f"Loaded '{save_name}'")
     elif action_type == 'restart_game':
-        game_state.restart()
-        return jsonify({"status": "ok", "state": game_state.to_dict()})
-    elif action_type == 'hire_infra':
-        success, msg = game_state.hire_infra_specialist(data.get('name', ''), int(data.get('skill', 50)))
-        state = game_state.to_dict()
-        status = "ok" if success else "error"
-        return jsonify({"status": status, "message": msg, "state": state})
-    elif action_type == 'fire_staff':
-        success, msg = game_state.fire_staff(data.get('staff_type'), data.get('name'))
-        state = game_state.to_dict()
-        status = "ok" if success else "error"
-        return jsonify({"status": status, "message": msg, "state": state})
-    
-    return jsonify({"status": "ok", "state": game_state.to_dict()})
+        with session.mutating() as game:
+            game.restart()
+            sessions.replace(session, game)
+        return state_response(status="ok")
+
+    result = sessions.perform(session, data) or {"status": "ok"}
+    if "game_data" in result:
+        return jsonify(result)
+    return state_response(**result)
+
+@app.route('/api/batch', methods=['POST'])
+def perform_batch():
+    """Run `{"actions": [...], "atomic": false}` in order under one lock; the state is sent once at the end.
+
+    Takes the game actions `/api/action` does, except saves and mini-games.
+    With `"atomic": true` the first failure undoes the whole batch.
+    """
+    data = request.json
+    actions = data.get('actions')
+    if not isinstance(actions, list) or len(actions) > MAX_BATCH_ACTIONS:
+        return state_response(status="error", message=f"'actions' must be a list of at most {MAX_BATCH_ACTIONS} actions")
+    results, rolled_back = sessions.perform_batch(current_session(), actions, atomic=bool(data.get('atomic', False)))
+    failed = sum(result["status"] != "ok" for result in results)
+    payload = {"status": "ok" if not failed else "error", "results": results, "rolled_back": rolled_back}
+    if rolled_back:
+        payload["message"] = f"Action {len(results)} failed: {results[-1].get('message')}; nothing was applied"
+    elif failed:
+        payload["message"] = f"{failed} of {len(results)} actions failed"
+    return state_response(**payload)
+
+def sse_message(event, data):
+    if event == "keepalive":
+        return ": keepalive\n\n"
+    if event == "state":  # a StateSnapshot, whose JSON is already serialized
+        envelope = json.dumps({"version": data.version, "state_id": data.state_id})
+        return f"event: state\ndata: {envelope[:-1]}, \"state\": {data.to_json()}}}\n\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/stream', methods=['GET'])
+def stream():
+    """Server-sent events for the session: "state" or "patch" on every change, then "log", "events", "saved".
+
+    `?since=<version>&state_id=<id>` resumes from a state the client already has.
+    """
+    session = current_session()
+    updates = session.updates(request.args.get('since', type=int), request.args.get('state_id'),
+                              keepalive=STREAM_KEEPALIVE_SECONDS)
+    # The request (and so the session) stays open while the client listens
+    body = stream_with_context(sse_message(event, data) for event, data in updates)
+    return app.response_class(body, mimetype="text/event-stream",
+                              headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/api/autosave', methods=['GET'])
+@local_only
+def autosave_status():
+    """Background save writer counters and write latency."""
+    return jsonify(save_writer.stats())
+
+@app.route('/api/sessions', methods=['GET'])
+@local_only
+def session_status():
+    """Session store counters and memory use."""
+    return jsonify(sessions.stats())
+
+@app.route('/api/debug/phases', methods=['GET', 'POST'])
+@local_only
+def phase_timings():
+    """The session's weekly turn phase timings; POST `{"enabled": bool, "reset": bool}` to control them."""
+    session = current_session()
+    with session.lock:  # the turn appends to the same buffers
+        timer = session.game.phase_timer
+        if request.method == 'POST':
+            data = request.json or {}
+            if 'enabled' in data:
+                timer.enabled = bool(data['enabled'])
+            if data.get('reset'):
+                timer.reset()
+        return jsonify(session.game.phase_report())
+
+@app.route('/api/metrics', methods=['GET'])
+@local_only
+def metrics_endpoint():
+    """Request latency/size/error metrics plus session and save writer counters, in Prometheus text format."""
+    session_stats, writer_stats = sessions.stats(), save_writer.stats()
+    extra = [
+        ("pm_sim_sessions", "gauge", "Sessions in memory.", session_stats["sessions"]),
+        ("pm_sim_session_memory_bytes", "gauge", "Serialized state size of sessions in memory.", session_stats["memory_bytes"]),
+        ("pm_sim_sessions_evicted_total", "counter", "Sessions written to disk and dropped from memory.", session_stats["evicted"]),
+        ("pm_sim_saves_written_total", "counter", "Saves written by the background writer.", writer_stats["written"]),
+        ("pm_sim_save_errors_total", "counter", "Saves that failed to write.", writer_stats["errors"]),
+        ("pm_sim_saves_pending", "gauge", "Saves waiting for the background writer.", writer_stats["pending"]),
+    ]
+    return app.response_class(request_metrics.render(extra), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/admin/profile', methods=['POST'])
+@local_only
+def profile_session():
+    """Trace the next `actions` actions of session `token` for at most `seconds`; waits for them.
+
+    Returns collapsed stacks (for flamegraph tools) and the `top` hotspots.
+    """
+    data = request.json or {}
+    token = data.get('token')
+    if token not in sessions:
+        return jsonify({"status": "error", "message": "No such session in memory"}), 404
+    actions = min(max(int(data.get('actions', 1)), 1), MAX_PROFILE_ACTIONS)
+    seconds = min(max(float(data.get('seconds', 10)), 0.0), MAX_PROFILE_SECONDS)
+    session = sessions.open(token)  # held, so it is not evicted mid-capture
+    try:
+        with session.changed:  # a short lock, unlike session.lock which a long turn holds
+            if session.profile is not None:
+                return jsonify({"status": "error", "message": "The session is already being profiled"}), 409
+            capture = session.profile = profiler.ProfileCapture(actions, seconds)
+        try:
+            capture.wait()
+        finally:
+            session.profile = None
+        return jsonify({"status": "ok", **capture.report(top=max(int(data.get('top', 25)), 1))})
+    finally:
+        sessions.release(session)
+
+@app.route('/api/debug/memory', methods=['GET'])
+@local_only
+def memory_report():
+    """Approximate memory per subsystem of the requesting session's game, or of session `?token=`."""
+    token = request.args.get('token')
+    if token is not None and token not in sessions:
+        return jsonify({"status": "error", "message": "No such session in memory"}), 404
+    session = current_session() if token is None else sessions.open(token)
+    try:
+        with session.lock:
+            report = session.game.memory_report()
+        return jsonify({"status": "ok", "token": session.token, "snapshot_bytes": len(session.snapshot.to_json()), **report})
+    finally:
+        if token is not None:
+            sessions.release(session)
+
+@app.route('/api/debug/memory/snapshot', methods=['POST'])
+@local_only
+def memory_snapshot():
+    """Take a tracemalloc snapshot of the process (starting tracing first if needed)."""
+    return jsonify({"status": "ok", "id": trace_snapshots.take()})
+
+@app.route('/api/debug/memory/diff', methods=['GET'])
+@local_only
+def memory_diff():
+    """Allocation growth from snapshot `?from=` to snapshot `?to=` (default: now), top `?top=` sites."""
+    try:
+        diff = trace_snapshots.diff(request.args.get('from', type=int), request.args.get('to', type=int),
+                                    top=request.args.get('top', 25, type=int),
+                                    group_by='traceback' if request.args.get('traceback') else 'lineno')
+    except ValueError as exc:
+        return jsonify({"status": "error", "message": str(exc)}), 404
+    return jsonify({"status": "ok", **diff})
+
+@app.route('/api/debug/memory/stop', methods=['POST'])
+@local_only
+def memory_stop():
+    """Stop tracemalloc (it slows every allocation while on) and drop the snapshots."""
+    trace_snapshots.stop()
+    return jsonify({"status": "ok"})
 
 @app.route('/api/next_turn', methods=['POST'])
 def next_turn():
-    game_state.process_end_of_week()
-    game_state.process_start_of_week()
-    return jsonify({"status": "ok", "state": game_state.to_dict()})
+    weeks = min(max(request.args.get('weeks', 1, type=int), 1), MAX_FAST_FORWARD_WEEKS)
+    return state_response(**sessions.perform(current_session(), {"type": "next_turn", "weeks": weeks}))
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
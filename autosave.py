@@ -0,0 +1,106 @@
+"""Background save writer.
+
+The request thread only takes a snapshot (`GameState.save_document()`,
+mostly cached fragments); packing, compression, fsync and the atomic
+rename happen on a worker thread. A slot holds at most one pending write:
+submitting again before the worker gets to it replaces the document, so a
+burst of saves costs one write.
+"""
+import threading
+import time
+
+from game_engine import SAVE_DIR, GameState
+
+
+class AutosaveWriter:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = {}  # (directory, name, format) -> (document, on_written)
+        self._writing = None
+        self._closed = False
+        self.written = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_error = None
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self._total_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name="autosave-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, game, name, format="binary", on_written=None, directory=SAVE_DIR):
+        """Snapshot `game` now and queue it for `saves/<name>`; `on_written()` runs on the worker once it is on disk."""
+        document = game.save_document()
+        key = (directory, name, format)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Autosave writer is closed")
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = (document, on_written)
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every submitted save is written; False if `timeout` ran out first."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and self._writing is None, timeout)
+
+    def flush_slot(self, name, directory=SAVE_DIR, timeout=None):
+        """Block until no save for slot `name` is pending or being written."""
+        def idle():
+            busy = [*self._pending, self._writing]
+            return not any(key is not None and key[:2] == (directory, name) for key in busy)
+        with self._cond:
+            return self._cond.wait_for(idle, timeout)
+
+    def close(self, timeout=None):
+        """Write what is pending, then stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Write counters and latency in ms (pack, compress, fsync and rename on the worker)."""
+        with self._cond:
+            return {
+                "written": self.written,
+                "coalesced": self.coalesced,
+                "pending": len(self._pending) + (self._writing is not None),
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "last_ms": round(self.last_ms, 3),
+                "mean_ms": round(self._total_ms / self.written, 3) if self.written else 0.0,
+                "max_ms": round(self.max_ms, 3),
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                key = next(iter(self._pending))
+                document, on_written = self._pending.pop(key)
+                self._writing = key
+            start = time.perf_counter()
+            error = None
+            try:
+                directory, name, format = key
+                GameState.write_save(name, document, format, directory)
+                if on_written is not None:
+                    on_written()
+            except Exception as exc:  # keep the worker alive; the failure is reported in stats()
+                error = f"{key[1]}: {exc}"
+            elapsed = (time.perf_counter() - start) * 1e3
+            with self._cond:
+                self._writing = None
+                if error is None:
+                    self.written += 1
+                    self.last_ms = elapsed
+                    self.max_ms = max(self.max_ms, elapsed)
+                    self._total_ms += elapsed
+                else:
+                    self.errors += 1
+                    self.last_error = error
+                self._cond.notify_all()
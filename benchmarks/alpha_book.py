@@ -0,0 +1,54 @@
+"""Weekly turn cost as the alpha book grows, against the old per-position loop.
+
+Usage: python benchmarks/alpha_book.py [--sizes 100 1000 5000] [--turns 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rng_block_buffer import build_fund  # noqa: E402
+from utils import simulate_alpha_return  # noqa: E402
+
+
+def per_position_pnl(game, market_ret):
+    """The PnL loop `process_end_of_week` ran before the columnar book."""
+    weekly_pnl = 0.0
+    for position in game.portfolio.positions:
+        alpha = game.get_alpha_by_id(position["alpha_id"])
+        if alpha:
+            ret = simulate_alpha_return(alpha, game.environment["regime"], game.rng)
+            ret += market_ret * alpha.beta
+            weekly_pnl += game.player.aum * position["weight"] * ret
+    for alpha in game.alphas["live"] + game.alphas["stored_for_ensemble"]:
+        alpha.decay(game.environment["regime"])
+    return weekly_pnl
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'alphas':>7} {'turn us':>10} {'old pnl+decay us':>17}")
+    for size in args.sizes:
+        game = build_fund(10, size)
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            game.process_end_of_week()
+            game.process_start_of_week()
+            game.events_queue.clear()
+        turn = (time.perf_counter() - start) / args.turns
+
+        start = time.perf_counter()
+        for _ in range(args.turns):
+            per_position_pnl(game, 0.001)
+        legacy = (time.perf_counter() - start) / args.turns
+        print(f"{size:>7} {turn * 1e6:>10.1f} {legacy * 1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Per-turn cost of block-buffered draws vs. one Generator call per draw.
+
+Usage: python benchmarks/rng_block_buffer.py [--quants 40] [--alphas 150] [--turns 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import AlphaStrategy, GameState, Quant  # noqa: E402
+
+
+def build_fund(quants, alphas, seed=0):
+    game = GameState(seed=seed)
+    game.player.cash = game.player.aum = 1e12  # keep the fund alive for the whole run
+    game.team = [Quant(f"Q{i}", 60, 200_000) for i in range(quants)]
+    for i in range(alphas):
+        alpha = AlphaStrategy(f"Alpha {i}", ("Trend", "MeanReversion", "Value")[i % 3], 3)
+        alpha.status = "live"
+        alpha.current_expected_return = 0.1
+        alpha.volatility = 0.1
+        alpha.decay_rate = 0.0
+        game.alphas["live"].append(alpha)
+    game.portfolio.positions = [{"alpha_id": a.id, "weight": 1 / alphas} for a in game.alphas["live"]]
+    return game
+
+
+def time_turns(game, turns):
+    start = time.perf_counter()
+    for _ in range(turns):
+        game.process_end_of_week()
+        game.process_start_of_week()
+        game.events_queue.clear()
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quants", type=int, default=40)
+    parser.add_argument("--alphas", type=int, default=150)
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    direct = build_fund(args.quants, args.alphas)
+    direct.rng = np.random.default_rng(0)
+    buffered = build_fund(args.quants, args.alphas)
+
+    per_turn_direct = time_turns(direct, args.turns)
+    per_turn_buffered = time_turns(buffered, args.turns)
+    saving = per_turn_direct - per_turn_buffered
+    print(f"fund: {args.quants} quants, {args.alphas} live alphas, {args.turns} turns")
+    print(f"Generator per draw : {per_turn_direct * 1e6:9.1f} us/turn")
+    print(f"RandomStream blocks: {per_turn_buffered * 1e6:9.1f} us/turn")
+    print(f"saving             : {saving * 1e6:9.1f} us/turn ({saving / per_turn_direct:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Response time of /api/action with cached state sections vs. a full rebuild.
+
+Usage: python benchmarks/state_cache.py [--sizes 100 1000 5000] [--requests 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as server  # noqa: E402
+from rng_block_buffer import build_fund  # noqa: E402
+from sessions import SessionStore  # noqa: E402
+
+
+def time_requests(client, game, requests, rebuild):
+    """Mean seconds per `clear_event` action; `rebuild` marks every section dirty first."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        if rebuild:
+            game.mark_dirty()
+        client.post("/api/action", json={"type": "clear_event"})
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'alphas':>7} {'quants':>7} {'full rebuild ms':>16} {'cached ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        quants = max(10, size // 10)
+        game = build_fund(quants, size)
+        game.to_dict()
+        server.sessions = SessionStore(game_factory=lambda: game)
+        client = server.app.test_client()
+        full = time_requests(client, game, args.requests, rebuild=True)
+        cached = time_requests(client, game, args.requests, rebuild=False)
+        print(f"{size:>7} {quants:>7} {full * 1e3:>16.2f} {cached * 1e3:>10.2f} {full / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Engine, serialization and persistence benchmarks at scale, checked against a stored baseline.
+
+Builds synthetic funds of increasing size (N quants and N live alphas
+with decades of PnL history) and measures, per size:
+- turn_ms and turns_per_sec;
+- to_dict_ms (cold) and to_dict_bytes;
+- json_encode_ms;
+- save_ms, save_bytes and load_ms, for binary and JSON saves.
+
+It also times each mini-game's start and submit. Results are written as
+JSON; with a baseline, each metric is checked against its regression
+budget (a fraction; `*_per_sec` may drop by it, everything else may grow
+by it). The exit status is 1 if any metric is over budget. A baseline
+taken with other `--years` is refused; other `--sizes` or `--repeat` only
+warn, and only the funds both runs have are compared.
+
+Usage: python benchmarks/suite.py [--sizes 10 100 1000 10000] [--years 30] [--repeat 5]
+           [--out results.json] [--baseline benchmarks/baseline.json]
+           [--budget 'fund_10000/*=0.5' ...] [--save-baseline]
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from game_engine import GameState  # noqa: E402
+from rng_block_buffer import build_fund  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# First matching pattern wins; sizes are deterministic, timings are not
+DEFAULT_BUDGETS = (("*_bytes", 0.05), ("*", 0.35))
+COMPARED_META = ("years", "sizes", "repeat")  # run settings a baseline is only comparable under
+MINIGAMES = {
+    "guess_sharpe": ("generate_sharpe_challenge", "submit_sharpe_guess", 1.0),
+    "market_making": ("start_market_making", "submit_market_making", 0.5),
+    "market_trivia": ("start_market_trivia", "submit_market_trivia", 0),
+}
+
+
+def timed(fn, repeat, setup=None):
+    """Median seconds of `repeat` calls of `fn()`, and its last result.
+
+    With `setup`, each call is `fn(setup())` and only `fn` is timed.
+    """
+    times = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def synthetic_fund(size, years, seed=0):
+    game = build_fund(size, size, seed=seed)
+    game.player.pnl_history = np.random.default_rng(seed).normal(1e5, 1e6, years * 52)
+    game.process_start_of_week()
+    return game
+
+
+def play(game, turns):
+    for _ in range(turns):
+        game.process_end_of_week()
+        game.process_start_of_week()
+        game.events_queue.clear()  # keep the queue from growing with the run
+    return game
+
+
+def bench_fund(size, years, repeat, directory):
+    turns = max(3, min(100, 20_000 // size))
+    # A fresh fund per run, so the game measured below has played `turns` turns whatever `repeat` is
+    turn, game = timed(lambda game: play(game, turns), repeat, setup=lambda: synthetic_fund(size, years))
+    results = {"turn_ms": turn / turns * 1e3, "turns_per_sec": turns / turn}
+
+    def cold_to_dict():
+        game.mark_dirty()
+        return game.to_dict()
+    to_dict, state = timed(cold_to_dict, repeat)
+    encode, text = timed(lambda: json.dumps(state), repeat)
+    results.update(to_dict_ms=to_dict * 1e3, to_dict_bytes=len(text), json_encode_ms=encode * 1e3)
+
+    name = f"bench_{size}"
+    for format, ext in (("binary", ".npz"), ("json", ".json")):
+        save, _ = timed(lambda: game.save(name, format=format, directory=directory), repeat)
+        path = GameState.save_path(name, ext, directory)
+        load, loaded = timed(lambda: GameState.load(name, directory), repeat)
+        assert loaded.save_document() == game.save_document(), f"{format} save did not round-trip"
+        results.update({f"save_{format}_ms": save * 1e3, f"save_{format}_bytes": os.path.getsize(path),
+                        f"load_{format}_ms": load * 1e3})
+        os.remove(path)
+    return {key: round(value, 4) for key, value in results.items()}
+
+
+def bench_minigames(repeat):
+    results = {}
+    game = synthetic_fund(10, 1)
+    for name, (start_name, submit_name, answer) in MINIGAMES.items():
+        start, submit = getattr(game, start_name), getattr(game, submit_name)
+
+        def play_round():
+            begin = time.perf_counter()
+            start()
+            started = time.perf_counter()
+            submits = 0
+            while game.active_minigame_instance is not None:
+                submit(answer)
+                submits += 1
+            return started - begin, (time.perf_counter() - started) / submits
+        starts, submits = zip(*(play_round() for _ in range(repeat)))
+        results[name] = {"start_ms": round(statistics.median(starts) * 1e3, 4),
+                         "submit_ms": round(statistics.median(submits) * 1e3, 4)}
+    return results
+
+
+def flatten(results):
+    return {f"{group}/{metric}": value for group, metrics in results.items() for metric, value in metrics.items()}
+
+
+def budget_for(metric, budgets):
+    return next(fraction for pattern, fraction in budgets if fnmatch.fnmatchcase(metric, pattern))
+
+
+def compare(current, baseline, budgets):
+    """`(rows, regressions)` comparing flat metric dicts; rows are (metric, baseline, current, change, budget)."""
+    rows, regressions = [], []
+    for metric in sorted(set(current) & set(baseline)):
+        old, new = baseline[metric], current[metric]
+        change = (new - old) / old if old else 0.0
+        worse = -change if metric.endswith("_per_sec") else change
+        budget = budget_for(metric, budgets)
+        rows.append((metric, old, new, change, budget))
+        if worse > budget:
+            regressions.append(metric)
+    return rows, regressions
+
+
+def meta_differences(settings, baseline_meta):
+    """`(key, baseline, current)` for each setting in COMPARED_META that differs from the baseline's."""
+    return [(key, baseline_meta.get(key), settings[key]) for key in COMPARED_META
+            if baseline_meta.get(key) != settings[key]]
+
+
+def parse_budget(text):
+    pattern, _, fraction = text.rpartition("=")
+    if not pattern:
+        raise argparse.ArgumentTypeError(f"Budget must look like PATTERN=FRACTION, got '{text}'")
+    return pattern, float(fraction)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--years", type=int, default=30, help="years of PnL history per fund")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (the median is kept)")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline results to compare against")
+    parser.add_argument("--budget", type=parse_budget, action="append", default=[],
+                        help="PATTERN=FRACTION regression budget for metrics matching PATTERN (fnmatch), "
+                             "e.g. 'fund_10000/*=0.5'; checked before the defaults")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    args = parser.parse_args()
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        settings = {"sizes": args.sizes, "years": args.years, "repeat": args.repeat}
+        for key, old, new in meta_differences(settings, baseline.get("meta", {})):
+            if key == "years":  # every fund metric depends on the history length
+                parser.error(f"baseline was taken with --years {old}; rerun with it or use --save-baseline")
+            print(f"warning: baseline was taken with --{key} {old}, this run uses {new}", file=sys.stderr)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            print(f"fund {size} ...", file=sys.stderr)
+            results[f"fund_{size}"] = bench_fund(size, args.years, args.repeat, directory)
+    print("minigames ...", file=sys.stderr)
+    results.update(bench_minigames(args.repeat * 4))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sizes": args.sizes,
+            "years": args.years,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    budgets = [*args.budget, *DEFAULT_BUDGETS]
+    regressions = []
+    if baseline is not None:
+        rows, regressions = compare(flatten(results), flatten(baseline["results"]), budgets)
+        report["comparison"] = {"baseline": args.baseline, "regressions": regressions}
+        print(f"{'metric':<36} {'baseline':>12} {'current':>12} {'change':>8} {'budget':>7}", file=sys.stderr)
+        for metric, old, new, change, budget in rows:
+            flag = "  REGRESSION" if metric in regressions else ""
+            print(f"{metric:<36} {old:>12.4g} {new:>12.4g} {change:>+8.1%} {budget:>7.0%}{flag}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text + "\n")
+        print(f"baseline saved to {args.baseline}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import numpy as np
+
+from records import Record
+
+
+class ColumnField:
+    """Attribute stored in one row of a columnar store (AlphaBook, TeamRoster).
+
+    The owning object carries `_store`, `_row` and `_local`. While it is not in
+    a store the value lives in `_local`; joining a store moves it into the
+    column and leaving copies it back.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        if obj._store is None:
+            return obj._local[self.name]
+        return obj._store.columns[self.name][obj._row].item()
+
+    def __set__(self, obj, value):
+        if obj._store is None:
+            obj._local[self.name] = value
+        else:
+            obj._store.set_cell(self.name, obj._row, value)
+
+
+class ColumnBacked(Record):
+    """Record whose `COLUMN_FIELDS` are ColumnFields."""
+    __slots__ = ("_store", "_row", "_local")
+    COLUMN_FIELDS = ()
+
+    def __init__(self):
+        self._store = None
+        self._row = None
+        self._local = {}
+
+
+def grow_columns(columns, capacity, fill=None):
+    """Return copies of `columns` resized to `capacity`; new cells take `fill[name]` or zero."""
+    grown = {}
+    for name, column in columns.items():
+        new = np.full(capacity, (fill or {}).get(name, 0), dtype=column.dtype)
+        new[:len(column)] = column
+        grown[name] = new
+    return grown
@@ -1,27 +1,50 @@
-import random
+import copy
+import secrets
 import numpy as np
 import json
 import os
+import journal
+import manifest
+import memory
+import savefile
+from columns import ColumnBacked, ColumnField, grow_columns
+from phases import PhaseTimer
+from records import Record
+from roster import TeamRoster
+from state_cache import SECTIONS, SectionCache, touches
+
+# Events that need a player decision before the game should move on
+BLOCKING_EVENTS = ("GAME OVER", "YOU WIN!", "Competing Hedge Fund Call", "Infrastructure Ask")
+SAVE_DIR = "saves"
+# Actions that drive a mini-game; mini-game state is not part of saves
+MINIGAME_ACTIONS = frozenset({"start_trivia_game", "submit_trivia_game", "start_mini_game", "submit_mini_game",
+                              "start_mm_game", "submit_mm_action"})
+# Every action type GameState.perform() handles
+ACTION_TYPES = MINIGAME_ACTIONS | {"next_turn", "hire_quant", "start_research", "upgrade_infra", "update_portfolio",
+                                   "clear_event", "handle_infra_request", "handle_reset_offer", "hire_infra", "fire_staff"}
+# Save schema shared by the JSON and binary formats: record lists by document path,
+# and numeric series the binary format stores as raw arrays
+SAVE_SERIES = ("player/pnl_history", "performance_state/returns")
+# Trailing windows (weeks) for rolling performance; the longest drives player.rolling_sharpe
+PERFORMANCE_WINDOWS = (13, 52)
 
 class GameState:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self._state_cache = SectionCache(self._build_section)
         self.week = 1
         self.year = 1
+        self.seed_rng(seed)
         self.player = Player()
-        self.team = []
-        self.infra_team = []
+        self.performance = RollingStats(PERFORMANCE_WINDOWS)
+        self.team = TeamRoster()
+        self.infra_team = TeamRoster()
         self.pending_hires = []  # list of Quant not yet onboarded
         self.pending_infra = []  # infra specialists onboarding
         self.portfolio = Portfolio()
         self.infrastructure = Infrastructure()
         self.risk_model = RiskModel()
         self.risk_research = []
-        self.alphas = {
-            "live": [],
-            "in_research": [],
-            "stored_for_ensemble": [],
-            "ensembles": []
-        }
+        self.alphas = AlphaRegistry()
         self.events_queue = []
         self.message_log = ["System initialized.", "Welcome to the fund, PM.", "Market data feed connected..."]
         self.environment = {
@@ -29,32 +52,82 @@ class GameState:
             "weeks_in_regime": 0
         }
         self.active_minigame_instance = None
+        self.phase_timer = PhaseTimer()  # per-phase timings of the weekly turn, see phase_report()
+        self.action_count = 0  # actions applied through perform(); journals number entries by it
+
+    @property
+    def team(self):
+        return self._team
+
+    @team.setter
+    def team(self, members):
+        self._team = TeamRoster(members)
+
+    @property
+    def infra_team(self):
+        return self._infra_team
+
+    @infra_team.setter
+    def infra_team(self, members):
+        self._infra_team = TeamRoster(members)
 
     def log(self, message):
         self.message_log.append(f"[W{self.week}] {message}")
+        self.mark_dirty("log")
         if len(self.message_log) > 50:
             self.message_log.pop(0)
 
+    def seed_rng(self, seed=None, spawned=0):
+        """Start this game's random stream. Without a seed a fresh one is drawn and kept for replays."""
+        self.seed = secrets.randbits(53) if seed is None else int(seed)  # 53 bits survive a JS number
+        self._seed_seq = np.random.SeedSequence(self.seed, n_children_spawned=spawned)
+        self.rng = RandomStream(self._seed_seq)
+
+    def spawn_rng(self, n=None):
+        """Independent child Generator(s), e.g. for mini-games or parallel workers."""
+        children = [np.random.Generator(np.random.PCG64(s)) for s in self._seed_seq.spawn(n or 1)]
+        return children if n else children[0]
+
+    def rng_state(self):
+        return {
+            "seed": self.seed,
+            "spawned": self._seed_seq.n_children_spawned,
+            "stream": self.rng.state(),
+        }
+
+    def restore_rng_state(self, state):
+        self.seed_rng(state["seed"], state.get("spawned", 0))
+        if "stream" in state:
+            self.rng.restore(state["stream"])
+
+    def choice(self, options):
+        return options[self.rng.integers(len(options))]
+
+    @touches()
     def process_start_of_week(self):
+        timer = self.phase_timer
+        timer.start()
         # Story / Hints
         if self.week == 1 and self.year == 1:
             self.log("Hint: Hire a quant and start research immediately.")
         if self.player.cash < 100_000:
             self.log("WARNING: Cash reserves critical.")
+        timer.lap("hints")
         
         # 1. Regime evolution
-        if random.random() < 0.05: # 5% chance to change regime
+        if self.rng.random() < 0.05: # 5% chance to change regime
             regimes = ["Trendy", "MeanReverting", "HighVol", "LowVol"]
-            new_regime = random.choice(regimes)
+            new_regime = self.choice(regimes)
             self.environment["regime"] = new_regime
             self.environment["weeks_in_regime"] = 0
             self.log(f"MARKET REGIME CHANGE DETECTED: Now {new_regime}")
         else:
             self.environment["weeks_in_regime"] += 1
+        timer.lap("regime")
 
         # 2. Alpha decay
-        for alpha in self.alphas["live"] + self.alphas["stored_for_ensemble"]:
-            alpha.decay(self.environment["regime"])
+        self.alphas.book.decay()
+        timer.lap("decay")
 
         # 3. Process research
         completed_research = []
@@ -64,16 +137,15 @@ class GameState:
                 completed_research.append(alpha)
         
         for alpha in completed_research:
-            self.alphas["in_research"].remove(alpha)
             # Roll for success
             success_prob = getattr(alpha, "success_prob", 0.5 + (self.infrastructure.data_quality * 0.05))
-            if random.random() < success_prob:
+            if self.rng.random() < success_prob:
                 alpha.status = "stored_for_ensemble" # Or ready to deploy
                 # Generate stats
-                if random.random() < getattr(alpha, "potential_super", 0.02):
-                    alpha.base_expected_return = random.uniform(0.18, 0.35)
+                if self.rng.random() < getattr(alpha, "potential_super", 0.02):
+                    alpha.base_expected_return = self.rng.uniform(0.18, 0.35)
                     alpha.current_expected_return = alpha.base_expected_return
-                    alpha.volatility = random.uniform(0.08, 0.18)
+                    alpha.volatility = self.rng.uniform(0.08, 0.18)
                     alpha.decay_rate = max(0.003, 0.01 * (1 - alpha.resilience))
                     self.apply_alpha_penalty_to_stats(alpha)
                     self.events_queue.append(Event("Breakthrough Alpha", f"{alpha.name} looks extraordinary. Guard it well.", []))
@@ -81,19 +153,21 @@ class GameState:
                     self.player.gain_xp(150)
                     self.bump_team_happiness(6, "Breakthrough research lit up the desk.")
                 else:
-                    alpha.base_expected_return = random.uniform(0.05, 0.18)
+                    alpha.base_expected_return = self.rng.uniform(0.05, 0.18)
                     alpha.current_expected_return = alpha.base_expected_return
-                    alpha.volatility = random.uniform(0.05, 0.15)
+                    alpha.volatility = self.rng.uniform(0.05, 0.15)
                     alpha.decay_rate = max(0.005, 0.015 * (1 - alpha.resilience))
                     self.apply_alpha_penalty_to_stats(alpha)
                     self.events_queue.append(Event("Research Complete", f"Alpha {alpha.name} finished research successfully!", []))
                     self.log(f"Research SUCCESS: {alpha.name} discovered (Exp Ret: {alpha.base_expected_return:.1%})")
                     self.bump_team_happiness(3, "Research win energized the team.")
                     self.player.gain_xp(100)
-                self.alphas["stored_for_ensemble"].append(alpha)
+                self.alphas.move(alpha, "stored_for_ensemble")
             else:
+                self.alphas.discard(alpha)
                 self.events_queue.append(Event("Research Failed", f"Alpha {alpha.name} failed to produce results.", []))
                 self.log(f"Research FAILURE: {alpha.name} yielded no signal.")
+        timer.lap("research")
 
         # Process risk model research
         completed_risk = []
@@ -107,7 +181,7 @@ class GameState:
             avg_skill = self.avg_team_skill() or 50
             avg_happy = self.avg_team_happiness() or 50
             p_success = min(0.95, 0.6 + success_bonus + avg_skill * 0.002 + max(0, (avg_happy - 50) * 0.002))
-            if random.random() < p_success:
+            if self.rng.random() < p_success:
                 self.risk_model.level += 1
                 self.player.gain_xp(120)
                 self.events_queue.append(Event("Risk Model Upgrade", f"{proj.name} completed. Risk model level is now {self.risk_model.level}.", []))
@@ -116,189 +190,351 @@ class GameState:
             else:
                 self.events_queue.append(Event("Risk Research Failed", f"{proj.name} stalled; revisit later.", []))
                 self.log(f"Risk research failed: {proj.name}.")
+        timer.lap("risk_research")
 
         # 4. Random events
-        if random.random() < 0.1:
+        if self.rng.random() < 0.1:
             self.events_queue.append(Event("Market News", "Something happened in the market.", []))
+        timer.lap("market_news")
         # 5. Infra outages (chance reduced by resilience)
         self.maybe_infra_outage()
+        timer.lap("outages")
         # 5. Team requests (infra/data tooling) with small chance weekly
-        if random.random() < 0.1 and self.team:
+        if self.rng.random() < 0.1 and self.team:
             self.enqueue_infra_request()
+        timer.lap("team_requests")
+        timer.stop()
+
+    def mark_dirty(self, *sections):
+        """Flag state sections (default: all) for re-serialization on the next `to_dict()`."""
+        self._state_cache.mark(*sections)
+
+    @property
+    def state_id(self):
+        return self._state_cache.state_id
+
+    @property
+    def version(self):
+        """Increases by one each time the serialized state changes."""
+        return self._state_cache.refresh()
+
+    def patch_since(self, version):
+        """JSON Patch ops from `version` to now, or None if the client needs the full state."""
+        return self._state_cache.patch_since(version)
+
+    def snapshot(self):
+        """Immutable `StateSnapshot` of the serialized state, for readers on other threads."""
+        return self._state_cache.snapshot()
+
+    def to_dict(self, full_history=False):
+        """Serialized state, reusing cached fragments for sections nothing has touched.
+
+        `full_history` (saves, exports) rebuilds the player section with every
+        week of PnL and leaves the cache alone.
+        """
+        cache = self._state_cache
+        state = {}
+        for section in SECTIONS:
+            if section == "player" and full_history:
+                state.update(self._player_section(full_history=True))
+            else:
+                state.update(cache.get(section))
+        return state
 
-    def to_dict(self):
-        avg_happiness = self.avg_team_happiness()
+    def to_json(self):
+        """`json.dumps(self.to_dict())`, stitched together from cached per-section JSON."""
+        cache = self._state_cache
+        return "{" + ", ".join(cache.get_json(section) for section in SECTIONS) + "}"
+
+    def _build_section(self, section):
+        return getattr(self, f"_{section}_section")()
+
+    def _meta_section(self):
+        return {"week": self.week, "year": self.year, "seed": self.seed, "environment": dict(self.environment)}
+
+    def _player_section(self, full_history=False):
+        player = self.player.to_dict(full_history)
+        # Copy the containers the engine edits in place so older fragments stay diffable
+        player["abilities"] = list(player["abilities"])
+        player["minigame_stats"] = copy.deepcopy(player["minigame_stats"])
+        return {"player": player, "performance": self.performance.summary()}
+
+    def _team_section(self):
         return {
-            "week": self.week,
-            "year": self.year,
-            "player": self.player.to_dict(),
             "team": [q.to_dict() for q in self.team],
             "pending_hires": [q.to_dict() for q in self.pending_hires],
             "infra_team": [m.to_dict() for m in self.infra_team],
             "pending_infra": [m.to_dict() for m in self.pending_infra],
-            "portfolio": self.portfolio.to_dict(),
-            "infrastructure": self.infrastructure.to_dict(),
-            "risk_model": self.risk_model.to_dict(),
+            "avg_team_happiness": self.avg_team_happiness(),
+        }
+
+    def _portfolio_section(self):
+        return {"portfolio": self.portfolio.to_dict()}
+
+    def _infra_section(self):
+        return {
+            "infrastructure": dict(self.infrastructure.to_dict()),
+            "risk_model": dict(self.risk_model.to_dict()),
             "risk_research": [r.to_dict() for r in self.risk_research],
             "resilience_score": self.resilience_score(),
-            "alphas": {
-                "live": [a.to_dict() for a in self.alphas["live"]],
-                "in_research": [a.to_dict() for a in self.alphas["in_research"]],
-                "stored_for_ensemble": [a.to_dict() for a in self.alphas["stored_for_ensemble"]],
-                "ensembles": [a.to_dict() for a in self.alphas["ensembles"]]
-            },
-            "events_queue": [e.to_dict() for e in self.events_queue],
-            "message_log": self.message_log,
-            "environment": self.environment,
-            "avg_team_happiness": avg_happiness
         }
 
-    def save(self, name="savegame"):
-        os.makedirs("saves", exist_ok=True)
+    def _alphas_section(self):
+        return {"alphas": {status: [a.to_dict() for a in self.alphas[status]] for status in AlphaRegistry.STATUSES}}
+
+    def _events_section(self):
+        return {"events_queue": [e.to_dict() for e in self.events_queue]}
+
+    def _log_section(self):
+        return {"message_log": list(self.message_log)}
+
+    @staticmethod
+    def save_path(name, ext, directory=SAVE_DIR):
         safe = "".join(c for c in name if c.isalnum() or c in ['_', '-']).strip()
         if not safe:
             safe = "savegame"
-        filename = os.path.join("saves", f"{safe}.json")
-        with open(filename, 'w') as f:
-            json.dump(self.to_dict(), f, indent=4)
+        return os.path.join(directory, f"{safe}{ext}")
 
     @classmethod
-    def load(cls, name="savegame"):
-        safe = "".join(c for c in name if c.isalnum() or c in ['_', '-']).strip()
-        if not safe:
-            safe = "savegame"
-        filename = os.path.join("saves", f"{safe}.json")
-        if not os.path.exists(filename):
+    def save_exists(cls, name, directory=SAVE_DIR):
+        return any(os.path.exists(cls.save_path(name, ext, directory)) for ext in (".npz", ".json"))
+
+    def save_document(self):
+        """Everything a save needs, as one JSON-compatible dict.
+
+        Built from fresh or cached (never edited) fragments, so it is a
+        snapshot: playing on does not change it, and it can be written from
+        another thread.
+        """
+        data = self.to_dict(full_history=True)
+        data["rng"] = self.rng_state()
+        data["next_alpha_id"] = self.alphas.next_id
+        data["performance_state"] = self.performance.to_dict()
+        data["action_count"] = self.action_count
+        return data
+
+    def save(self, name="savegame", format="binary", directory=SAVE_DIR):
+        """Write `saves/<name>.npz` (compressed, columnar) or, with format="json", `saves/<name>.json`."""
+        self.write_save(name, self.save_document(), format, directory)
+
+    @classmethod
+    def write_save(cls, name, data, format="binary", directory=SAVE_DIR):
+        """Write a `save_document()` to its slot, atomically: a crash mid-write leaves the old save intact."""
+        os.makedirs(directory, exist_ok=True)
+        if format == "json":
+            filename = cls.save_path(name, ".json", directory)
+            with savefile.atomic_open(filename, 'w') as f:
+                json.dump(data, f, indent=4)
+        else:
+            filename = cls.save_path(name, ".npz", directory)
+            records = {path: record.FIELDS + record.OPTIONAL_FIELDS for path, record in SAVE_RECORDS.items()}
+            savefile.write(filename, data, records, SAVE_SERIES)
+        manifest.record(directory, os.path.splitext(os.path.basename(filename))[0], filename, data, format)
+
+    @classmethod
+    def load(cls, name="savegame", directory=SAVE_DIR):
+        """Load the newer of `saves/<name>.npz` and `saves/<name>.json`; a fresh game if neither exists.
+
+        Actions journaled to `saves/<name>.journal` since that snapshot are replayed on top.
+        """
+        candidates = [path for path in (cls.save_path(name, ".npz", directory), cls.save_path(name, ".json", directory)) if os.path.exists(path)]
+        if not candidates:
             return cls()
-        
-        with open(filename, 'r') as f:
-            data = json.load(f)
-        
+        filename = max(candidates, key=os.path.getmtime)
+        if filename.endswith(".npz"):
+            data = savefile.read(filename)
+        else:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+        game = cls.from_save_document(data)
+        journal.replay(game, cls.save_path(name, ".journal", directory))
+        return game
+
+    @classmethod
+    def from_save_document(cls, data):
+        """Rebuild a game from a save document; fields missing from older saves keep their defaults."""
         game = cls()
         game.week = data['week']
         game.year = data['year']
-        
-        # Restore Player
-        game.player.__dict__.update(data['player'])
-        if not hasattr(game.player, "minigame_stats"):
-            game.player.minigame_stats = {"guess_sharpe_leaderboard": []}
-        if not hasattr(game.player, "reputation_infra"):
-            game.player.reputation_infra = 50
-        if not hasattr(game.player, "startup_grace_weeks"):
-            game.player.startup_grace_weeks = 4
-        if not hasattr(game.player, "starting_aum"):
-            game.player.starting_aum = game.player.aum
-        if not hasattr(game.player, "alpha_difficulty"):
-            game.player.alpha_difficulty = 1.0
-        if not hasattr(game.player, "reset_offer_used"):
-            game.player.reset_offer_used = False
-        if not hasattr(game.player, "reset_offer_active"):
-            game.player.reset_offer_active = False
-        if not hasattr(game.player, "reset_offer_cooldown"):
-            game.player.reset_offer_cooldown = 0
-        
-        # Restore Team
-        game.team = []
-        for q_data in data['team']:
-            q = Quant(q_data['name'], q_data['skill'], q_data['salary'])
-            q.__dict__.update(q_data)
-            game.team.append(q)
-        # Restore pending hires
-        game.pending_hires = []
-        if 'pending_hires' in data:
-            for q_data in data['pending_hires']:
-                q = Quant(q_data['name'], q_data['skill'], q_data['salary'])
-                q.__dict__.update(q_data)
-                game.pending_hires.append(q)
-        # Restore Infra Team
-        game.infra_team = []
-        if 'infra_team' in data:
-            for m_data in data['infra_team']:
-                m = InfraSpecialist(m_data['name'], m_data.get('skill', 50))
-                m.__dict__.update(m_data)
-                game.infra_team.append(m)
-        # Restore pending infra
-        game.pending_infra = []
-        if 'pending_infra' in data:
-            for m_data in data['pending_infra']:
-                m = InfraSpecialist(m_data['name'], m_data.get('skill', 50))
-                m.__dict__.update(m_data)
-                game.pending_infra.append(m)
-            
-        # Restore Portfolio
-        game.portfolio.positions = data['portfolio']['positions']
-        
-        # Restore Infra & Risk
+        if 'rng' in data:
+            game.restore_rng_state(data['rng'])
+        game.player = Player.from_dict(data['player'])
+        if 'performance_state' in data:
+            game.performance = RollingStats.from_dict(data['performance_state'])
+
+        restored = {}
+        for path, record_cls in SAVE_RECORDS.items():
+            node = data
+            for key in path.split("/"):
+                node = node.get(key) or {}
+            restored[path] = [record_cls.from_dict(item) for item in node or []]
+        game.team = restored["team"]
+        game.pending_hires = restored["pending_hires"]
+        game.infra_team = restored["infra_team"]
+        game.pending_infra = restored["pending_infra"]
+        game.risk_research = restored["risk_research"]
+        positions = data['portfolio']['positions']
+        _renumber_duplicate_alphas([restored[f"alphas/{status}"] for status in AlphaRegistry.STATUSES],
+                                   positions, game.alphas)
+        for status in AlphaRegistry.STATUSES:
+            game.alphas[status] = restored[f"alphas/{status}"]
+        game.alphas.next_id = max(game.alphas.next_id, data.get('next_alpha_id', 1))
+
+        game.portfolio.positions = positions
+        # Plain objects: saved keys overwrite the defaults set in __init__
         game.infrastructure.__dict__.update(data['infrastructure'])
         game.risk_model.__dict__.update(data['risk_model'])
-        if not hasattr(game.risk_model, "market_neutral"):
-            game.risk_model.market_neutral = False
-        if not hasattr(game.risk_model, "factor_neutral"):
-            game.risk_model.factor_neutral = False
-        if not hasattr(game, "risk_research"):
-            game.risk_research = []
-        if 'risk_research' in data:
-            game.risk_research = []
-            for r_data in data['risk_research']:
-                r = RiskResearch(r_data['name'], r_data['duration'])
-                r.__dict__.update(r_data)
-                game.risk_research.append(r)
-        
-        # Restore Alphas
-        # Helper to restore alpha list
-        def restore_alphas(alpha_list_data):
-            alphas = []
-            for a_data in alpha_list_data:
-                a = AlphaStrategy(a_data['name'], a_data['style'], a_data['research_duration'])
-                a.__dict__.update(a_data)
-                alphas.append(a)
-            return alphas
-
-        game.alphas['live'] = restore_alphas(data['alphas']['live'])
-        game.alphas['in_research'] = restore_alphas(data['alphas']['in_research'])
-        game.alphas['stored_for_ensemble'] = restore_alphas(data['alphas']['stored_for_ensemble'])
-        # Ensembles not fully implemented yet, but structure is there
-        
-        # Restore Environment
         game.environment = data['environment']
-        
+        game.events_queue = restored["events_queue"]
+        game.message_log = data.get('message_log', game.message_log)
+        game.action_count = data.get('action_count', 0)
         return game
 
     @staticmethod
-    def list_saves():
-        os.makedirs("saves", exist_ok=True)
-        saves = []
-        for fname in os.listdir("saves"):
-            if fname.endswith(".json"):
-                saves.append(fname.replace(".json", ""))
-        saves.sort()
-        return saves
+    def list_saves(directory=SAVE_DIR):
+        return [slot["name"] for slot in GameState.save_slots(directory=directory)[1]]
+
+    @staticmethod
+    def save_slots(sort="name", descending=False, offset=0, limit=None, directory=SAVE_DIR):
+        """`(total, page)` of save slot entries (week, year, AUM, level, size...) from the save manifest."""
+        return manifest.slots(directory, sort, descending, offset, limit)
+
+    def perform(self, action, on_week=None):
+        """Apply one client action, e.g. `{"type": "hire_quant", "name": ..., ...}`.
+
+        Returns the response fields for it (a response with "game_data" is sent
+        without the state), or None for an unknown type. Only the action and the
+        random stream decide the outcome, so journals can replay it exactly.
+        `on_week` is passed on to `advance()`.
+        """
+        action_type = action.get('type')
+        if action_type == 'next_turn':
+            response = {"status": "ok", "weeks": self.advance(action.get('weeks', 1), on_week=on_week)}
+        elif action_type == 'hire_quant':
+            success, message = self.hire_quant(action['name'], action['skill'], action['salary'])
+            response = {"status": "ok" if success else "error", "message": message}
+        elif action_type == 'start_research':
+            self.start_research(action['style'], action['duration'])
+            response = {"status": "ok"}
+        elif action_type == 'upgrade_infra':
+            self.upgrade_infra(action['infra_type'])
+            response = {"status": "ok"}
+        elif action_type == 'update_portfolio':
+            self.update_portfolio(action['positions'])
+            response = {"status": "ok"}
+        elif action_type == 'clear_event':
+            self.clear_event()
+            response = {"status": "ok"}
+        elif action_type == 'handle_infra_request':
+            effect = action.get('effect', {})
+            response = {"status": "ok", "message": self.handle_infra_request(effect.get('type'), effect.get('infra'))}
+        elif action_type == 'handle_reset_offer':
+            response = {"status": "ok", "message": self.handle_reset_offer(action.get('decision'))}
+        elif action_type == 'start_trivia_game':
+            response = {"status": "ok", "game_data": self.start_market_trivia()}
+        elif action_type == 'submit_trivia_game':
+            response = {"status": "ok", "result": self.submit_market_trivia(action.get('choice'))}
+        elif action_type == 'start_mini_game':
+            response = {"status": "ok", "game_data": self.generate_sharpe_challenge()}
+        elif action_type == 'submit_mini_game':
+            response = {"status": "ok", "result": self.submit_sharpe_guess(action['guess'])}
+        elif action_type == 'start_mm_game':
+            response = {"status": "ok", "game_data": self.start_market_making()}
+        elif action_type == 'submit_mm_action':
+            response = {"status": "ok", "result": self.submit_market_making(action['spread'])}
+        elif action_type == 'hire_infra':
+            success, message = self.hire_infra_specialist(action.get('name', ''), int(action.get('skill', 50)))
+            response = {"status": "ok" if success else "error", "message": message}
+        elif action_type == 'fire_staff':
+            success, message = self.fire_staff(action.get('staff_type'), action.get('name'))
+            response = {"status": "ok" if success else "error", "message": message}
+        else:
+            return None
+        self.action_count += 1
+        return response
 
     def restart(self):
+        timer = self.phase_timer  # keeps collecting across the restart if enabled
         self.__init__()
+        self.phase_timer = timer
         self.process_start_of_week()
 
+    def memory_report(self):
+        """Approximate bytes held per subsystem (log, events, PnL history, alphas, team, state cache, ...)."""
+        return memory.report(self)
+
+    def phase_report(self):
+        """Calls, total time and rolling percentiles/histogram per weekly turn phase.
+
+        Empty until timing is switched on with `phase_timer.enabled = True`.
+        """
+        return self.phase_timer.report()
+
+    def advance(self, weeks=1, stop_on=BLOCKING_EVENTS, on_week=None):
+        """Play up to `weeks` turns back to back.
+
+        Stops early once one of these turns queues an event whose title is in
+        `stop_on`; events already waiting when it is called do not stop it.
+        Returns one compact summary dict per week played; `on_week` is called
+        with each one as soon as its week is done.
+        """
+        summary = []
+        pending = len(self.events_queue)  # turns only append; clear_event is a separate action
+        for _ in range(max(1, int(weeks))):
+            week, year = self.week, self.year
+            queued = len(self.events_queue)
+            self.process_end_of_week()
+            self.process_start_of_week()
+            summary.append({
+                "week": week,
+                "year": year,
+                "pnl": self.player.pnl_history[-1],
+                "aum": self.player.aum,
+                "cash": self.player.cash,
+                "job_security": self.player.job_security,
+                "regime": self.environment["regime"],
+                "events": [e.title for e in self.events_queue[queued:]],
+            })
+            if on_week is not None:
+                on_week(summary[-1])
+            if any(e.title in stop_on for e in self.events_queue[pending:]):
+                break
+        return summary
+
+    @touches()
     def process_end_of_week(self):
+        timer = self.phase_timer
+        timer.start()
         # Calculate returns
         weekly_pnl = 0.0
         portfolio_value = self.player.aum
-        market_ret = generate_market_return(self.environment["regime"])
+        market_ret = generate_market_return(self.environment["regime"], self.rng)
         hedge_beta_effect = 0 if self.is_market_shielded() else 1
         
-        for position in self.portfolio.positions:
-            alpha = self.get_alpha_by_id(position["alpha_id"])
-            if alpha:
-                alpha_beta = getattr(alpha, "beta", 1.0)
-                ret = simulate_alpha_return(alpha, self.environment["regime"])
-                ret += market_ret * alpha_beta * hedge_beta_effect
-                pnl = portfolio_value * position["weight"] * ret
-                weekly_pnl += pnl
+        book = self.alphas.book
+        if self.portfolio.dirty or book.rows_changed:
+            book.assign_weights(self.portfolio.positions, self.alphas)
+            self.portfolio.dirty = False
+        rows = book.position_rows
+        if rows.size:
+            cols = book.columns
+            ret = simulate_alpha_returns(
+                cols["current_expected_return"][rows],
+                cols["volatility"][rows],
+                cols["style_code"][rows] == AlphaBook.STYLE_CODES["Trend"],
+                self.environment["regime"],
+                self.rng,
+            )
+            ret += market_ret * hedge_beta_effect * cols["beta"][rows]
+            weekly_pnl = float(portfolio_value * np.dot(cols["weight"][rows], ret))
+        timer.lap("returns")
         
         # Update player stats
         self.player.cash += weekly_pnl # Simplified: PnL goes to cash? Or AUM? Usually AUM.
         self.player.aum += weekly_pnl
         self.player.pnl_history.append(weekly_pnl)
         self.player.yearly_pnl += weekly_pnl
+        self.update_performance(weekly_pnl / portfolio_value if portfolio_value > 0 else 0.0)
         # Update drawdowns
         self.update_drawdowns()
         
@@ -313,19 +549,26 @@ class GameState:
             # Calm leadership through choppy weeks helps morale modestly
             self.bump_team_happiness(1, "Team appreciated steady leadership in a tough week.")
             self.player.reputation_management = min(100, self.player.reputation_management + 1)
+        timer.lap("performance")
 
         # Weekly compensation (salaries)
         weekly_pay = self.pay_weekly_salaries()
+        timer.lap("payroll")
         # Annual bonuses at end of week 52
         bonus_pay = self.pay_year_end_bonuses()
+        timer.lap("bonuses")
         # Hiring pipeline and mentoring
         self.process_hiring_pipeline()
         self.process_infra_hiring()
+        timer.lap("hiring")
         self.mentor_quants()
+        timer.lap("mentoring")
         self.management_reaction(weekly_pnl)
+        timer.lap("management")
 
         # Story log for the turn
         self.log_week_story(weekly_pnl, weekly_pay, bonus_pay, market_ret)
+        timer.lap("story")
         
         # Update week
         self.week += 1
@@ -335,11 +578,15 @@ class GameState:
             self.player.yearly_pnl = 0.0
         if self.player.startup_grace_weeks > 0:
             self.player.startup_grace_weeks -= 1
+        timer.lap("calendar")
 
         # Team morale effects (can impact job security)
         self.apply_team_morale_effects()
+        timer.lap("morale")
         self.maybe_team_meeting()
+        timer.lap("meetings")
         self.check_reset_offer()
+        timer.lap("reset_offer")
 
         # Check Win/Loss
         if self.player.job_security <= 0:
@@ -348,19 +595,18 @@ class GameState:
             self.events_queue.append(Event("GAME OVER", "AUM dropped too low. The fund has been shut down.", [{"text": "Restart", "effect": "restart"}]))
         elif self.player.aum > 1_000_000_000:
             self.events_queue.append(Event("YOU WIN!", "You reached $1B AUM! You are a legend.", [{"text": "Continue", "effect": "continue"}]))
+        timer.lap("win_loss")
+        timer.stop()
 
     def get_alpha_by_id(self, alpha_id):
-        for group in self.alphas.values():
-            for alpha in group:
-                if alpha.id == alpha_id:
-                    return alpha
-        return None
+        return self.alphas.get(alpha_id)
 
+    @touches("alphas", "infra")
     def start_research(self, style, duration):
         if style == "RiskModel":
             return self.start_risk_model_research(duration)
         effective_duration = self.calculate_research_duration(duration)
-        new_alpha = AlphaStrategy(f"Alpha {len(self.alphas['in_research']) + len(self.alphas['live']) + 1}", style, effective_duration)
+        new_alpha = AlphaStrategy(f"Alpha {len(self.alphas['in_research']) + len(self.alphas['live']) + 1}", style, effective_duration, alpha_id=self.alphas.new_id())
         new_alpha.base_research_duration = duration
         new_alpha.weeks_remaining = effective_duration
 
@@ -393,9 +639,11 @@ class GameState:
         self.log(f"Risk research started: {project.name} ({effective_duration} weeks).")
         return project
 
+    @touches("team", "player")
     def hire_quant(self, name, skill, salary):
         if not name:
             return False, "Please provide a name."
+        skill, salary = round(skill), round(salary)  # the roster keeps whole numbers
         min_salary = self.minimum_salary_for_skill(skill)
         if salary < min_salary:
             return False, f"Salary too low for skill {skill}. Offer at least ${min_salary:,.0f}."
@@ -405,7 +653,7 @@ class GameState:
         new_quant = Quant(name, skill, salary)
         # Assign random avatar (placeholder for now)
         avatars = ["wizard", "robot", "cat", "alien"]
-        new_quant.avatar = random.choice(avatars)
+        new_quant.avatar = self.choice(avatars)
         new_quant.happiness = min(100, 65 + int((salary - min_salary) / 3000))
         # Hiring pipeline: time depends on skill
         base_weeks = 1 if skill < 40 else 2 if skill < 70 else 4
@@ -420,6 +668,7 @@ class GameState:
         self.log(f"Hiring {name} (Skill {skill}) started. ETA {base_weeks} weeks. Signing bonus ${signing_bonus:,.0f}.")
         return True, "Quant search started"
 
+    @touches("player", "infra", "team")
     def upgrade_infra(self, infra_type):
         cost = 50000
         if self.player.cash < cost:
@@ -428,19 +677,20 @@ class GameState:
         current_level = getattr(self.infrastructure, infra_type)
         setattr(self.infrastructure, infra_type, current_level + 1)
         if self.infra_team:
-            avg_skill = sum(m.skill for m in self.infra_team) / len(self.infra_team)
+            avg_skill = self.infra_team.mean("skill")
             discount = min(0.2, avg_skill / 500)
             refund = int(cost * discount)
             self.player.cash += refund
             self.log(f"Infrastructure squad optimized the spend. Saved ${refund:,.0f}.")
             # Small morale bump to infra team
-            for m in self.infra_team:
-                m.happiness = min(100, m.happiness + 2)
+            self.infra_team.bump("happiness", 2)
         return True
 
+    @touches("team", "player")
     def hire_infra_specialist(self, name, skill):
         if not name:
             return False, "Please provide a name."
+        skill = round(skill)  # the roster keeps whole numbers
         cost = 30000 + int(skill * 1500)
         if self.player.cash < cost:
             return False, "Not enough cash for infra hire."
@@ -457,6 +707,7 @@ class GameState:
         self.log(f"Infra hire started: {name} (Skill {skill}) cost ${cost:,.0f}, ETA {new_member.onboarding_weeks} weeks.")
         return True, "Infra hire started"
 
+    @touches("team", "player")
     def fire_staff(self, staff_type, name):
         if staff_type == "quant":
             target_list = self.team
@@ -474,6 +725,7 @@ class GameState:
         self.log(f"Fired {name} ({staff_type}).")
         return True, "Staff fired"
 
+    @touches("portfolio", "alphas")
     def update_portfolio(self, positions):
         # Validate weights sum <= 1 (or allow leverage? let's stick to 1 for now)
         total_weight = sum(p['weight'] for p in positions)
@@ -488,70 +740,74 @@ class GameState:
         for pos in positions:
             alpha = self.get_alpha_by_id(pos['alpha_id'])
             if alpha and alpha.status == "stored_for_ensemble":
-                alpha.status = "live"
-                self.alphas["stored_for_ensemble"].remove(alpha)
-                self.alphas["live"].append(alpha)
+                self.alphas.move(alpha, "live")
 
+    @touches("events",)
     def clear_event(self):
         if self.events_queue:
             self.events_queue.pop(0)
 
     def apply_team_morale_effects(self):
-        if not self.team:
+        team = self.team
+        if not team:
             return
-        total = 0
-        for quant in self.team:
-            min_salary = self.minimum_salary_for_skill(quant.skill)
-            if quant.salary < min_salary:
-                drop = min(15, 3 + int((min_salary - quant.salary) / 5000))
-                quant.happiness = max(0, quant.happiness - drop)
-                quant.loyalty = max(0, quant.loyalty - drop // 2)
-            else:
-                bump = 1 if quant.happiness < 95 else 0
-                quant.happiness = min(100, quant.happiness + bump)
-                quant.loyalty = min(100, quant.loyalty + bump)
-            if quant.happiness < 25:
-                quant.loyalty = max(0, quant.loyalty - 2)
-            total += quant.happiness
-            if quant.happiness < 40:
-                self.player.reputation_quants = max(0, self.player.reputation_quants - 1)
-            else:
-                self.player.reputation_quants = min(100, self.player.reputation_quants + 0.2)
-
-        avg = total / len(self.team)
+        # Vectorized minimum_salary_for_skill (skills are whole numbers)
+        min_salary = 40_000 + team.values("skill") * 1_200
+        shortfall = min_salary - team.values("salary")
+        underpaid = shortfall > 0
+        drop = np.minimum(15, 3 + np.trunc(shortfall / 5000).astype(np.int64))
+        bump = (~underpaid & (team.values("happiness") < 95)).astype(np.int64)
+        team.bump("happiness", np.where(underpaid, -drop, bump))
+        team.bump("loyalty", np.where(underpaid, -(drop // 2), bump))
+        team.bump("loyalty", np.where(team.values("happiness") < 25, -2, 0))
+        self.update_quant_reputation(team.values("happiness") < 40)
+
+        avg = team.mean("happiness")
         if avg < 35:
             penalty = max(5, int((35 - avg) * 0.8))
             self.player.job_security -= penalty
             self.log(f"Team morale warning: avg happiness {avg:.0f}. Management trust -{penalty}.")
-            if avg < 20 and random.random() < 0.35:
+            if avg < 20 and self.rng.random() < 0.35:
                 revolt_penalty = 20
                 self.player.job_security -= revolt_penalty
                 self.events_queue.append(Event("Desk Revolt", "Unhappy quants escalated to management. You were reprimanded hard. Fix morale or risk termination.", []))
                 self.player.reputation_management = max(0, self.player.reputation_management - 3)
         # Attrition risk: very unhappy quants can leave
-        if avg < 30 and random.random() < 0.2 and self.team:
-            flight_risks = [q for q in self.team if q.happiness < 30]
+        if avg < 30 and self.rng.random() < 0.2 and self.team:
+            flight_risks = [q for q, h in zip(self.team, self.team.values("happiness")) if h < 30]
             if flight_risks:
-                departed = random.choice(flight_risks)
+                departed = self.choice(flight_risks)
                 self.team.remove(departed)
                 self.events_queue.append(Event(
                     "Talent Poached",
                     f"{departed.name} was hired away by a competing fund after prolonged unhappiness. Remaining team is unsettled.",
                     []
                 ))
-                for q in self.team:
-                    q.happiness = max(0, q.happiness - 5)
-                    q.loyalty = max(0, q.loyalty - 3)
+                self.team.bump("happiness", -5)
+                self.team.bump("loyalty", -3)
                 self.log(f"Attrition hit: {departed.name} left for a competitor. Team morale dipped.")
                 self.player.reputation_management = max(0, self.player.reputation_management - 2)
 
+    def update_quant_reputation(self, unhappy):
+        """-1 per unhappy quant and +0.2 per content one, clamped to 0..100 after each."""
+        rep = self.player.reputation_quants
+        n_unhappy = int(unhappy.sum())
+        n_content = len(unhappy) - n_unhappy
+        if rep - n_unhappy >= 0 and rep + 0.2 * n_content <= 100:
+            rep += 0.2 * n_content - n_unhappy
+        else:
+            # Near a bound the clamp order matters, so replay it quant by quant
+            for is_unhappy in unhappy.tolist():
+                rep = max(0, rep - 1) if is_unhappy else min(100, rep + 0.2)
+        self.player.reputation_quants = rep
+
     def resilience_score(self):
         infra = self.infrastructure
         base = 30
         base += (infra.compute_level + infra.data_quality + infra.devops_tooling + infra.risk_tools_level + infra.optimization_tool_level) * 6
         if self.infra_team:
-            avg_skill = sum(m.skill for m in self.infra_team) / len(self.infra_team)
-            avg_happy = sum(m.happiness for m in self.infra_team) / len(self.infra_team)
+            avg_skill = self.infra_team.mean("skill")
+            avg_happy = self.infra_team.mean("happiness")
             base += avg_skill * 0.1
             base += max(0, (avg_happy - 50) * 0.1)
         return max(0, min(100, int(base)))
@@ -588,12 +844,12 @@ class GameState:
         avg_h = self.avg_team_happiness()
         if not self.team or avg_h is None or avg_h < 60:
             return
-        for q in self.team:
-            gain = random.choice([0, 1, 1])
-            if gain:
-                q.skill = min(100, q.skill + gain)
-                if random.random() < 0.4:
-                    q.happiness = min(100, q.happiness + 1)
+        # Two in three quants gain a skill point; 40% of those also cheer up
+        gain_draw, cheer_draw = self.rng.random((2, len(self.team)))
+        gains = gain_draw >= 1 / 3
+        cheer = gains & (cheer_draw < 0.4)
+        self.team.bump("skill", gains.astype(np.int64))
+        self.team.bump("happiness", cheer.astype(np.int64))
 
     def maybe_infra_outage(self):
         res = self.resilience_score()
@@ -601,12 +857,10 @@ class GameState:
         rep_infra = getattr(self.player, "reputation_infra", 50)
         base_chance = 0.18 + max(0, (60 - rep_infra)) * 0.002
         chance = max(0.02, base_chance - (res / 400))
-        if random.random() < chance:
+        if self.rng.random() < chance:
             for alpha in self.alphas["in_research"]:
                 alpha.weeks_remaining += 1
-            if self.infra_team:
-                for m in self.infra_team:
-                    m.happiness = max(0, m.happiness - 1)
+            self.infra_team.bump("happiness", -1)
             self.events_queue.append(Event(
                 "Infra Outage",
                 "A systems outage slowed research by a week. Stronger infra and a happy infra team reduce this risk.",
@@ -615,8 +869,7 @@ class GameState:
             self.log(f"Infra outage hit (resilience {res}). Research delayed.")
 
     def enqueue_infra_request(self):
-        askers = random.sample(self.team, k=min(len(self.team), max(1, len(self.team)//2)))
-        requested = random.choice(["compute_level", "data_quality", "devops_tooling", "risk_tools_level"])
+        requested = self.choice(["compute_level", "data_quality", "devops_tooling", "risk_tools_level"])
         description = f"Team is pushing for {requested.replace('_', ' ')} upgrade to clear blockers."
         choices = [
             {"text": "Approve upgrade", "effect": {"type": "approve_infra", "infra": requested}},
@@ -625,6 +878,7 @@ class GameState:
         ]
         self.events_queue.append(Event("Infrastructure Ask", description, choices))
 
+    @touches("player", "team", "infra")
     def handle_infra_request(self, action, infra):
         if action == "approve_infra":
             if self.upgrade_infra(infra):
@@ -642,21 +896,16 @@ class GameState:
         return "No action"
 
     def avg_team_happiness(self):
-        if not self.team:
-            return None
-        return sum(q.happiness for q in self.team) / len(self.team)
+        return self.team.mean("happiness")
 
     def avg_team_skill(self):
-        if not self.team:
-            return None
-        return sum(q.skill for q in self.team) / len(self.team)
+        return self.team.mean("skill")
 
     def bump_team_happiness(self, delta, reason=None):
         if not self.team or delta == 0:
             return
-        for q in self.team:
-            q.happiness = max(0, min(100, q.happiness + delta))
-            q.loyalty = max(0, min(100, q.loyalty + (delta // 2 if delta > 0 else delta)))
+        self.team.bump("happiness", delta)
+        self.team.bump("loyalty", delta // 2 if delta > 0 else delta)
         if reason:
             self.log(reason)
 
@@ -664,7 +913,7 @@ class GameState:
         """Occasional team/infra sync that depends on morale."""
         if not self.team:
             return
-        if random.random() > 0.25:  # roughly one meeting every ~4 weeks
+        if self.rng.random() > 0.25:  # roughly one meeting every ~4 weeks
             return
         avg = self.avg_team_happiness()
         if avg is None:
@@ -688,8 +937,7 @@ class GameState:
         else:
             hit = 10
             self.player.job_security -= hit
-            for q in self.team:
-                q.loyalty = max(0, q.loyalty - 2)
+            self.team.bump("loyalty", -2)
             self.events_queue.append(Event(
                 "Contentious Town Hall",
                 "Frustrated quants and infra leads argued over priorities. Management noticed the chaos. Job security fell.",
@@ -769,9 +1017,9 @@ class GameState:
     def pay_weekly_salaries(self):
         total = 0
         if self.team:
-            total += sum(q.salary for q in self.team) / 52
+            total += self.team.total("salary") / 52
         if self.infra_team:
-            total += sum(getattr(m, "salary", 80_000) for m in self.infra_team) / 52
+            total += self.infra_team.total("salary") / 52
         if total > 0:
             self.player.cash -= total
             self.player.aum -= total
@@ -785,23 +1033,10 @@ class GameState:
         if self.player.yearly_pnl <= 0:
             self.log("No bonuses paid due to negative or zero yearly PnL.")
             return 0
-        for q in self.team:
-            if q.happiness >= 80:
-                rate = 0.10
-            elif q.happiness >= 50:
-                rate = 0.05
-            else:
-                rate = 0.0
-            bonuses += q.salary * rate
-        for m in self.infra_team:
-            base_salary = getattr(m, "salary", 80_000)
-            if m.happiness >= 80:
-                rate = 0.06
-            elif m.happiness >= 50:
-                rate = 0.03
-            else:
-                rate = 0.0
-            bonuses += base_salary * rate
+        for roster, high, mid in ((self.team, 0.10, 0.05), (self.infra_team, 0.06, 0.03)):
+            h = roster.values("happiness")
+            rates = np.where(h >= 80, high, np.where(h >= 50, mid, 0.0))
+            bonuses += float(np.dot(roster.values("salary"), rates))
         if bonuses > 0:
             self.player.cash -= bonuses
             self.player.aum -= bonuses
@@ -826,6 +1061,10 @@ class GameState:
         story_bits.append(f"Market move {market_ret:.3f}")
         self.log("Story: " + " | ".join(story_bits))
 
+    def update_performance(self, weekly_return):
+        self.performance.push(weekly_return)
+        self.player.rolling_sharpe = self.performance.window(PERFORMANCE_WINDOWS[-1])["sharpe"]
+
     def update_drawdowns(self):
         # Track peak AUM and compute drawdowns
         self.player.peak_aum = max(self.player.peak_aum, self.player.aum)
@@ -881,6 +1120,7 @@ class GameState:
         self.events_queue.append(Event("Competing Hedge Fund Call", desc, choices))
         self.player.reset_offer_active = True
 
+    @touches()
     def handle_reset_offer(self, decision):
         if self.events_queue:
             self.clear_event()
@@ -909,6 +1149,7 @@ class GameState:
         self.player.max_drawdown = 0.0
         self.player.peak_aum = self.player.aum
         self.player.rolling_sharpe = 0.0
+        self.performance = RollingStats(PERFORMANCE_WINDOWS)
         self.player.starting_aum = self.player.aum
 
         # Clean positions and brace for tougher alpha quality
@@ -939,7 +1180,7 @@ class GameState:
     # Mini-game: Guess that Sharpe
     def generate_sharpe_challenge(self):
         from minigames.guess_sharpe import GuessSharpeGame
-        self.active_minigame_instance = GuessSharpeGame(rounds=5)
+        self.active_minigame_instance = GuessSharpeGame(rounds=5, rng=self.spawn_rng())
         game_data = self.active_minigame_instance.start()
 
         self.current_mini_game = {
@@ -950,6 +1191,7 @@ class GameState:
         game_data["leaderboard"] = self.player.minigame_stats.get("guess_sharpe_leaderboard", [])
         return self.current_mini_game["data"]
 
+    @touches("player",)
     def submit_sharpe_guess(self, guess):
         if not hasattr(self, 'active_minigame_instance') or not self.active_minigame_instance:
             return {"error": "No active game"}
@@ -970,7 +1212,7 @@ class GameState:
     # Mini-game: Market Making
     def start_market_making(self):
         from minigames.market_making import MarketMakingGame
-        self.active_minigame_instance = MarketMakingGame()
+        self.active_minigame_instance = MarketMakingGame(rng=self.spawn_rng())
         game_data = self.active_minigame_instance.start()
         
         self.current_mini_game = {
@@ -979,6 +1221,7 @@ class GameState:
         }
         return self.current_mini_game["data"]
 
+    @touches("player",)
     def submit_market_making(self, spread):
         if not hasattr(self, 'active_minigame_instance') or not self.active_minigame_instance:
             return {"error": "No active game"}
@@ -997,9 +1240,17 @@ class GameState:
         return result
 
     # Mini-game: Market Trivia
+    def abandon_minigame(self):
+        """Drop an unfinished mini-game (no XP). True if there was one."""
+        if not self.active_minigame_instance:
+            return False
+        self.active_minigame_instance = None
+        self.current_mini_game = None
+        return True
+
     def start_market_trivia(self):
         from minigames.market_trivia import MarketTriviaGame
-        self.active_minigame_instance = MarketTriviaGame()
+        self.active_minigame_instance = MarketTriviaGame(rng=self.spawn_rng())
         game_data = self.active_minigame_instance.start()
 
         self.current_mini_game = {
@@ -1008,6 +1259,7 @@ class GameState:
         }
         return self.current_mini_game["data"]
 
+    @touches("player",)
     def submit_market_trivia(self, choice_index):
         if not hasattr(self, 'active_minigame_instance') or not self.active_minigame_instance:
             return {"error": "No active game"}
@@ -1029,7 +1281,16 @@ class GameState:
             self.active_minigame_instance = None
         return result
 
-class Player:
+class Player(Record):
+    FIELDS = (
+        "cash", "aum", "pnl_history", "current_drawdown", "max_drawdown", "peak_aum", "rolling_sharpe",
+        "reputation_management", "reputation_risk", "relationship_quants", "job_security",
+        "level", "xp", "xp_to_next_level", "ability_points", "abilities", "reputation_infra",
+        "reputation_quants", "minigame_stats", "yearly_pnl", "startup_grace_weeks", "starting_aum",
+        "alpha_difficulty", "reset_offer_used", "reset_offer_active", "reset_offer_cooldown",
+    )
+    __slots__ = tuple(name for name in FIELDS if name != "pnl_history") + ("_pnl_history",)
+
     def __init__(self):
         self.cash = 1_000_000
         self.aum = 50_000_000
@@ -1085,12 +1346,42 @@ class Player:
         # Keep top 5 by score
         board.sort(key=lambda x: x["score"], reverse=True)
         self.minigame_stats["guess_sharpe_leaderboard"] = board[:5]
-        
-    def to_dict(self):
-        return self.__dict__
 
-class Quant:
+    @property
+    def pnl_history(self):
+        return self._pnl_history
+
+    @pnl_history.setter
+    def pnl_history(self, values):
+        self._pnl_history = PnLHistory(values)
+
+    def to_dict(self, full_history=False):
+        """`pnl_history` is the tiered series unless `full_history`, then every week as a list."""
+        data = self._fields_to_dict()
+        history = self.pnl_history
+        data["pnl_history"] = history.tolist() if full_history else history.tiered()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        player = super().from_dict(data)
+        if "starting_aum" not in data:
+            player.starting_aum = player.aum
+        return player
+
+class Quant(ColumnBacked):
+    FIELDS = ("name", "skill", "happiness", "salary", "workload", "loyalty", "avatar")
+    OPTIONAL_FIELDS = ("onboarding_weeks", "status")
+    INIT_ARGS = ("name", "skill", "salary")
+    COLUMN_FIELDS = TeamRoster.FIELDS
+    __slots__ = ("name", "workload", "avatar") + OPTIONAL_FIELDS
+    skill = ColumnField()
+    happiness = ColumnField()
+    loyalty = ColumnField()
+    salary = ColumnField()
+
     def __init__(self, name, skill, salary):
+        super().__init__()
         self.name = name
         self.skill = skill # 0-100
         self.happiness = 70 # 0-100
@@ -1099,9 +1390,6 @@ class Quant:
         self.loyalty = 50 # 0-100
         self.avatar = "robot" # Default placeholder
 
-    def to_dict(self):
-        return self.__dict__
-
 class Infrastructure:
     def __init__(self):
         self.compute_level = 1
@@ -1122,8 +1410,19 @@ class RiskModel:
     def to_dict(self):
         return self.__dict__
 
-class InfraSpecialist:
-    def __init__(self, name, skill):
+class InfraSpecialist(ColumnBacked):
+    FIELDS = ("name", "skill", "happiness", "loyalty", "role", "salary")
+    OPTIONAL_FIELDS = ("onboarding_weeks", "status")
+    INIT_ARGS = ("name", "skill")
+    COLUMN_FIELDS = TeamRoster.FIELDS
+    __slots__ = ("name", "role") + OPTIONAL_FIELDS
+    skill = ColumnField()
+    happiness = ColumnField()
+    loyalty = ColumnField()
+    salary = ColumnField()
+
+    def __init__(self, name, skill=50):
+        super().__init__()
         self.name = name
         self.skill = skill
         self.happiness = 70
@@ -1131,28 +1430,54 @@ class InfraSpecialist:
         self.role = "Infra"
         self.salary = 80_000
 
-    def to_dict(self):
-        return self.__dict__
+class RiskResearch(Record):
+    FIELDS = ("name", "duration", "weeks_remaining")
+    OPTIONAL_FIELDS = ("base_duration",)
+    INIT_ARGS = ("name", "duration")
+    __slots__ = FIELDS + OPTIONAL_FIELDS
 
-class RiskResearch:
     def __init__(self, name, duration):
         self.name = name
         self.duration = duration
         self.weeks_remaining = duration
 
-    def to_dict(self):
-        return self.__dict__
-
 class Portfolio:
     def __init__(self):
         self.positions = [] # List of dicts {alpha_id, weight}
 
-    def to_dict(self):
-        return self.__dict__
+    @property
+    def positions(self):
+        return self._positions
+
+    @positions.setter
+    def positions(self, positions):
+        # Assign a new list rather than editing in place so the alpha book re-reads the weights
+        self._positions = positions
+        self.dirty = True
 
-class AlphaStrategy:
-    def __init__(self, name, style, duration):
-        self.id = f"alpha_{random.randint(1000,9999)}"
+    def to_dict(self):
+        return {"positions": self.positions}
+
+class AlphaStrategy(ColumnBacked):
+    """An alpha. Its hot numbers live in the registry's AlphaBook; this object is a view on its row."""
+    FIELDS = (
+        "id", "name", "style", "status", "research_duration", "weeks_remaining", "base_expected_return",
+        "current_expected_return", "volatility", "factor_exposures", "capacity", "decay_rate", "beta",
+    )
+    OPTIONAL_FIELDS = ("base_research_duration", "success_prob", "potential_super", "resilience")
+    __slots__ = (
+        "id", "name", "style", "status", "research_duration", "weeks_remaining", "base_expected_return",
+        "factor_exposures", "capacity",
+    ) + OPTIONAL_FIELDS
+    COLUMN_FIELDS = ("current_expected_return", "volatility", "decay_rate", "beta")
+    current_expected_return = ColumnField()
+    volatility = ColumnField()
+    decay_rate = ColumnField()
+    beta = ColumnField()
+
+    def __init__(self, name, style, duration, alpha_id=None):
+        super().__init__()
+        self.id = alpha_id  # assigned by AlphaRegistry when None
         self.name = name
         self.style = style
         self.status = "in_research"
@@ -1170,17 +1495,266 @@ class AlphaStrategy:
         self.current_expected_return *= (1 - self.decay_rate)
         # Regime penalty could be added here
 
-    def to_dict(self):
-        return self.__dict__
+    @classmethod
+    def from_dict(cls, data):
+        alpha = cls(data['name'], data['style'], data['research_duration'], alpha_id=data.get('id'))
+        for key, value in data.items():
+            if key in cls._declared:
+                setattr(alpha, key, value)
+        return alpha
+
+class AlphaBook:
+    """Aligned NumPy columns for the per-alpha numbers the weekly loop works on.
+
+    Each registered alpha owns one row. Freed rows are recycled, and the arrays
+    double in size when full. `weight` mirrors `Portfolio.positions`.
+    """
+    STYLE_CODES = {"Trend": 0, "MeanReversion": 1, "Value": 2}
+    STATUS_CODES = {"in_research": 0, "stored_for_ensemble": 1, "live": 2, "ensembles": 3}
+    EMPTY = -1
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.columns = {
+            "current_expected_return": np.zeros(capacity),
+            "volatility": np.zeros(capacity),
+            "decay_rate": np.zeros(capacity),
+            "beta": np.zeros(capacity),
+            "weight": np.zeros(capacity),
+            "style_code": np.full(capacity, self.EMPTY, dtype=np.int8),
+            "status_code": np.full(capacity, self.EMPTY, dtype=np.int8),
+        }
+        self.size = 0  # rows in use or freed; everything above is untouched
+        self._free = []
+        self.rows_changed = False
+        self.position_rows = np.zeros(0, dtype=np.intp)
+
+    def _grow(self):
+        self.capacity *= 2
+        self.columns = grow_columns(self.columns, self.capacity, {"style_code": self.EMPTY, "status_code": self.EMPTY})
+
+    def set_cell(self, name, row, value):
+        self.columns[name][row] = value
+
+    def attach(self, alpha, status):
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+        for name in AlphaStrategy.COLUMN_FIELDS:
+            self.columns[name][row] = alpha._local[name]
+        alpha._local = None
+        self.columns["style_code"][row] = self.STYLE_CODES.get(alpha.style, self.EMPTY)
+        self.columns["status_code"][row] = self.STATUS_CODES[status]
+        alpha._store, alpha._row = self, row
+        self.rows_changed = True
+
+    def detach(self, alpha):
+        row = alpha._row
+        alpha._local = {name: self.columns[name][row].item() for name in AlphaStrategy.COLUMN_FIELDS}
+        alpha._store = alpha._row = None
+        self.columns["weight"][row] = 0.0
+        self.columns["status_code"][row] = self.EMPTY
+        self._free.append(row)
+        self.rows_changed = True
+
+    def set_status(self, alpha, status):
+        self.columns["status_code"][alpha._row] = self.STATUS_CODES[status]
+
+    def assign_weights(self, positions, registry):
+        weight = self.columns["weight"]
+        weight[:] = 0.0
+        for position in positions:
+            alpha = registry.get(position["alpha_id"])
+            if alpha is not None:
+                weight[alpha._row] += position["weight"]
+        self.position_rows = np.flatnonzero(weight[:self.size])
+        self.rows_changed = False
+
+    def decay(self):
+        """One weekly decay step for every live and stored alpha."""
+        n = self.size
+        status = self.columns["status_code"][:n]
+        keep = (status == self.STATUS_CODES["live"]) | (status == self.STATUS_CODES["stored_for_ensemble"])
+        er = self.columns["current_expected_return"][:n]
+        np.multiply(er, 1 - self.columns["decay_rate"][:n], out=er, where=keep)
+
+class AlphaBucket:
+    """Insertion-ordered set of alphas with one status; behaves like the list it replaced."""
+    def __init__(self, registry, status):
+        self._registry = registry
+        self.status = status
+        self._alphas = {}  # id -> alpha
+
+    def append(self, alpha):
+        self._registry.add(alpha, self.status)
+
+    def remove(self, alpha):
+        if self._alphas.get(alpha.id) is not alpha:
+            raise ValueError(f"{alpha.id} is not {self.status}")
+        self._registry.discard(alpha)
+
+    def clear(self):
+        for alpha in list(self):
+            self._registry.discard(alpha)
+
+    def __contains__(self, alpha):
+        return self._alphas.get(getattr(alpha, "id", None)) is alpha
+
+    def __iter__(self):
+        return iter(list(self._alphas.values()))
+
+    def __len__(self):
+        return len(self._alphas)
+
+    def __getitem__(self, index):
+        return list(self._alphas.values())[index]
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"AlphaBucket({self.status!r}, {list(self._alphas)})"
+
+def _renumber_duplicate_alphas(groups, positions, registry):
+    """Give fresh ids to restored alphas whose id was already taken.
+
+    Saves from before the registry drew random ids, which could collide. The
+    old id lookup found the first alpha with it, so that one keeps the id and
+    the first position naming it; each repeat takes the id's next position.
+    """
+    alphas = [alpha for group in groups for alpha in group if alpha.id is not None]
+    for alpha in alphas:
+        registry.reserve_id(alpha.id)
+    unclaimed = {}
+    for position in positions:
+        unclaimed.setdefault(position["alpha_id"], []).append(position)
+    seen = set()
+    for alpha in alphas:
+        if alpha.id not in seen:
+            seen.add(alpha.id)
+            claimed = unclaimed.get(alpha.id)
+            if claimed:
+                claimed.pop(0)
+            continue
+        claimed = unclaimed.get(alpha.id)
+        alpha.id = registry.new_id()
+        if claimed:
+            claimed.pop(0)["alpha_id"] = alpha.id
+
+
+class AlphaRegistry:
+    """All alphas of a fund: an id index plus one bucket per status.
+
+    Lookups and status moves are O(1). Ids are handed out in increasing order
+    (`alpha_1`, `alpha_2`, ...) and never reused.
+    """
+    STATUSES = ("live", "in_research", "stored_for_ensemble", "ensembles")
+
+    def __init__(self):
+        self._by_id = {}  # id -> (alpha, bucket)
+        self._buckets = {status: AlphaBucket(self, status) for status in self.STATUSES}
+        self.book = AlphaBook()
+        self.next_id = 1
+
+    def new_id(self):
+        alpha_id = f"alpha_{self.next_id}"
+        self.next_id += 1
+        return alpha_id
+
+    def reserve_id(self, alpha_id):
+        """Keep `new_id()` from handing out `alpha_id` (an id from elsewhere, e.g. a save)."""
+        suffix = alpha_id.rpartition("_")[2]
+        if suffix.isdigit():
+            self.next_id = max(self.next_id, int(suffix) + 1)
+
+    def add(self, alpha, status):
+        if alpha.id is None:
+            alpha.id = self.new_id()
+        else:
+            entry = self._by_id.get(alpha.id)
+            if entry is not None and entry[0] is not alpha:
+                raise ValueError(f"Duplicate alpha id {alpha.id}")
+            self.reserve_id(alpha.id)
+        entry = self._by_id.pop(alpha.id, None)
+        if entry is not None:
+            del entry[1]._alphas[alpha.id]
+        if alpha._store is not None and alpha._store is not self.book:
+            alpha._store.detach(alpha)
+        if alpha._store is None:
+            self.book.attach(alpha, status)
+        else:
+            self.book.set_status(alpha, status)
+        bucket = self._buckets[status]
+        bucket._alphas[alpha.id] = alpha
+        self._by_id[alpha.id] = (alpha, bucket)
+
+    def discard(self, alpha):
+        entry = self._by_id.pop(alpha.id, None)
+        if entry is not None:
+            del entry[1]._alphas[alpha.id]
+            self.book.detach(alpha)
+
+    def move(self, alpha, status):
+        alpha.status = status
+        self.add(alpha, status)
+
+    def get(self, alpha_id):
+        entry = self._by_id.get(alpha_id)
+        return entry[0] if entry else None
+
+    def __getitem__(self, status):
+        return self._buckets[status]
+
+    def __setitem__(self, status, alphas):
+        bucket = self._buckets[status]
+        bucket.clear()
+        for alpha in alphas:
+            bucket.append(alpha)
+
+    def __iter__(self):
+        return iter(self.STATUSES)
+
+    def keys(self):
+        return self._buckets.keys()
+
+    def values(self):
+        return self._buckets.values()
+
+    def items(self):
+        return self._buckets.items()
+
+class Event(Record):
+    FIELDS = ("title", "description", "choices")
+    INIT_ARGS = FIELDS
+    __slots__ = FIELDS
 
-class Event:
     def __init__(self, title, description, choices):
         self.title = title
         self.description = description
         self.choices = choices # List of dicts {text, effect_code}
 
-    def to_dict(self):
-        return self.__dict__
+SAVE_RECORDS = {
+    "team": Quant,
+    "pending_hires": Quant,
+    "infra_team": InfraSpecialist,
+    "pending_infra": InfraSpecialist,
+    "risk_research": RiskResearch,
+    "events_queue": Event,
+    **{f"alphas/{status}": AlphaStrategy for status in AlphaRegistry.STATUSES},
+}
 
 # Import utils at the end to avoid circular imports if any (though here it's fine)
-from utils import simulate_alpha_return, generate_market_return
+from history import PnLHistory
+from performance import RollingStats
+from rng import RandomStream
+from utils import simulate_alpha_returns, generate_market_return
@@ -0,0 +1,99 @@
+import numpy as np
+
+
+class PnLHistory:
+    """Weekly PnL in a growable float64 array, with monthly and yearly sums alongside.
+
+    Months are 4-week blocks and years 52-week blocks, counted from the first
+    week, so a bucket never changes once it is complete. `tiered()` serves
+    recent weeks as-is and older history as monthly, then yearly, totals;
+    its size grows by about one point a year however long the game runs.
+    Behaves like the list of floats it replaced (append, len, indexing,
+    iteration, equality).
+    """
+    WEEKS_PER_MONTH = 4
+    WEEKS_PER_YEAR = 52
+
+    def __init__(self, values=(), capacity=64):
+        values = np.fromiter(values, dtype=np.float64) if not isinstance(values, np.ndarray) else values.astype(np.float64)
+        n = len(values)
+        self._weeks = np.zeros(max(capacity, n))
+        self._weeks[:n] = values
+        # bincount adds weights in order, matching the sums append() would build
+        weeks = np.arange(n)
+        self._months = self._sums(weeks // self.WEEKS_PER_MONTH, values, len(self._weeks) // self.WEEKS_PER_MONTH + 1)
+        self._years = self._sums(weeks // self.WEEKS_PER_YEAR, values, len(self._weeks) // self.WEEKS_PER_YEAR + 1)
+        self._n = n
+
+    @staticmethod
+    def _sums(buckets, values, size):
+        return np.bincount(buckets, weights=values, minlength=max(1, size)).astype(np.float64)
+
+    def append(self, pnl):
+        n = self._n
+        if n == len(self._weeks):
+            self._weeks = self._grown(self._weeks)
+        month, year = n // self.WEEKS_PER_MONTH, n // self.WEEKS_PER_YEAR
+        if month == len(self._months):
+            self._months = self._grown(self._months)
+        if year == len(self._years):
+            self._years = self._grown(self._years)
+        self._weeks[n] = pnl
+        self._months[month] += pnl
+        self._years[year] += pnl
+        self._n = n + 1
+
+    @staticmethod
+    def _grown(array):
+        grown = np.zeros(len(array) * 2)
+        grown[:len(array)] = array
+        return grown
+
+    def values(self):
+        """Read-only view of every weekly value."""
+        view = self._weeks[:self._n]
+        view.flags.writeable = False
+        return view
+
+    def tolist(self):
+        return self._weeks[:self._n].tolist()
+
+    def tiered(self, weekly_points=52, monthly_points=24):
+        """Bounded series: the last ~`weekly_points` weeks, then months, then whole years.
+
+        Returned as parallel lists `start` (0-based first week), `weeks`
+        (bucket length) and `pnl` (bucket total) plus `total_weeks`. Tier
+        boundaries fall on month/year edges so buckets stay stable from one
+        week to the next.
+        """
+        n, per_month, per_year = self._n, self.WEEKS_PER_MONTH, self.WEEKS_PER_YEAR
+        week_start = max(0, n - weekly_points) // per_month * per_month
+        month_start = max(0, week_start - monthly_points * per_month) // per_year * per_year
+        starts, spans, pnl = [], [], []
+        for tier_start, tier_end, size, sums in (
+            (0, month_start, per_year, self._years),
+            (month_start, week_start, per_month, self._months),
+        ):
+            first, last = tier_start // size, tier_end // size
+            starts.extend(range(tier_start, tier_end, size))
+            spans.extend([size] * (last - first))
+            pnl.extend(sums[first:last].tolist())
+        starts.extend(range(week_start, n))
+        spans.extend([1] * (n - week_start))
+        pnl.extend(self._weeks[week_start:n].tolist())
+        return {"total_weeks": n, "start": starts, "weeks": spans, "pnl": pnl}
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        return self._weeks[:self._n][index].tolist()
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other):
+        return self.tolist() == list(other)
+
+    def __repr__(self):
+        return f"PnLHistory({self._n} weeks)"
@@ -0,0 +1,173 @@
+"""Append-only action journal: per-turn persistence for a save slot.
+
+A slot is a snapshot (the regular `saves/<name>.npz`) plus
+`saves/<name>.journal`, a JSON-lines file of every action applied since.
+The first line identifies the game (`seed`) and the snapshot's
+`action_count`; each further line is one action with its sequence number
+and the random stream position it started from:
+
+    {"journal": 1, "seed": 123, "base": 40}
+    {"seq": 41, "rng": {...}, "action": {"type": "next_turn", "weeks": 1}}
+
+Recording an action costs one appended line. Every `snapshot_every`
+weeks a new snapshot is written and the journal is compacted to the
+actions after it. `replay` reapplies the tail on load and checks the
+stream position before each action, so a replay is exact or fails loudly.
+"""
+import json
+import os
+import threading
+
+import savefile
+
+FORMAT_VERSION = 1
+SNAPSHOT_EVERY_WEEKS = 13
+
+
+def _absolute_week(game):
+    return (game.year - 1) * 52 + game.week
+
+
+def _read(path):
+    with open(path, "r") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("journal") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a pm-sim journal")
+    return lines[0], lines[1:]
+
+
+def replay(game, path):
+    """Apply the actions journaled at `path` that `game` (loaded from the snapshot) has not seen yet.
+
+    A journal written for another game (different seed) is ignored. Returns
+    the number of actions replayed.
+    """
+    if not os.path.exists(path):
+        return 0
+    header, entries = _read(path)
+    if header["seed"] != game.seed:
+        return 0
+    replayed = 0
+    for entry in entries:
+        if entry["seq"] <= game.action_count:
+            continue  # already in the snapshot
+        if entry["seq"] != game.action_count + 1 or entry["rng"] != game.rng_state():
+            raise ValueError(f"Journal {path} diverged from its snapshot at action {entry['seq']}")
+        game.perform(entry["action"])
+        replayed += 1
+    return replayed
+
+
+class ActionJournal:
+    """Records the actions applied to a game so the slot `name` can be restored to the latest one.
+
+    Apply actions through `perform()` instead of `GameState.perform()`.
+    Call `snapshot()` whenever the game is replaced (load, restart) so the
+    journal starts over from it. With an `autosave.AutosaveWriter`,
+    snapshots are written in the background and the journal is compacted
+    once they are on disk; until then the entries they cover are kept.
+    Likewise, after a replacement the journal file keeps describing the old
+    snapshot until the new game's first snapshot is on disk; the new game's
+    actions are held in memory until then.
+    """
+
+    def __init__(self, name, snapshot_every=SNAPSHOT_EVERY_WEEKS, writer=None, directory="saves"):
+        from game_engine import GameState
+        self.name = name
+        self.directory = directory
+        self.path = GameState.save_path(name, ".journal", directory)
+        self.snapshot_every = snapshot_every
+        self.writer = writer
+        self._lock = threading.Lock()
+        self._file = None
+        self._game = None
+        self._game_seed = None
+        self._timeline = 0  # bumped when the game is replaced, so older snapshots' callbacks stand down
+        self._held = None  # (seq, line) entries of a new game whose first snapshot is not on disk yet
+        self._closed = False
+        self._snapshot_week = None
+
+    def perform(self, game, action, on_week=None):
+        """`game.perform(action, on_week)`, journaled; snapshots once `snapshot_every` weeks have passed."""
+        if game is not self._game or game.seed != self._game_seed:
+            self.snapshot(game)
+        rng = game.rng_state()
+        encoded = json.dumps(action)  # before perform(), which may edit the action (portfolio weights)
+        response = game.perform(action, on_week=on_week)
+        if response is None:
+            return None
+        line = f'{{"seq": {game.action_count}, "rng": {json.dumps(rng)}, "action": {encoded}}}\n'
+        with self._lock:
+            if self._held is not None:
+                self._held.append((game.action_count, line))
+            else:
+                self._file.write(line)
+                self._file.flush()
+        if _absolute_week(game) - self._snapshot_week >= self.snapshot_every and not game.active_minigame_instance:
+            self.snapshot(game)
+        return response
+
+    def snapshot(self, game):
+        """Save `game` to the slot, then compact the journal to the actions after it."""
+        seed, base = game.seed, game.action_count
+        if game is not self._game or seed != self._game_seed:
+            # Another game or timeline: nothing journaled so far applies to it
+            with self._lock:
+                self._timeline += 1
+                self._held = []
+            self._game, self._game_seed = game, seed
+        self._snapshot_week = _absolute_week(game)
+        timeline = self._timeline
+        if self.writer is None:
+            game.save(self.name, directory=self.directory)
+            self._written(timeline, seed, base)
+        else:
+            self.writer.submit(game, self.name, on_written=lambda: self._written(timeline, seed, base),
+                               directory=self.directory)
+
+    def _written(self, timeline, seed, base):
+        """A snapshot at action `base` is on disk: start the journal over from it."""
+        with self._lock:
+            if timeline != self._timeline:
+                return  # the game was replaced while this snapshot was being written
+            if self._held is not None:
+                lines = [line for seq, line in self._held if seq > base]
+                self._held = None
+            else:
+                if self._file is not None:
+                    self._file.flush()
+                _, entries = _read(self.path)
+                lines = [json.dumps(entry) + "\n" for entry in entries if entry["seq"] > base]
+            self._rewrite(seed, base, lines)
+
+    def _rewrite(self, seed, base, lines):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        header = {"journal": FORMAT_VERSION, "seed": seed, "base": base}
+        with savefile.atomic_open(self.path, "w") as f:
+            f.write(json.dumps(header) + "\n")
+            f.writelines(lines)
+        if not self._closed:
+            self._file = open(self.path, "a")
+
+    def __len__(self):
+        """Actions journaled since the last snapshot."""
+        with self._lock:
+            if self._held is not None:
+                return len(self._held)
+            if self._file is not None:
+                self._file.flush()
+            if not os.path.exists(self.path):
+                return 0
+            return len(_read(self.path)[1])
+
+    def close(self):
+        """Stop journaling; a snapshot still being written still updates the journal but does not reopen it."""
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._game = self._game_seed = None
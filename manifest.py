@@ -0,0 +1,104 @@
+"""Save slot index (`saves/.manifest.json`).
+
+Every save updates one entry per slot with what the load menu shows, so
+listing slots never opens the save files themselves. The index is kept in
+memory and only re-read when the file changes on disk. If it is missing,
+it is rebuilt once from the save files.
+"""
+import json
+import os
+import threading
+import time
+
+import savefile
+
+MANIFEST = ".manifest.json"  # slot names cannot contain dots, so this never clashes with a save
+SORT_KEYS = ("name", "saved_at", "week", "aum", "level", "size")  # "week" is progress: year, then week
+_lock = threading.Lock()
+_cache = {}  # manifest path -> (mtime_ns, {name: entry})
+
+
+def _entry(name, filename, document, format):
+    player = document.get("player", {})
+    return {
+        "name": name,
+        "saved_at": round(os.path.getmtime(filename), 3),
+        "week": document.get("week"),
+        "year": document.get("year"),
+        "aum": player.get("aum"),
+        "level": player.get("level"),
+        "size": os.path.getsize(filename),
+        "format": format,
+        "format_version": savefile.FORMAT_VERSION if format == "binary" else None,
+    }
+
+
+def _sort_value(entry, sort):
+    if sort == "week":
+        year, week = entry.get("year"), entry.get("week")
+        return None if year is None or week is None else (year, week)
+    return entry[sort]
+
+
+def _scan(directory):
+    """Entries for every save file in `directory`, newest file per slot."""
+    entries = {}
+    for fname in sorted(os.listdir(directory), key=lambda f: os.path.getmtime(os.path.join(directory, f))):
+        name, ext = os.path.splitext(fname)
+        filename = os.path.join(directory, fname)
+        try:
+            if ext == ".npz":
+                entries[name] = _entry(name, filename, savefile.read(filename), "binary")
+            elif ext == ".json" and fname != MANIFEST:
+                with open(filename, "r") as f:
+                    entries[name] = _entry(name, filename, json.load(f), "json")
+        except (OSError, ValueError, KeyError):
+            continue  # unreadable save: leave it out of the menu
+    return entries
+
+
+def _load(directory):
+    path = os.path.join(directory, MANIFEST)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        os.makedirs(directory, exist_ok=True)
+        entries = _scan(directory)
+        _store(directory, entries)
+        return entries
+    cached = _cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "r") as f:
+            cached = (mtime, {entry["name"]: entry for entry in json.load(f)["slots"]})
+        _cache[path] = cached
+    return cached[1]
+
+
+def _store(directory, entries):
+    path = os.path.join(directory, MANIFEST)
+    with savefile.atomic_open(path, "w") as f:
+        json.dump({"updated_at": time.time(), "slots": list(entries.values())}, f)
+    _cache[path] = (os.stat(path).st_mtime_ns, entries)
+
+
+def record(directory, name, filename, document, format):
+    """Note that slot `name` was just written to `filename`."""
+    with _lock:
+        entries = dict(_load(directory))
+        entries[name] = _entry(name, filename, document, format)
+        _store(directory, entries)
+
+
+def slots(directory, sort="name", descending=False, offset=0, limit=None):
+    """`(total, page)`: one page of slot entries sorted by `sort` (one of SORT_KEYS)."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Cannot sort saves by '{sort}'")
+    with _lock:
+        entries = list(_load(directory).values())
+    # Missing values (e.g. an old save without a level) sort last either way
+    present = [e for e in entries if _sort_value(e, sort) is not None]
+    missing = [e for e in entries if _sort_value(e, sort) is None]
+    present.sort(key=lambda e: (_sort_value(e, sort), e["name"]), reverse=descending)
+    ordered = present + sorted(missing, key=lambda e: e["name"])
+    end = None if limit is None else offset + limit
+    return len(ordered), ordered[offset:end]
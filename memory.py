@@ -0,0 +1,144 @@
+"""Memory accounting for games, and tracemalloc snapshot diffs for soak runs.
+
+`report(game)` walks the objects a `GameState` holds and adds up
+`sys.getsizeof` per subsystem. An object reachable from several
+subsystems is counted once, for the first one listed in `SUBSYSTEMS`.
+NumPy arrays count their buffers. Code, classes and modules are shared
+by every game and are skipped. The numbers are estimates; they are meant
+for comparing subsystems and watching growth, not for exact totals.
+"""
+import sys
+import threading
+import tracemalloc
+import types
+from collections import deque
+
+import numpy as np
+
+# Subsystem -> attribute paths on the game; whatever else the game holds is reported as "other"
+SUBSYSTEMS = {
+    "message_log": ("message_log",),
+    "events_queue": ("events_queue",),
+    "pnl_history": ("player._pnl_history",),
+    "performance": ("performance",),
+    "alphas": ("alphas", "portfolio"),
+    "team": ("_team", "_infra_team", "pending_hires", "pending_infra"),
+    "research": ("risk_research", "risk_model"),
+    "minigames": ("active_minigame_instance", "player.minigame_stats"),
+    "state_cache": ("_state_cache",),
+    "rng": ("rng", "_seed_seq"),
+    "player": ("player",),
+}
+_SKIP = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType,
+         types.CodeType, types.FrameType)
+MAX_SNAPSHOTS = 8
+TRACE_FRAMES = 10
+
+
+def _attribute(obj, path):
+    for name in path.split("."):
+        obj = getattr(obj, name, None)
+    return obj
+
+
+def deep_sizeof(obj, seen):
+    """Bytes held by `obj` and everything it references that is not in `seen` (ids; updated)."""
+    total = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIP) or obj is None:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)  # includes an array's own buffer
+        if isinstance(obj, (str, bytes, int, float, bool)):
+            continue
+        if isinstance(obj, np.ndarray):
+            if obj.base is not None:
+                stack.append(obj.base)
+            if obj.dtype == object:
+                stack.extend(obj.ravel())
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        if hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if name not in ("__dict__", "__weakref__"):
+                    stack.append(getattr(obj, name, None))
+    return total
+
+
+def report(game):
+    """`{"total_bytes", "subsystems": {name: bytes}}` for one game, largest subsystem first."""
+    seen = set()
+    sizes = {name: sum(deep_sizeof(_attribute(game, path), seen) for path in paths)
+             for name, paths in SUBSYSTEMS.items()}
+    sizes["other"] = deep_sizeof(game, seen)
+    return {
+        "total_bytes": sum(sizes.values()),
+        "subsystems": dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+class TraceSnapshots:
+    """Numbered tracemalloc snapshots (the last MAX_SNAPSHOTS) and the differences between them.
+
+    Tracing starts with the first snapshot (if it is not already on) and
+    covers the whole process, not one session. Allocations made before
+    then are not seen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}  # id -> tracemalloc.Snapshot, oldest first
+        self._next_id = 1
+
+    def take(self):
+        """Take a snapshot; returns its id."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        with self._lock:
+            snapshot_id = self._next_id
+            self._next_id += 1
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                del self._snapshots[next(iter(self._snapshots))]
+        return snapshot_id
+
+    def diff(self, first, second=None, top=25, group_by="lineno"):
+        """The `top` allocation sites by growth from snapshot `first` to `second` (default: a new snapshot)."""
+        if second is None:
+            second = self.take()
+        with self._lock:
+            try:
+                old, new = self._snapshots[first], self._snapshots[second]
+            except KeyError as exc:
+                raise ValueError(f"No snapshot {exc.args[0]} (only the last {MAX_SNAPSHOTS} are kept)") from None
+        stats = new.compare_to(old, group_by)
+        return {
+            "from": first,
+            "to": second,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "top": [{
+                "site": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff,
+            } for stat in stats[:top]],
+        }
+
+    def stop(self):
+        """Stop tracing and drop the snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+        tracemalloc.stop()
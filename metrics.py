@@ -0,0 +1,119 @@
+"""Request latency, payload size and error counters in Prometheus text format.
+
+Requests are labelled by `endpoint` and, for `/api/action`, by action
+`type`. Latency and size are cumulative Prometheus histograms. Latency is
+also a summary with p50/p95/p99 over the last `window` requests per
+label set, which makes a regression easy to see without a query engine.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)  # bytes
+QUANTILES = (0.5, 0.95, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {_number(self.sum)}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+class _Series:
+    __slots__ = ("latency", "size", "recent", "errors")
+
+    def __init__(self, window):
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.size = _Histogram(SIZE_BUCKETS)
+        self.recent = deque(maxlen=window)
+        self.errors = 0
+
+
+class RequestMetrics:
+    def __init__(self, window=1024):
+        self.window = window
+        self._lock = threading.Lock()
+        self._series = {}  # (endpoint, action) -> _Series
+
+    def observe(self, endpoint, action, seconds, size, error=False):
+        """Record one request: its latency in seconds, response size in bytes and whether it failed."""
+        with self._lock:
+            series = self._series.get((endpoint, action))
+            if series is None:
+                series = self._series[(endpoint, action)] = _Series(self.window)
+            series.latency.observe(seconds)
+            series.size.observe(size)
+            series.recent.append(seconds)
+            series.errors += bool(error)
+
+    def render(self, extra=()):
+        """Prometheus exposition text; `extra` adds `(name, type, help, value)` metrics (e.g. session counts)."""
+        with self._lock:
+            return self._render(sorted(self._series.items()), extra)
+
+    def _render(self, series, extra):
+        out = [
+            "# HELP pm_sim_request_duration_seconds Request latency.",
+            "# TYPE pm_sim_request_duration_seconds histogram",
+        ]
+        for (endpoint, action), entry in series:
+            out.extend(entry.latency.lines("pm_sim_request_duration_seconds", _labels(endpoint=endpoint, action=action)))
+        out += [
+            f"# HELP pm_sim_request_latency_seconds Request latency quantiles over the last {self.window} requests.",
+            "# TYPE pm_sim_request_latency_seconds summary",
+        ]
+        for (endpoint, action), entry in series:
+            labels = _labels(endpoint=endpoint, action=action)
+            for q, value in zip(QUANTILES, np.quantile(entry.recent, QUANTILES).tolist()):
+                out.append(f'pm_sim_request_latency_seconds{{{labels},quantile="{q}"}} {_number(value)}')
+            out.append(f"pm_sim_request_latency_seconds_sum{{{labels}}} {_number(entry.latency.sum)}")
+            out.append(f"pm_sim_request_latency_seconds_count{{{labels}}} {entry.latency.count}")
+        out += [
+            "# HELP pm_sim_response_size_bytes Response payload size.",
+            "# TYPE pm_sim_response_size_bytes histogram",
+        ]
+        for (endpoint, action), entry in series:
+            out.extend(entry.size.lines("pm_sim_response_size_bytes", _labels(endpoint=endpoint, action=action)))
+        out += [
+            "# HELP pm_sim_request_errors_total Requests that failed (HTTP error or an error status).",
+            "# TYPE pm_sim_request_errors_total counter",
+        ]
+        for (endpoint, action), entry in series:
+            out.append(f"pm_sim_request_errors_total{{{_labels(endpoint=endpoint, action=action)}}} {entry.errors}")
+        for name, type, help, value in extra:
+            out += [f"# HELP {name} {help}", f"# TYPE {name} {type}", f"{name} {_number(value)}"]
+        return "\n".join(out) + "\n"
@@ -1,9 +1,9 @@
-import random
 import numpy as np
 
 class GuessSharpeGame:
-    def __init__(self, rounds=5):
+    def __init__(self, rounds=5, rng=None):
         self.type = "guess_sharpe"
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.total_rounds = rounds
         self.current_round = 0
         self.score = 0
@@ -12,25 +12,23 @@ class GuessSharpeGame:
 
     def _generate_round(self):
         weeks = 52
-        scenario = random.choices(
-            ["positive", "negative", "flat"],
-            weights=[0.6, 0.25, 0.15],
-            k=1
-        )[0]
+        scenario = ["positive", "negative", "flat"][
+            self.rng.choice(3, p=[0.6, 0.25, 0.15])
+        ]
 
-        vol = random.uniform(0.10, 0.22)
+        vol = self.rng.uniform(0.10, 0.22)
         if scenario == "flat":
             true_sharpe = 0.0
-            vol = random.uniform(0.04, 0.12)
-            mean_ret = random.uniform(-0.0005, 0.0005)
+            vol = self.rng.uniform(0.04, 0.12)
+            mean_ret = self.rng.uniform(-0.0005, 0.0005)
         elif scenario == "negative":
-            true_sharpe = random.uniform(-1.5, -0.25)
+            true_sharpe = self.rng.uniform(-1.5, -0.25)
             mean_ret = true_sharpe * vol / np.sqrt(52)
         else:
-            true_sharpe = random.uniform(0.35, 2.5)
+            true_sharpe = self.rng.uniform(0.35, 2.5)
             mean_ret = true_sharpe * vol / np.sqrt(52)
 
-        returns = np.random.normal(mean_ret, vol / np.sqrt(52), weeks)
+        returns = self.rng.normal(mean_ret, vol / np.sqrt(52), weeks)
         cumulative_returns = np.cumprod(1 + returns) - 1
 
         # Nudge paths to reflect the intended scenario
@@ -1,9 +1,9 @@
-import random
 import numpy as np
 
 class MarketMakingGame:
-    def __init__(self):
+    def __init__(self, rng=None):
         self.type = "market_making"
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.rounds = 10
         self.current_round = 0
         self.mid_price = 100.0
@@ -44,7 +44,7 @@ class MarketMakingGame:
         ask = self.mid_price + half_spread
         
         # Simulate market move
-        move = np.random.normal(0, self.volatility)
+        move = self.rng.normal(0, self.volatility)
         new_mid = self.mid_price + move
         
         # Simulate order flow
@@ -57,13 +57,13 @@ class MarketMakingGame:
         sell_filled = False
         
         # Market sell order hits our bid?
-        if random.random() < fill_prob:
+        if self.rng.random() < fill_prob:
             self.inventory += 1
             self.cash -= bid
             buy_filled = True
             
         # Market buy order hits our ask?
-        if random.random() < fill_prob:
+        if self.rng.random() < fill_prob:
             self.inventory -= 1
             self.cash += ask
             sell_filled = True
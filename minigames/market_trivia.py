@@ -1,20 +1,21 @@
-import random
+import numpy as np
 from minigames.trivia_bank import get_trivia_questions
 
 
 class MarketTriviaGame:
-    def __init__(self, question_count=3):
+    def __init__(self, question_count=3, rng=None):
         self.type = "market_trivia"
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.question_count = question_count
         self.current_index = 0
         self.score = 0
         self.questions = []
-        self.bank = get_trivia_questions()
+        self.bank = get_trivia_questions(self.rng)
 
     def start(self):
         self.current_index = 0
         self.score = 0
-        random.shuffle(self.bank)
+        self.rng.shuffle(self.bank)
         self.questions = self.bank[: min(self.question_count, len(self.bank))]
         return self._current_payload()
 
@@ -1,4 +1,4 @@
-import random
+import numpy as np
 
 # Core hand-written questions
 BASE_QUESTIONS = [
@@ -608,7 +608,7 @@ def _index_questions():
     return questions
 
 
-def get_trivia_questions():
+def get_trivia_questions(rng=None):
     """
     Build the trivia bank (>=250 questions).
     """
@@ -627,5 +627,5 @@ def get_trivia_questions():
     questions.extend(_vol_questions())
     questions.extend(_index_questions())
     # Shuffle to add variety
-    random.shuffle(questions)
+    (rng if rng is not None else np.random.default_rng()).shuffle(questions)
     return questions
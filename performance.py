@@ -0,0 +1,131 @@
+import math
+
+
+class _Window:
+    """Welford accumulators for the last `size` returns."""
+    __slots__ = ("size", "n", "mean", "m2", "downside_sq", "hits")
+
+    def __init__(self, size):
+        self.size = size
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.downside_sq = 0.0
+        self.hits = 0
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        if x < 0:
+            self.downside_sq += x * x
+        elif x > 0:
+            self.hits += 1
+
+    def drop(self, x):
+        self.n -= 1
+        if self.n == 0:
+            self.mean = self.m2 = self.downside_sq = 0.0
+            self.hits = 0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 = max(0.0, self.m2 - delta * (x - self.mean))
+        if x < 0:
+            self.downside_sq = max(0.0, self.downside_sq - x * x)
+        elif x > 0:
+            self.hits -= 1
+
+
+class RollingStats:
+    """Rolling performance of weekly returns over one or more trailing windows.
+
+    Returns go into a ring buffer sized for the longest window. Each window
+    keeps Welford running moments, a downside sum of squares and a win count,
+    so a push and a read are O(1) per window. `mean` is weekly; volatility,
+    Sharpe and Sortino are annualized with `periods_per_year` and come back as
+    0.0 while undefined (fewer than two returns, or no dispersion).
+
+    Sliding Welford updates pick up rounding error over time, so the
+    accumulators are rebuilt from the buffer each time it wraps.
+    """
+    TINY = 1e-12
+
+    def __init__(self, windows=(13, 52), periods_per_year=52):
+        self.windows = tuple(sorted(set(windows)))
+        self.periods_per_year = periods_per_year
+        self.capacity = self.windows[-1]
+        self._buffer = [0.0] * self.capacity
+        self._head = 0
+        self.count = 0  # returns pushed so far
+        self._acc = [_Window(size) for size in self.windows]
+
+    def push(self, ret):
+        ret = float(ret)
+        head, buffer = self._head, self._buffer
+        for acc in self._acc:
+            if acc.n == acc.size:
+                acc.drop(buffer[(head - acc.size) % self.capacity])
+            acc.add(ret)
+        buffer[head] = ret
+        self._head = (head + 1) % self.capacity
+        self.count += 1
+        if self._head == 0:
+            self._resync()
+
+    def recent(self, n=None):
+        """The last `n` returns (default: all buffered), oldest first."""
+        n = min(self.count, self.capacity) if n is None else min(n, self.count, self.capacity)
+        start = (self._head - n) % self.capacity
+        if start + n <= self.capacity:
+            return self._buffer[start:start + n]
+        return self._buffer[start:] + self._buffer[:self._head]
+
+    def _resync(self):
+        for acc in self._acc:
+            values = self.recent(acc.size)
+            acc.__init__(acc.size)
+            for value in values:
+                acc.add(value)
+
+    def window(self, size):
+        acc = self._acc[self.windows.index(size)]
+        n = acc.n
+        annualize = math.sqrt(self.periods_per_year)
+        vol = math.sqrt(acc.m2 / n) if n > 1 else 0.0
+        downside = math.sqrt(acc.downside_sq / n) if n > 1 else 0.0
+        return {
+            "weeks": n,
+            "mean": acc.mean,
+            "volatility": vol * annualize,
+            "sharpe": acc.mean / vol * annualize if vol > self.TINY else 0.0,
+            "sortino": acc.mean / downside * annualize if downside > self.TINY else 0.0,
+            "hit_rate": acc.hits / n if n else 0.0,
+        }
+
+    def summary(self):
+        return {f"{size}w": self.window(size) for size in self.windows}
+
+    def to_dict(self):
+        return {
+            "windows": list(self.windows),
+            "count": self.count,
+            "returns": self.recent(),
+            "accumulators": [[acc.n, acc.mean, acc.m2, acc.downside_sq, acc.hits] for acc in self._acc],
+        }
+
+    @classmethod
+    def from_dict(cls, data, periods_per_year=52):
+        stats = cls(data["windows"], periods_per_year)
+        returns = data["returns"]
+        stats.count = data.get("count", len(returns))
+        stats._head = stats.count % stats.capacity
+        for offset, ret in enumerate(reversed(returns), start=1):
+            stats._buffer[(stats._head - offset) % stats.capacity] = ret
+        if "accumulators" in data:
+            for acc, (n, mean, m2, downside_sq, hits) in zip(stats._acc, data["accumulators"]):
+                acc.n, acc.mean, acc.m2, acc.downside_sq, acc.hits = n, mean, m2, downside_sq, hits
+        else:
+            stats._resync()
+        return stats
@@ -0,0 +1,85 @@
+"""Wall time and call counts per phase of the weekly turn.
+
+The turn marks the end of each phase with `lap(name)`, which charges the
+time since the previous mark to that phase. While the timer is disabled a
+lap is one attribute check, so the marks stay in the code for good.
+Durations are kept for the last `window` calls per phase and summarized
+on demand as percentiles and a histogram.
+"""
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_WINDOW = 520  # ten years of weekly calls
+ENABLED_BY_DEFAULT = False  # for new timers; the server sets it from PM_SIM_PHASE_TIMINGS
+HISTOGRAM_BOUNDS_US = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000)
+
+
+class _Phase:
+    __slots__ = ("calls", "total", "recent")
+
+    def __init__(self, window):
+        self.calls = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=window)
+
+    def summary(self):
+        recent = np.fromiter(self.recent, dtype=np.float64) * 1e6  # microseconds
+        counts = np.histogram(recent, bins=(0.0, *HISTOGRAM_BOUNDS_US, np.inf))[0]
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99)) if len(recent) else (0.0, 0.0, 0.0)
+        return {
+            "calls": self.calls,
+            "total_ms": round(self.total * 1e3, 3),
+            "window": len(recent),
+            "mean_us": round(float(recent.mean()), 1) if len(recent) else 0.0,
+            "p50_us": round(float(p50), 1),
+            "p95_us": round(float(p95), 1),
+            "p99_us": round(float(p99), 1),
+            "max_us": round(float(recent.max()), 1) if len(recent) else 0.0,
+            # counts[i] calls took under HISTOGRAM_BOUNDS_US[i] (and over the previous bound); the last is the overflow
+            "histogram": counts.tolist(),
+        }
+
+
+class PhaseTimer:
+    def __init__(self, enabled=None, window=DEFAULT_WINDOW):
+        self.enabled = ENABLED_BY_DEFAULT if enabled is None else enabled
+        self.window = window
+        self._phases = {}  # name -> _Phase, in first-seen order
+        self._mark = None
+
+    def start(self):
+        """Begin timing a run of phases (the next lap is measured from here)."""
+        if self.enabled:
+            self._mark = time.perf_counter()
+
+    def lap(self, name):
+        """Charge the time since the previous mark to phase `name`."""
+        if not self.enabled or self._mark is None:
+            return
+        now = time.perf_counter()
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self.window)
+        elapsed = now - self._mark
+        phase.calls += 1
+        phase.total += elapsed
+        phase.recent.append(elapsed)
+        self._mark = now
+
+    def stop(self):
+        self._mark = None
+
+    def reset(self):
+        self._phases.clear()
+        self._mark = None
+
+    def report(self):
+        """Per-phase summaries, slowest total first."""
+        phases = sorted(self._phases.items(), key=lambda item: item[1].total, reverse=True)
+        return {
+            "enabled": self.enabled,
+            "histogram_bounds_us": list(HISTOGRAM_BOUNDS_US),
+            "phases": {name: phase.summary() for name, phase in phases},
+        }
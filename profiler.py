@@ -0,0 +1,135 @@
+"""On-demand profiles of one session's actions.
+
+A `ProfileCapture` is attached to a session and traces the next `actions`
+actions it runs. Tracing uses `sys.setprofile`, which only hooks the
+calling thread (unlike `cProfile`, which since Python 3.12 sees every
+thread), so other sessions run at full speed. Each call's time is charged
+to its full stack. That gives flamegraph-ready collapsed stacks and a
+hotspot table with exact call counts. Tracing stops at `deadline` even in
+the middle of an action; the frames still open are cut off at that point.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+
+
+def _label(frame, event, arg):
+    if event.startswith("c_"):
+        module = getattr(arg, "__module__", None) or "builtins"
+        return f"{module}:{getattr(arg, '__qualname__', repr(arg))}"
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}:{code.co_firstlineno}"
+
+
+class _Tracer:
+    """`sys.setprofile` hook timing every call on one thread until `deadline`."""
+
+    def __init__(self, capture):
+        self.capture = capture
+        self.stack = []  # [label, start, child seconds]
+        self.labels = []
+        self.active = Counter()  # label -> open frames (so recursion counts once toward total time)
+        self.cut = False
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event in ("call", "c_call"):
+            if now > self.capture.deadline:
+                sys.setprofile(None)
+                self.cut = True
+                while self.stack:  # close the frames still open at the cut
+                    self.pop(now)
+                self.capture.idle.set()
+                return
+            label = _label(frame, event, arg)
+            self.stack.append([label, now, 0.0])
+            self.labels.append(label)
+            self.active[label] += 1
+            self.capture.calls[label] += 1
+        elif self.stack:  # return, c_return, c_exception; ignore frames entered before tracing
+            self.pop(now)
+
+    def pop(self, now):
+        label, start, children = self.stack.pop()
+        elapsed = now - start
+        capture = self.capture
+        capture.stacks[tuple(self.labels)] += elapsed - children
+        self.labels.pop()
+        self.active[label] -= 1
+        if not self.active[label]:
+            capture.total[label] += elapsed
+        capture.own[label] += elapsed - children
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+
+class ProfileCapture:
+    def __init__(self, actions=1, seconds=10.0):
+        self.remaining = actions
+        self.deadline = time.perf_counter() + seconds
+        self.finished = threading.Event()
+        self.captured = 0
+        self.cut = False
+        self.seconds = 0.0  # traced wall time
+        self.stacks = defaultdict(float)  # stack (root first) -> self seconds
+        self.own = defaultdict(float)  # label -> self seconds
+        self.total = defaultdict(float)  # label -> inclusive seconds
+        self.calls = Counter()
+        self.idle = threading.Event()  # clear while a tracer is attached
+        self.idle.set()
+        self._lock = threading.Lock()  # one traced run at a time
+
+    def run(self, fn, *args, **kwargs):
+        """`fn(*args, **kwargs)`, traced if the capture still wants actions."""
+        with self._lock:
+            if self.finished.is_set() or time.perf_counter() > self.deadline:
+                self.finished.set()
+                return fn(*args, **kwargs)
+            tracer = _Tracer(self)
+            start = time.perf_counter()
+            self.idle.clear()
+            sys.setprofile(tracer)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                sys.setprofile(None)  # leaves only its own call open on the tracer's stack
+                end = time.perf_counter()
+                self.seconds += min(end, self.deadline) - start
+                self.captured += 1
+                self.remaining -= 1
+                self.cut = self.cut or tracer.cut
+                if self.remaining <= 0 or tracer.cut:
+                    self.finished.set()
+                self.idle.set()
+
+    def wait(self):
+        """Block until the actions were captured or the deadline passed; True if all were captured."""
+        self.finished.wait(max(0.0, self.deadline - time.perf_counter()))
+        self.finished.set()  # late actions run untraced
+        return self.remaining <= 0 and not self.cut
+
+    def report(self, top=25):
+        """Collapsed stacks (`frame;frame;frame microseconds` lines) and the `top` functions by self time.
+
+        Does not wait for an action still running: its tracer detaches itself at the deadline.
+        """
+        self.idle.wait(1.0)
+        # dict() copies in one step under the GIL, safe even if a tracer is still finishing
+        stacks, own, total, calls = dict(self.stacks), dict(self.own), dict(self.total), dict(self.calls)
+        collapsed = [f"{';'.join(stack)} {round(seconds * 1e6)}"
+                     for stack, seconds in sorted(stacks.items()) if round(seconds * 1e6)]
+        hotspots = sorted(own, key=own.get, reverse=True)[:top]
+        return {
+            "actions": self.captured,
+            "complete": self.remaining <= 0 and not self.cut,
+            "traced_ms": round(self.seconds * 1e3, 3),
+            "collapsed": "\n".join(collapsed),
+            "top": [{
+                "function": label,
+                "calls": calls.get(label, 0),
+                "self_ms": round(own[label] * 1e3, 3),
+                "total_ms": round(total.get(label, 0.0) * 1e3, 3),
+            } for label in hotspots],
+        }
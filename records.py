@@ -0,0 +1,52 @@
+_MISSING = object()
+
+
+def _make_to_dict(fields, optional):
+    """Compile `to_dict` as one dict display over `fields`, plus a check per optional field."""
+    lines = ["def to_dict(self):"]
+    lines.append("    data = {" + ", ".join(f"{name!r}: self.{name}" for name in fields) + "}")
+    for name in optional:
+        lines.append(f"    value = getattr(self, {name!r}, _MISSING)")
+        lines.append("    if value is not _MISSING:")
+        lines.append(f"        data[{name!r}] = value")
+    lines.append("    return data")
+    namespace = {"_MISSING": _MISSING}
+    exec("\n".join(lines), namespace)
+    return namespace["to_dict"]
+
+
+class Record:
+    """Slotted domain object with declared fields and generated serializers.
+
+    `FIELDS` are set by `__init__` and always serialized, in that order.
+    `OPTIONAL_FIELDS` are attached later (onboarding, research odds...) and
+    only serialized once set. `from_dict` builds the object from the
+    `INIT_ARGS` keys and then sets every other declared field it finds;
+    unknown keys from old saves are ignored. Every declared field must be a
+    slot or a descriptor (e.g. `ColumnField`) on the class. A class that
+    defines its own `to_dict` can build on the generated `_fields_to_dict`.
+    """
+    __slots__ = ()
+    FIELDS = ()
+    OPTIONAL_FIELDS = ()
+    INIT_ARGS = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        declared = cls.FIELDS + cls.OPTIONAL_FIELDS
+        missing = [name for name in declared if not hasattr(cls, name)]
+        if missing:
+            raise TypeError(f"{cls.__name__} declares {missing} without a slot or descriptor")
+        cls._declared = frozenset(declared)
+        cls._fields_to_dict = _make_to_dict(cls.FIELDS, cls.OPTIONAL_FIELDS)
+        if "to_dict" not in cls.__dict__:
+            cls.to_dict = cls._fields_to_dict
+
+    @classmethod
+    def from_dict(cls, data):
+        obj = cls(**{name: data[name] for name in cls.INIT_ARGS if name in data})
+        declared = cls._declared
+        for key, value in data.items():
+            if key in declared and key not in cls.INIT_ARGS:
+                setattr(obj, key, value)
+        return obj
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class RandomStream:
+    """Scalar random draws served from blocks pre-drawn with NumPy.
+
+    Each turn makes dozens of one-off draws (regime switches, alpha returns,
+    outages, mentoring...). Asking a `Generator` for one value at a time pays
+    the call overhead on every draw, so uniforms and normals are drawn
+    `block_size` at a time and handed out from a buffer instead.
+
+    Uniforms and normals come from two independent PCG64 streams. That way a
+    refill of one buffer never shifts the other, and the stream position can
+    be saved as "state at the start of the current block + offset".
+
+    Array draws (`size=`) already amortize the call, and copying them out of
+    a block costs more than it saves. They come straight from a third
+    independent stream's `Generator`.
+    """
+
+    def __init__(self, seed_seq, block_size=1024):
+        self.block_size = block_size
+        uniform_bits = np.random.PCG64(seed_seq)
+        self._bits = {"uniform": uniform_bits, "normal": uniform_bits.jumped()}
+        self._gens = {kind: np.random.Generator(bits) for kind, bits in self._bits.items()}
+        self._array_bits = uniform_bits.jumped(2)
+        self._array_gen = np.random.Generator(self._array_bits)
+        self._block_state = {}
+        self._buffers = {}
+        self._pos = {}
+        for kind in self._bits:
+            self._refill(kind)
+
+    def _refill(self, kind):
+        self._block_state[kind] = self._bits[kind].state
+        if kind == "uniform":
+            block = self._gens[kind].random(self.block_size)
+        else:
+            block = self._gens[kind].standard_normal(self.block_size)
+        # Lists index faster than arrays and hand back plain floats
+        self._buffers[kind] = block.tolist()
+        self._pos[kind] = 0
+
+    def random(self, size=None):
+        if size is not None:
+            return self._array_gen.random(size)
+        pos = self._pos["uniform"]
+        if pos >= self.block_size:
+            self._refill("uniform")
+            pos = 0
+        self._pos["uniform"] = pos + 1
+        return self._buffers["uniform"][pos]
+
+    def uniform(self, low=0.0, high=1.0):
+        return low + (high - low) * self.random()
+
+    def integers(self, low, high=None):
+        """Uniform integer in [low, high), or [0, low) when `high` is omitted."""
+        if high is None:
+            low, high = 0, low
+        return low + min(int(self.random() * (high - low)), high - low - 1)
+
+    def normal(self, loc=0.0, scale=1.0):
+        pos = self._pos["normal"]
+        if pos >= self.block_size:
+            self._refill("normal")
+            pos = 0
+        self._pos["normal"] = pos + 1
+        return loc + scale * self._buffers["normal"][pos]
+
+    def standard_normal(self, size):
+        return self._array_gen.standard_normal(size)
+
+    def state(self):
+        return {
+            "block_size": self.block_size,
+            "streams": {
+                kind: {"bit_generator": self._block_state[kind], "pos": self._pos[kind]}
+                for kind in self._bits
+            },
+            "arrays": self._array_bits.state,
+        }
+
+    def restore(self, state):
+        self.block_size = state.get("block_size", self.block_size)
+        for kind, saved in state["streams"].items():
+            self._bits[kind].state = saved["bit_generator"]
+            self._refill(kind)
+            self._pos[kind] = saved["pos"]
+        if "arrays" in state:
+            self._array_bits.state = state["arrays"]
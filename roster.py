@@ -0,0 +1,106 @@
+import numpy as np
+
+from columns import grow_columns
+
+
+class TeamRoster:
+    """Active staff with skill, happiness, loyalty and salary held in NumPy columns.
+
+    Behaves like the list it replaced (append, remove, iteration, indexing,
+    len). Members keep their attribute API through `ColumnField`s and occupy
+    rows `0..len-1` in joining order. Running sums of skill, happiness and
+    salary are kept up to date by single-cell writes and refreshed after every
+    vectorized update, so averages and payroll are O(1).
+    """
+    FIELDS = ("skill", "happiness", "loyalty", "salary")
+    SUMMED = ("skill", "happiness", "salary")
+
+    def __init__(self, members=(), capacity=8):
+        # Every field is a whole number (salaries in dollars); values are round()ed on the way in
+        self.columns = {name: np.zeros(capacity, dtype=np.int64) for name in self.FIELDS}
+        self._members = []
+        self._sums = dict.fromkeys(self.SUMMED, 0)
+        for member in members:
+            self.append(member)
+
+    # list API
+    def append(self, member):
+        if member._store is self:
+            raise ValueError(f"{member.name} is already on the roster")
+        if member._store is not None:
+            member._store.remove(member)
+        row = len(self._members)
+        if row == len(self.columns["skill"]):
+            self.columns = grow_columns(self.columns, row * 2)
+        for name in self.FIELDS:
+            self.columns[name][row] = round(member._local[name])
+        member._local = None
+        member._store, member._row = self, row
+        self._members.append(member)
+        for name in self.SUMMED:
+            self._sums[name] += self.columns[name][row].item()
+
+    def remove(self, member):
+        if member._store is not self:
+            raise ValueError(f"{member.name} is not on the roster")
+        row, n = member._row, len(self._members)
+        member._local = {name: self.columns[name][row].item() for name in self.FIELDS}
+        member._store = member._row = None
+        for name in self.SUMMED:
+            self._sums[name] -= member._local[name]
+        # Keep rows packed in joining order; departures are rare
+        for column in self.columns.values():
+            column[row:n - 1] = column[row + 1:n]
+        del self._members[row]
+        for later in self._members[row:]:
+            later._row -= 1
+
+    def __iter__(self):
+        return iter(list(self._members))
+
+    def __len__(self):
+        return len(self._members)
+
+    def __getitem__(self, index):
+        return self._members[index]
+
+    def __contains__(self, member):
+        return getattr(member, "_store", None) is self
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return f"TeamRoster({[m.name for m in self._members]})"
+
+    # columns
+    def set_cell(self, name, row, value):
+        column = self.columns[name]
+        value = round(value)
+        if name in self._sums:
+            self._sums[name] -= column[row].item()
+            column[row] = value
+            self._sums[name] += column[row].item()
+        else:
+            column[row] = value
+
+    def values(self, name):
+        """Live view of one column for the current members; write through `assign`/`bump`."""
+        return self.columns[name][:len(self._members)]
+
+    def assign(self, name, values):
+        self.values(name)[:] = values
+        if name in self._sums:
+            self._sums[name] = self.values(name).sum().item()
+
+    def bump(self, name, delta, low=0, high=100):
+        """Clamped in-place update of a whole column; `delta` is a scalar or per-member array."""
+        self.assign(name, np.clip(self.values(name) + delta, low, high))
+
+    def total(self, name):
+        return self._sums[name]
+
+    def mean(self, name):
+        if not self._members:
+            return None
+        return self._sums[name] / len(self._members)
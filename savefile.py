@@ -0,0 +1,172 @@
+"""Compressed binary save container (`.npz`).
+
+A save document is the JSON-style dict `GameState.save` builds. Packing
+moves two kinds of data out of it into raw NumPy arrays:
+
+- record lists (staff, alphas...): stored column by column. A field whose
+  values are all ints or all floats becomes one int64/float64 array, and
+  anything else stays in the JSON header;
+- numeric series (PnL history...): stored as one float64 array each.
+
+What is left of the document, plus the column layout, goes into a small
+JSON header stored as the `header` entry. `read` reverses this and returns
+the same document that was packed, so both save formats share one restore
+path.
+"""
+import contextlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+MAGIC = "pm-sim-save"
+FORMAT_VERSION = 1
+_MISSING = object()
+
+
+def _get(document, path):
+    node = document
+    for key in path.split("/"):
+        if not isinstance(node, dict) or key not in node:
+            return _MISSING
+        node = node[key]
+    return node
+
+
+def _set(document, path, value):
+    *parents, last = path.split("/")
+    node = document
+    for key in parents:
+        node = node[key]
+    node[last] = value
+
+
+def _numeric_dtype(values):
+    """int64/float64 when every value is a plain int or every value is a float, else None."""
+    if all(type(v) is int for v in values):
+        return np.int64
+    if all(type(v) is float for v in values):
+        return np.float64
+    return None
+
+
+def _pack_records(path, items, fields, arrays):
+    columns = {}
+    for field in fields:
+        values = [item.get(field, _MISSING) for item in items]
+        present = [v is not _MISSING for v in values]
+        if not any(present):
+            continue
+        spec = {}
+        if not all(present):
+            spec["missing"] = [i for i, flag in enumerate(present) if not flag]
+            values = [v for v in values if v is not _MISSING]
+        dtype = _numeric_dtype(values)
+        if dtype is not None and values:
+            name = f"{path}/{field}"
+            arrays[name] = np.asarray(values, dtype=dtype)
+            spec["array"] = name
+        else:
+            spec["values"] = values
+        columns[field] = spec
+    extra = [{k: v for k, v in item.items() if k not in fields} for item in items]
+    layout = {"count": len(items), "columns": columns}
+    if any(extra):
+        layout["extra"] = extra
+    return layout
+
+
+def _unpack_records(layout, arrays):
+    items = [{} for _ in range(layout["count"])]
+    for field, spec in layout["columns"].items():
+        values = arrays[spec["array"]].tolist() if "array" in spec else spec["values"]
+        missing = set(spec.get("missing", ()))
+        rows = (i for i in range(len(items)) if i not in missing)
+        for row, value in zip(rows, values):
+            items[row][field] = value
+    for item, extra in zip(items, layout.get("extra", ())):
+        item.update(extra)
+    return items
+
+
+def pack(document, records, series):
+    """Split `document` into a JSON header and named arrays.
+
+    `records` maps a `/`-separated path to the field names of the record
+    list stored there; `series` lists paths of numeric lists.
+    """
+    header = {"format": MAGIC, "version": FORMAT_VERSION, "records": {}, "series": []}
+    arrays = {}
+    document = json.loads(json.dumps(document))  # private copy we can strip
+    for path, fields in records.items():
+        items = _get(document, path)
+        if items is _MISSING:
+            continue
+        header["records"][path] = _pack_records(path, items, tuple(fields), arrays)
+        _set(document, path, None)
+    for path in series:
+        values = _get(document, path)
+        if values is _MISSING:
+            continue
+        arrays[path] = np.asarray(values, dtype=np.float64)
+        header["series"].append(path)
+        _set(document, path, None)
+    header["document"] = document
+    return header, arrays
+
+
+def unpack(header, arrays):
+    if header.get("format") != MAGIC:
+        raise ValueError("Not a pm-sim save file")
+    if header.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Save format {header['version']} is newer than this game supports")
+    document = header["document"]
+    for path, layout in header["records"].items():
+        _set(document, path, _unpack_records(layout, arrays))
+    for path in header["series"]:
+        _set(document, path, arrays[path])
+    return document
+
+
+@contextlib.contextmanager
+def atomic_open(filename, mode="wb"):
+    """Open a temp file next to `filename`; on success fsync it and rename it over `filename`.
+
+    Readers see either the old file or the complete new one, never a
+    partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(filename) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filename)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write(filename, document, records, series):
+    header, arrays = pack(document, records, series)
+    encoded = np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8)
+    with atomic_open(filename) as f:
+        np.savez_compressed(f, header=encoded, **arrays)
+
+
+def read(filename):
+    """The save document; numeric series come back as float64 arrays."""
+    with np.load(filename, allow_pickle=False) as npz:
+        header = json.loads(npz["header"].tobytes().decode("utf-8"))
+        arrays = {name: npz[name] for name in npz.files if name != "header"}
+    return unpack(header, arrays)
@@ -0,0 +1,460 @@
+"""Per-player games for one server process.
+
+Each player is identified by a session token. Hot sessions stay in
+memory in least-recently-used order. A session is spilled to
+`saves/sessions/<token>.npz` through the regular save machinery in three
+cases:
+
+- it has been idle for `idle_timeout` seconds;
+- the store holds more than `max_sessions` sessions;
+- the store holds more than `memory_budget` bytes of serialized state.
+
+A spilled session is loaded back on its next request. A mini-game left
+unfinished for `minigame_timeout` seconds is dropped. A player's named
+save slots live in `saves/sessions/<token>/slots/`, out of other players'
+reach.
+"""
+import contextlib
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+from game_engine import MINIGAME_ACTIONS, SAVE_DIR, GameState
+from journal import ActionJournal
+
+SESSION_DIR = os.path.join(SAVE_DIR, "sessions")
+NOTICE_HISTORY = 32
+PROGRESS_INTERVAL = 0.2  # seconds between snapshots published during a long turn
+TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,64}$")  # tokens name files, so nothing else is accepted
+
+
+def session_lock(session):
+    return session.lock if session is not None else contextlib.nullcontext()
+
+
+def new_game():
+    game = GameState()
+    game.process_start_of_week()
+    return game
+
+
+def _new_items(old, new):
+    """Items appended to a list that may also have dropped items from its front (log, event queue)."""
+    for overlap in range(min(len(old), len(new)), 0, -1):
+        if old[len(old) - overlap:] == new[:overlap]:
+            return new[overlap:]
+    return new
+
+
+class Session:
+    """One player's game.
+
+    Changes to the game go through `mutating()`, which serializes them and
+    then publishes a fresh `snapshot`. Readers use `snapshot` and never
+    wait for a turn in progress; `updates()` follows the published
+    snapshots (and `post()`ed notices) as they happen.
+    """
+    __slots__ = ("token", "game", "journal", "lock", "snapshot", "published_at", "changed", "listeners",
+                 "_notices", "_notice_seq", "last_seen", "size", "users", "profile")
+
+    def __init__(self, token, game, journal=None):
+        self.token = token
+        self.game = game
+        self.journal = journal
+        self.lock = threading.RLock()
+        self.snapshot = game.snapshot()
+        self.published_at = time.monotonic()
+        self.changed = threading.Condition()  # notified on every publish() and post()
+        self.listeners = 0  # running updates() streams
+        self._notices = deque(maxlen=NOTICE_HISTORY)  # (seq, event, data)
+        self._notice_seq = 0
+        self.last_seen = 0.0
+        self.size = 0
+        self.users = 0  # requests currently holding the session; it is never evicted while > 0
+        self.profile = None  # a profiler.ProfileCapture tracing the session's next actions
+
+    @contextlib.contextmanager
+    def mutating(self):
+        """Hold the session's lock for a change to `game`; publish the new snapshot afterwards."""
+        with self.lock:
+            try:
+                yield self.game
+            finally:
+                self.publish()
+
+    def run(self, fn, *args, **kwargs):
+        """Run an action's `fn(*args, **kwargs)`, traced if a profile capture is attached."""
+        capture = self.profile
+        if capture is None:
+            return fn(*args, **kwargs)
+        return capture.run(fn, *args, **kwargs)
+
+    def publish(self):
+        """Publish the game's current state (call with the lock held), waking `updates()` listeners."""
+        snapshot = self.game.snapshot()
+        with self.changed:
+            self.snapshot = snapshot
+            self.published_at = time.monotonic()
+            self.changed.notify_all()
+
+    def publish_progress(self):
+        """Publish mid-change, if anyone is listening and the last publish is PROGRESS_INTERVAL old."""
+        if self.listeners and time.monotonic() - self.published_at >= PROGRESS_INTERVAL:
+            self.publish()
+
+    def post(self, event, data):
+        """Send a notice (e.g. a finished save) to `updates()` listeners."""
+        with self.changed:
+            self._notice_seq += 1
+            self._notices.append((self._notice_seq, event, data))
+            self.changed.notify_all()
+
+    def updates(self, version=None, state_id=None, keepalive=15.0):
+        """Endless `(event, data)` stream for a client holding `version` of the state `state_id`.
+
+        Yields "state" (the `StateSnapshot` itself) or "patch" whenever the
+        published snapshot moves on, then "log" and "events" with the message
+        log lines and game events that appeared, and any posted notices.
+        Yields ("keepalive", None) after `keepalive` idle seconds.
+        """
+        log = events = None
+        with self.changed:
+            seen = self._notice_seq
+            self.listeners += 1
+        try:
+            yield from self._follow(version, state_id, seen, log, events, keepalive)
+        finally:
+            with self.changed:
+                self.listeners -= 1
+
+    def _follow(self, version, state_id, seen, log, events, keepalive):
+        while True:
+            with self.changed:
+                self.changed.wait_for(
+                    lambda: self._notice_seq != seen or (self.snapshot.state_id, self.snapshot.version) != (state_id, version),
+                    keepalive,
+                )
+                snapshot = self.snapshot
+                notices = [notice for notice in self._notices if notice[0] > seen]
+                seen = self._notice_seq
+            sent = bool(notices)
+            if (snapshot.state_id, snapshot.version) != (state_id, version):
+                patch = snapshot.patch_since(version) if state_id == snapshot.state_id and version is not None else None
+                if patch is None:
+                    yield "state", snapshot
+                    current = json.loads(snapshot.to_json())
+                    new_log, new_events = current["message_log"], current["events_queue"]
+                else:
+                    yield "patch", {"version": snapshot.version, "state_id": snapshot.state_id, "patch": patch}
+                    values = {op["path"]: op.get("value") for op in patch}
+                    new_log, new_events = values.get("/message_log", log), values.get("/events_queue", events)
+                # Nothing to report for a fresh listener: it just received everything in the state
+                if log is not None and new_log is not log and _new_items(log, new_log):
+                    yield "log", {"version": snapshot.version, "lines": _new_items(log, new_log)}
+                if events is not None and new_events is not events and _new_items(events, new_events):
+                    yield "events", {"version": snapshot.version, "events": _new_items(events, new_events)}
+                log, events = new_log, new_events
+                state_id, version = snapshot.state_id, snapshot.version
+                sent = True
+            for _, event, data in notices:
+                yield event, data
+            if not sent:
+                yield "keepalive", None
+
+
+class _Loading:
+    """Stands in for a session in `SessionStore._sessions` while it is created or read from disk."""
+    __slots__ = ("done",)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class SessionStore:
+    """Sessions by token, with LRU/idle eviction to disk and a memory budget.
+
+    `open(token)` returns the session for a request (creating or reloading
+    it as needed) and `release(session)` must follow once the request is
+    done. With `journaled`, every action is appended to the session's
+    journal (see `journal.ActionJournal`) so nothing is lost even if the
+    process dies; otherwise a session is written to disk when evicted.
+
+    The store lock only guards the session table: loading, saving and
+    journaling happen outside it, so one session coming off disk never
+    holds up requests for the others.
+    """
+
+    def __init__(self, directory=SESSION_DIR, max_sessions=100, memory_budget=256 * 2**20,
+                 idle_timeout=30 * 60, minigame_timeout=10 * 60, writer=None, journaled=False,
+                 game_factory=new_game, clock=time.monotonic):
+        self.directory = directory
+        self.max_sessions = max_sessions
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.minigame_timeout = minigame_timeout
+        self.writer = writer
+        self.journaled = journaled
+        self.game_factory = game_factory
+        self.clock = clock
+        self._sessions = OrderedDict()  # token -> Session (or _Loading), least recently used first
+        self._spilling = {}  # token -> Event set once an evicted session's save is queued
+        self._lock = threading.RLock()
+        self.memory = 0
+        self.created = 0
+        self.restored = 0
+        self.evicted = 0
+        self.minigames_abandoned = 0
+
+    def open(self, token=None):
+        """The session for `token`, or a new one (with a new token) if the token is missing or malformed."""
+        if not token or not TOKEN_PATTERN.match(token):
+            token = secrets.token_urlsafe(24)
+        while True:
+            now = self.clock()
+            with self._lock:
+                spilled, idle = self._sweep(now)
+                entry = self._sessions.get(token)
+                loading = entry is None
+                if loading:
+                    entry = self._sessions[token] = _Loading()
+                    spilling = self._spilling.get(token)
+                else:
+                    self._sessions.move_to_end(token)
+                    if isinstance(entry, Session):
+                        entry.last_seen = now
+                        entry.users += 1
+            self._tidy(spilled, idle)
+            if isinstance(entry, Session):
+                return entry
+            if loading:
+                return self._load(token, entry, spilling)
+            entry.done.wait()  # another request is loading it; take it from the table once it is in
+
+    def release(self, session):
+        """End a request: re-measure the session and evict others if the store is over budget."""
+        with self._lock:
+            session.users -= 1
+            session.last_seen = self.clock()
+            if self._sessions.get(session.token) is session:
+                self._sessions.move_to_end(session.token)
+                self._measure(session)
+            spilled = self._over_limits()
+        self._tidy(spilled, ())
+
+    def perform(self, session, action):
+        """Apply a game action to the session's game, journaled when the store is.
+
+        Multi-week turns publish a snapshot after every week, so listeners see them progress.
+        """
+        on_week = lambda summary: session.publish_progress()  # noqa: E731
+        with session.mutating() as game:
+            if session.journal is not None:
+                return session.run(session.journal.perform, game, action, on_week=on_week)
+            return session.run(game.perform, action, on_week=on_week)
+
+    def perform_batch(self, session, actions, atomic=False):
+        """Apply `actions` in order under one hold of the session's lock; one response per action.
+
+        A failing action (an error response, an unknown or mini-game type,
+        or bad arguments) does not stop the others, unless `atomic`: then the
+        rest are skipped and the game is rolled back to before the batch.
+        Returns `(responses, rolled_back)`.
+        """
+        responses = []
+        with session.mutating() as game:
+            before = game.save_document() if atomic else None
+            for action in actions:
+                response = session.run(self._batch_step, session, game, action)
+                responses.append(response)
+                if atomic and response["status"] != "ok":
+                    restored = GameState.from_save_document(before)
+                    restored.active_minigame_instance = game.active_minigame_instance  # batches never touch it
+                    self.replace(session, restored)
+                    return responses, True
+        return responses, False
+
+    def _batch_step(self, session, game, action):
+        if not isinstance(action, dict):
+            return {"status": "error", "message": "Actions must be JSON objects"}
+        action_type = action.get("type")
+        if action_type in MINIGAME_ACTIONS:
+            return {"status": "error", "message": f"'{action_type}' cannot be batched"}
+        try:
+            if session.journal is not None:
+                response = session.journal.perform(game, action)
+            else:
+                response = game.perform(action)
+        except (KeyError, TypeError, ValueError) as exc:
+            return {"status": "error", "message": f"Bad '{action_type}' action: {exc!r}"}
+        if response is None:
+            return {"status": "error", "message": f"Unknown action '{action_type}'"}
+        return response
+
+    def slot_directory(self, token):
+        """Where the session `token` keeps its named save slots."""
+        return os.path.join(self.directory, token, "slots")
+
+    def replace(self, session, game):
+        """Swap in a loaded or restarted game."""
+        with session.mutating():
+            session.game = game
+            if session.journal is not None:
+                session.journal.snapshot(game)
+
+    def sweep(self, now=None):
+        """Evict sessions idle past `idle_timeout` and drop mini-games idle past `minigame_timeout`."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            spilled, idle = self._sweep(now)
+        self._tidy(spilled, idle)
+
+    def evict(self, token):
+        """Write the session to disk and drop it from memory."""
+        with self._lock:
+            session = self._detach(token)
+        if session is None:
+            return False
+        self._spill(session)
+        return True
+
+    def close(self):
+        """Write every session to disk (server shutdown)."""
+        with self._lock:
+            spilled = [self._detach(token) for token in list(self._sessions)]
+        self._tidy([session for session in spilled if session is not None], ())
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, token):
+        return token in self._sessions
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_bytes": self.memory,
+                "memory_budget": self.memory_budget,
+                "max_sessions": self.max_sessions,
+                "created": self.created,
+                "restored": self.restored,
+                "evicted": self.evicted,
+                "minigames_abandoned": self.minigames_abandoned,
+            }
+
+    def _load(self, token, placeholder, spilling):
+        """Create or restore the session `token` that `placeholder` holds the place of."""
+        try:
+            if spilling is not None:
+                spilling.wait()  # its last save must be queued before the slot is read
+            session, restored = self._activate(token)
+        except BaseException:
+            with self._lock:
+                if self._sessions.get(token) is placeholder:
+                    del self._sessions[token]
+            placeholder.done.set()
+            raise
+        with self._lock:
+            self._sessions[token] = session  # in the placeholder's place in LRU order
+            if restored:
+                self.restored += 1
+            else:
+                self.created += 1
+            session.last_seen = self.clock()
+            session.users += 1
+        placeholder.done.set()
+        return session
+
+    def _activate(self, token):
+        if self.writer is not None:
+            self.writer.flush_slot(token, self.directory)  # it may still be on its way to disk
+        restored = GameState.save_exists(token, self.directory)
+        game = GameState.load(token, self.directory) if restored else self.game_factory()
+        journal = None
+        if self.journaled:
+            journal = ActionJournal(token, writer=self.writer, directory=self.directory)
+            journal.snapshot(game)
+        return Session(token, game, journal), restored
+
+    def _measure(self, session):
+        """Track the session's serialized state size (that of its published snapshot)."""
+        size = len(session.snapshot.to_json())
+        self.memory += size - session.size
+        session.size = size
+
+    def _sweep(self, now):
+        """Under the store lock: detach sessions idle past `idle_timeout`; also return those whose mini-game is stale."""
+        spilled, idle = [], []
+        for session in list(self._sessions.values()):
+            if not isinstance(session, Session):
+                continue
+            idle_for = now - session.last_seen
+            if idle_for <= min(self.idle_timeout, self.minigame_timeout):
+                break  # everything after this was used more recently
+            if session.users:
+                continue
+            if idle_for > self.idle_timeout:
+                spilled.append(self._detach(session.token))
+            elif session.game.active_minigame_instance is not None:
+                idle.append(session)
+        return spilled, idle
+
+    def _over_limits(self):
+        """Under the store lock: detach least recently used idle sessions until within `max_sessions` and `memory_budget`."""
+        spilled = []
+        for token, session in list(self._sessions.items()):
+            if len(self._sessions) <= self.max_sessions and self.memory <= self.memory_budget:
+                break
+            if isinstance(session, Session) and not session.users:
+                spilled.append(self._detach(token))
+        return spilled
+
+    def _detach(self, token):
+        """Under the store lock: take the session out of the table; `_spill()` must follow."""
+        session = self._sessions.get(token)
+        if not isinstance(session, Session):
+            return None
+        del self._sessions[token]
+        self.memory -= session.size
+        self.evicted += 1
+        self._spilling[token] = threading.Event()
+        return session
+
+    def _spill(self, session):
+        """Write a detached session to disk (or queue the write)."""
+        try:
+            with session.lock:
+                session.game.abandon_minigame()
+                if session.journal is not None:
+                    session.journal.snapshot(session.game)
+                    session.journal.close()
+                elif self.writer is not None:
+                    self.writer.submit(session.game, session.token, directory=self.directory)
+                else:
+                    session.game.save(session.token, directory=self.directory)
+        finally:
+            with self._lock:
+                self._spilling.pop(session.token).set()
+
+    def _abandon_minigame(self, session):
+        with session.mutating() as game:
+            if session.users or self.clock() - session.last_seen <= self.minigame_timeout:
+                return  # picked up again since the sweep
+            if not game.abandon_minigame():
+                return
+            if session.journal is not None:
+                # Not an action, so the journal cannot replay it: start over from here
+                session.journal.snapshot(game)
+        with self._lock:
+            self.minigames_abandoned += 1
+
+    def _tidy(self, spilled, idle):
+        """Outside the store lock: spill the sessions `_sweep()`/`_over_limits()` detached and drop stale mini-games."""
+        for session in spilled:
+            self._spill(session)
+        for session in idle:
+            self._abandon_minigame(session)
@@ -0,0 +1,180 @@
+import functools
+import json
+import secrets
+from collections import deque
+
+# Sections of the serialized state, in the order they appear in `GameState.to_dict()`
+SECTIONS = ("meta", "player", "team", "portfolio", "infra", "alphas", "events", "log")
+# Sections whose fragment reads from another section (resilience_score uses the infra team)
+DEPENDENTS = {"team": ("infra",)}
+
+
+def _pointer(path, key):
+    """Append `key` to a JSON Pointer (RFC 6901)."""
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def _diff(old, new, path, depth, ops):
+    """JSON Patch ops turning `old` into `new`, descending `depth` levels into dicts."""
+    if depth and isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": _pointer(path, key)})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": _pointer(path, key), "value": value})
+            elif old[key] != value:
+                _diff(old[key], value, _pointer(path, key), depth - 1, ops)
+    elif old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def _compact(ops):
+    """Drop ops that a later op on the same path, or on a parent path, overwrites."""
+    kept, covered = [], []
+    for op in reversed(ops):
+        path = op["path"]
+        if any(path == done or path.startswith(done + "/") for done in covered):
+            continue
+        kept.append(op)
+        covered.append(path)
+    kept.reverse()
+    return kept
+
+
+def _patch_since(changes, current, version):
+    if version == current:
+        return []
+    oldest = changes[0][0] if changes else current + 1
+    if version > current or version < oldest - 1:
+        return None
+    return _compact([op for changed, ops in changes if changed > version for op in ops])
+
+
+class StateSnapshot:
+    """The serialized state at one version, safe to read from any thread while the game moves on."""
+    __slots__ = ("state_id", "version", "_sections", "_changes", "_json")
+
+    def __init__(self, state_id, version, sections, changes):
+        self.state_id = state_id
+        self.version = version
+        self._sections = sections
+        self._changes = changes
+        self._json = None
+
+    def to_json(self):
+        if self._json is None:
+            self._json = "{" + ", ".join(self._sections) + "}"
+        return self._json
+
+    def patch_since(self, version):
+        """Ops bringing a client at `version` up to this snapshot, or None when it needs the full state."""
+        return _patch_since(self._changes, self.version, version)
+
+
+class SectionCache:
+    """Serialized state fragments, rebuilt only for sections marked dirty.
+
+    A fragment is a dict of top-level state keys produced by `build(section)`.
+    Treat the fragments handed out as read-only: they are reused by every
+    `to_dict()` call until their section is marked again. Each fragment's
+    JSON encoding is cached too, so an untouched section costs nothing to
+    send.
+
+    Rebuilding diffs each fragment against the previous one (two levels deep,
+    e.g. `/player/cash`). Any change bumps `version` and the patch is kept,
+    so clients can catch up from one of the last `history` versions with
+    `patch_since`. `state_id` tells one game (or restart, or load) from the
+    next.
+    """
+
+    def __init__(self, build, history=64):
+        self._build = build
+        self._fragments = {}
+        self._encoded = {}
+        self.dirty = set(SECTIONS)
+        self.deferred = 0  # open `@touches()` calls; each marks every section when it returns
+        self.state_id = secrets.token_hex(8)
+        self.version = 0
+        self._changes = deque(maxlen=history)  # (version, ops)
+
+    def mark(self, *sections):
+        """Mark `sections` (default: all of them) for rebuild."""
+        if self.deferred:
+            return
+        if not sections:
+            self.dirty.update(SECTIONS)
+            return
+        for section in sections:
+            self.dirty.add(section)
+            self.dirty.update(DEPENDENTS.get(section, ()))
+
+    def refresh(self):
+        """Rebuild dirty sections; record a new version if anything actually changed."""
+        if not self.dirty:
+            return self.version
+        ops = []
+        for section in SECTIONS:
+            if section not in self.dirty:
+                continue
+            fragment = self._build(section)
+            previous = self._fragments.get(section)
+            if previous is not None:
+                _diff(previous, fragment, "", 2, ops)
+            self._fragments[section] = fragment
+            self._encoded.pop(section, None)
+        self.dirty.clear()
+        if ops:
+            self.version += 1
+            self._changes.append((self.version, ops))
+        return self.version
+
+    def get(self, section):
+        self.refresh()
+        return self._fragments[section]
+
+    def get_json(self, section):
+        """The fragment encoded as JSON object members, without the surrounding braces."""
+        self.refresh()
+        if section not in self._encoded:
+            self._encoded[section] = json.dumps(self._fragments[section])[1:-1]
+        return self._encoded[section]
+
+    def patch_since(self, version):
+        """Ops bringing a client at `version` up to date, or None when it needs the full state."""
+        self.refresh()
+        return _patch_since(self._changes, self.version, version)
+
+    def snapshot(self):
+        """A `StateSnapshot` of the current state; cheap, it shares the cached section JSON."""
+        self.refresh()
+        sections = tuple(self.get_json(section) for section in SECTIONS)
+        return StateSnapshot(self.state_id, self.version, sections, tuple(self._changes))
+
+
+def touches(*sections):
+    """Decorator for `GameState` methods: mark `sections` (default: all) dirty once the call returns.
+
+    Marks made inside a call that marks everything are skipped; it covers them
+    when it returns.
+    """
+    def decorator(method):
+        if sections:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    self.mark_dirty(*sections)
+        else:
+            @functools.wraps(method)
+            def wrapper(self, *args, **kwargs):
+                cache = self._state_cache  # the call may swap in a new one
+                cache.deferred += 1
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    cache.deferred -= 1
+                    self.mark_dirty()
+        return wrapper
+    return decorator
@@ -1,5 +1,8 @@
 const state = {
-    data: null
+    data: null,
+    version: null,   // server state version the client holds (see applyStateUpdate)
+    stateId: null,
+    stream: null     // EventSource on /api/stream once connected (see connectStream)
 };
 let sharpeSession = null;
 
@@ -52,28 +55,81 @@ function initTabs() {
 }
 
 async function fetchState() {
-    const response = await fetch('/api/state');
+    const response = await fetch(withStateVersion('/api/state'));
     const data = await response.json();
-    updateUI(data);
+    updateUI(applyStateUpdate(data));
+    connectStream();
+}
+
+// Follow state changes pushed by the server; actions then only return their status
+function connectStream() {
+    if (state.stream || !window.EventSource) return;
+    const source = new EventSource(withStateVersion('/api/stream'));
+    const onUpdate = (e) => updateUI(applyStateUpdate(JSON.parse(e.data)));
+    source.addEventListener('state', onUpdate);
+    source.addEventListener('patch', onUpdate);
+    source.addEventListener('saved', () => fetchSavesList());
+    source.onerror = () => {
+        // Reconnect ourselves, from the version we hold now rather than the one in the original URL
+        source.close();
+        state.stream = null;
+        setTimeout(connectStream, 2000);
+    };
+    state.stream = source;
+}
+
+// Ask the server for a patch against the state we already hold instead of the full state
+function withStateVersion(url) {
+    const stream = state.stream ? '&stream=1' : '';
+    if (state.version === null) return `${url}?since=-1${stream}`;
+    return `${url}?since=${state.version}&state_id=${encodeURIComponent(state.stateId)}${stream}`;
+}
+
+// Responses carry either the full `state` or a JSON Patch (`patch`) against our copy
+// (or neither while the stream delivers changes)
+function applyStateUpdate(data) {
+    if (data.patch && state.data) {
+        data.patch.forEach(op => applyPatchOp(state.data, op));
+    } else if (data.state) {
+        state.data = data.state;
+    } else {
+        return state.data;
+    }
+    if (data.version !== undefined) {
+        state.version = data.version;
+        state.stateId = data.state_id;
+    }
+    return state.data;
+}
+
+function applyPatchOp(doc, op) {
+    const keys = op.path.split('/').slice(1).map(k => k.replace(/~1/g, '/').replace(/~0/g, '~'));
+    const last = keys.pop();
+    const parent = keys.reduce((node, key) => node[key], doc);
+    if (op.op === 'remove') {
+        delete parent[last];
+    } else {
+        parent[last] = op.value;
+    }
 }
 
 async function nextTurn() {
-    const response = await fetch('/api/next_turn', { method: 'POST' });
+    const response = await fetch(withStateVersion('/api/next_turn'), { method: 'POST' });
     const data = await response.json();
-    updateUI(data.state);
+    updateUI(applyStateUpdate(data));
 }
 
 async function startResearch() {
     const style = document.getElementById('research-style').value;
     const duration = parseInt(document.getElementById('research-duration').value);
 
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'start_research', style, duration })
     });
     const data = await response.json();
-    updateUI(data.state);
+    updateUI(applyStateUpdate(data));
 }
 
 async function hireQuant() {
@@ -83,7 +139,7 @@ async function hireQuant() {
 
     if (!name) return;
 
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'hire_quant', name, skill, salary })
@@ -92,8 +148,8 @@ async function hireQuant() {
     if (data.status === 'error') {
         alert(data.message);
     }
-    if (data.state) {
-        updateUI(data.state);
+    if (data.state || data.patch) {
+        updateUI(applyStateUpdate(data));
     }
 }
 
@@ -317,12 +373,23 @@ function updateTerminal(logs) {
 
 let pnlChart = null;
 
+function pnlBucketLabel(start, weeks) {
+    // Buckets are 1 week, a 4-week month or a 52-week year, counted from week 0
+    if (weeks >= 52) return `Y${Math.floor(start / 52) + 1}`;
+    if (weeks > 1) return `W${start + 1}-${start + weeks}`;
+    return `W${start + 1}`;
+}
+
 function updatePnLChart(history) {
     const ctx = document.getElementById('pnl-chart').getContext('2d');
-    const labels = Array.from({ length: history.length }, (_, i) => `W${i + 1}`);
+    // The state serves a tiered series ({start, weeks, pnl}); a plain list means full weekly resolution
+    const series = Array.isArray(history)
+        ? { start: history.map((_, i) => i), weeks: history.map(() => 1), pnl: history }
+        : history;
+    const labels = series.start.map((start, i) => pnlBucketLabel(start, series.weeks[i]));
     const cumPnL = [];
     let sum = 0;
-    history.forEach(val => {
+    series.pnl.forEach(val => {
         sum += val;
         cumPnL.push(sum);
     });
@@ -398,13 +465,13 @@ function formatInfraName(key) {
 }
 
 async function upgradeInfra(type) {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'upgrade_infra', infra_type: type })
     });
     const data = await response.json();
-    updateUI(data.state);
+    updateUI(applyStateUpdate(data));
 }
 
 async function updatePortfolio() {
@@ -417,13 +484,13 @@ async function updatePortfolio() {
         }
     });
 
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'update_portfolio', positions })
     });
     const data = await response.json();
-    updateUI(data.state);
+    updateUI(applyStateUpdate(data));
 }
 
 // Add event listener for update portfolio button
@@ -439,7 +506,7 @@ document.getElementById('close-trivia-btn').addEventListener('click', closeTrivi
 let sharpeChart = null;
 
 async function startSharpeGame() {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'start_mini_game' })
@@ -504,7 +571,7 @@ async function submitSharpeGuess() {
     const guess = parseFloat(document.getElementById('sharpe-guess').value);
     if (isNaN(guess)) return;
 
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'submit_mini_game', guess: guess })
@@ -532,7 +599,7 @@ async function submitSharpeGuess() {
         document.getElementById('sharpe-round').innerText = res.round_finished;
         document.getElementById('sharpe-score').innerText = res.cumulative_score;
         document.getElementById('sharpe-total').innerText = sharpeSession ? sharpeSession.total_rounds : res.round_finished;
-        updateUI(data.state);
+        updateUI(applyStateUpdate(data));
     } else if (res.next_round) {
         sharpeSession.round = res.next_round.round;
         sharpeSession.total_rounds = res.next_round.total_rounds;
@@ -551,7 +618,7 @@ function closeMinigameModal() {
 let triviaSession = null;
 
 async function startTriviaGame() {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'start_trivia_game' })
@@ -587,7 +654,7 @@ function renderTriviaQuestion(payload) {
 }
 
 async function submitTriviaAnswer(choice) {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'submit_trivia_game', choice })
@@ -600,7 +667,7 @@ async function submitTriviaAnswer(choice) {
     resultDiv.classList.remove('hidden');
     resultDiv.innerText = res.correct ? 'Correct!' : `Incorrect. Answer was option ${res.answer_index + 1}.`;
     if (res.game_over) {
-        updateUI(data.state);
+        updateUI(applyStateUpdate(data));
         document.getElementById('trivia-score').innerText = res.score;
         document.getElementById('trivia-options').innerHTML = '';
         resultDiv.innerText += ` Reward: ${res.reward}`;
@@ -620,7 +687,7 @@ document.getElementById('submit-mm-btn').addEventListener('click', submitMMActio
 document.getElementById('close-mm-btn').addEventListener('click', closeMMModal);
 
 async function startMMGame() {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'start_mm_game' })
@@ -639,7 +706,7 @@ async function submitMMAction() {
     const spread = parseFloat(document.getElementById('mm-spread').value);
     if (isNaN(spread)) return;
 
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'submit_mm_action', spread: spread })
@@ -654,7 +721,7 @@ async function submitMMAction() {
         resultDiv.classList.remove('hidden');
         const xpText = data.result.xp_gain ? `<br>XP: +${data.result.xp_gain}` : '';
         resultText.innerHTML = `Game Over!<br>Final PnL: ${data.result.state.pnl.toFixed(2)}<br>Reward: ${data.result.reward}${xpText}`;
-        updateUI(data.state); // Update main game state for rewards
+        updateUI(applyStateUpdate(data)); // Update main game state for rewards
     }
 }
 
@@ -710,18 +777,18 @@ function showEvent(event) {
 
 async function handleEventChoice(effect) {
     if (effect === 'restart') {
-        const response = await fetch('/api/action', {
+        const response = await fetch(withStateVersion('/api/action'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ type: 'restart_game' })
         });
         const data = await response.json();
-        updateUI(data.state);
+        updateUI(applyStateUpdate(data));
         document.getElementById('event-modal').classList.add('hidden');
     } else if (effect === 'continue') {
         closeEventModal();
     } else if (effect && typeof effect === 'object' && effect.type === 'reset_offer') {
-        const response = await fetch('/api/action', {
+        const response = await fetch(withStateVersion('/api/action'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ type: 'handle_reset_offer', decision: effect.decision })
@@ -730,16 +797,16 @@ async function handleEventChoice(effect) {
         if (data.message) {
             console.log(data.message);
         }
-        updateUI(data.state);
+        updateUI(applyStateUpdate(data));
         document.getElementById('event-modal').classList.add('hidden');
     } else if (effect && typeof effect === 'object' && effect.type && effect.type.includes('infra')) {
-        const response = await fetch('/api/action', {
+        const response = await fetch(withStateVersion('/api/action'), {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ type: 'handle_infra_request', effect })
         });
         const data = await response.json();
-        updateUI(data.state);
+        updateUI(applyStateUpdate(data));
         document.getElementById('event-modal').classList.add('hidden');
     }
 }
@@ -747,7 +814,7 @@ async function handleEventChoice(effect) {
 function closeEventModal() {
     document.getElementById('event-modal').classList.add('hidden');
     // Call backend to clear event
-    fetch('/api/action', {
+    fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'clear_event' })
@@ -762,14 +829,14 @@ async function hireInfra() {
     const name = document.getElementById('hire-infra-name').value;
     const skill = parseInt(document.getElementById('hire-infra-skill').value);
     if (!name || isNaN(skill)) return;
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'hire_infra', name, skill })
     });
     const data = await response.json();
     if (data.message) alert(data.message);
-    if (data.state) updateUI(data.state);
+    if (data.state || data.patch) updateUI(applyStateUpdate(data));
 }
 
 function updateSharpeHUD() {
@@ -826,7 +893,7 @@ function updateResearchDurationHint() {
 }
 
 async function fetchSavesList() {
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'list_saves' })
@@ -839,27 +906,38 @@ async function fetchSavesList() {
         defaultOpt.value = 'savegame';
         defaultOpt.innerText = 'savegame (default)';
         select.appendChild(defaultOpt);
-        data.saves.forEach(name => {
-            if (name === 'savegame') return;
+        const slots = data.slots || data.saves.map(name => ({ name }));
+        slots.forEach(slot => {
+            if (slot.name === 'savegame') {
+                defaultOpt.innerText = `savegame (default)${saveSlotLabel(slot)}`;
+                return;
+            }
             const opt = document.createElement('option');
-            opt.value = name;
-            opt.innerText = name;
+            opt.value = slot.name;
+            opt.innerText = `${slot.name}${saveSlotLabel(slot)}`;
             select.appendChild(opt);
         });
     }
 }
 
+function saveSlotLabel(slot) {
+    if (slot.week == null) return '';
+    const level = slot.level == null ? '' : `, L${slot.level}`;
+    const aum = slot.aum == null ? '' : `, ${formatMoney(slot.aum)}`;
+    return ` - Y${slot.year} W${slot.week}${aum}${level}`;
+}
+
 async function saveGame() {
     const nameInput = document.getElementById('save-name-input');
     const name = (nameInput.value || 'savegame').trim();
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'save_game', name })
     });
     const data = await response.json();
-    if (data.state) {
-        updateUI(data.state);
+    if (data.state || data.patch) {
+        updateUI(applyStateUpdate(data));
     }
     await fetchSavesList();
     alert(data.message || "Game saved");
@@ -868,12 +946,12 @@ async function saveGame() {
 async function loadGame() {
     const select = document.getElementById('load-select');
     const name = select.value || 'savegame';
-    const response = await fetch('/api/action', {
+    const response = await fetch(withStateVersion('/api/action'), {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ type: 'load_game', name })
     });
     const data = await response.json();
-    updateUI(data.state);
+    updateUI(applyStateUpdate(data));
     alert(data.message || "Game loaded!");
 }
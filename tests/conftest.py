@@ -1,4 +1,3 @@
-import random
 import sys
 from pathlib import Path
 
@@ -12,11 +11,6 @@ if str(PROJECT_ROOT) not in sys.path:
 from game_engine import GameState  # noqa: E402
 
 
-@pytest.fixture(autouse=True)
-def _reset_random_seed():
-    random.seed(0)
-
-
 @pytest.fixture
 def game_state():
-    return GameState()
+    return GameState(seed=0)
@@ -0,0 +1,284 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app as server
+import memory
+from autosave import AutosaveWriter
+from game_engine import GameState
+from metrics import RequestMetrics
+from sessions import SESSION_DIR, SessionStore
+
+
+def seeded_game():
+    game = GameState(seed=0)
+    game.process_start_of_week()
+    return game
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(server, "sessions", SessionStore(game_factory=seeded_game))
+    monkeypatch.setattr(server, "request_metrics", RequestMetrics())
+    return server.app.test_client()
+
+
+def game_of(client):
+    """The game behind the test client's session cookie."""
+    session = server.sessions.open(client.get_cookie(server.SESSION_COOKIE).value)
+    server.sessions.release(session)
+    return session.game
+
+
+class TestStateEndpoint:
+    def test_conditional_get_returns_304_until_state_changes(self, client):
+        etag = client.get("/api/state").headers["ETag"]
+
+        assert client.get("/api/state", headers={"If-None-Match": etag}).status_code == 304
+        client.post("/api/action", json={"type": "upgrade_infra", "infra_type": "compute_level"})
+        assert client.get("/api/state", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_delta_mode_sends_only_changed_paths(self, client):
+        envelope = client.get("/api/state?since=-1").get_json()
+        assert "state" in envelope
+        query = f"since={envelope['version']}&state_id={envelope['state_id']}"
+
+        response = client.post(f"/api/action?{query}", json={"type": "upgrade_infra", "infra_type": "compute_level"})
+        paths = [op["path"] for op in response.get_json()["patch"]]
+
+        assert "/infrastructure/compute_level" in paths
+        assert "/alphas" not in paths
+
+
+class TestBatch:
+    SETUP = [
+        {"type": "hire_quant", "name": "Ada", "skill": 60, "salary": 150000},
+        {"type": "start_research", "style": "Trend", "duration": 3},
+        {"type": "upgrade_infra", "infra_type": "compute_level"},
+    ]
+
+    def test_actions_run_in_order_with_one_state(self, client):
+        reply = client.post("/api/batch", json={"actions": self.SETUP + [{"type": "next_turn"}]}).get_json()
+
+        assert reply["status"] == "ok" and not reply["rolled_back"]
+        assert [result["status"] for result in reply["results"]] == ["ok"] * 4
+        assert reply["state"]["week"] == 2
+        assert reply["state"]["infrastructure"]["compute_level"] == 2
+        assert game_of(client).action_count == 4
+
+    def test_failures_are_reported_per_action(self, client):
+        actions = [{"type": "fire_staff", "staff_type": "quant", "name": "Nobody"}, {"type": "start_mini_game"},
+                   {"type": "hire_quant"}, {"type": "warp"}] + self.SETUP
+        reply = client.post("/api/batch", json={"actions": actions}).get_json()
+
+        assert reply["status"] == "error" and reply["message"] == "4 of 7 actions failed"
+        assert [result["status"] for result in reply["results"]] == ["error"] * 4 + ["ok"] * 3
+        assert reply["state"]["infrastructure"]["compute_level"] == 2
+
+    def test_atomic_batch_is_undone_by_a_failure(self, client):
+        client.post("/api/next_turn?weeks=2")
+        before = game_of(client).save_document()
+        actions = self.SETUP + [{"type": "fire_staff", "staff_type": "quant", "name": "Nobody"}, {"type": "next_turn"}]
+
+        reply = client.post("/api/batch", json={"actions": actions, "atomic": True}).get_json()
+
+        assert reply["rolled_back"] and len(reply["results"]) == 4
+        assert reply["state"]["infrastructure"]["compute_level"] == 1
+        assert game_of(client).save_document() == before
+
+    def test_batch_size_is_limited(self, client):
+        reply = client.post("/api/batch", json={"actions": [{"type": "clear_event"}] * 101}).get_json()
+        assert reply["status"] == "error" and "results" not in reply
+
+
+class TestDebugPhases:
+    def test_phase_timings_can_be_switched_on_per_session(self, client):
+        assert client.get("/api/debug/phases").get_json()["phases"] == {}
+
+        assert client.post("/api/debug/phases", json={"enabled": True}).get_json()["enabled"]
+        client.post("/api/next_turn?weeks=2")
+        assert client.get("/api/debug/phases").get_json()["phases"]["returns"]["calls"] == 2
+        assert client.post("/api/debug/phases", json={"reset": True}).get_json()["phases"] == {}
+
+    def test_phase_timings_are_local_only(self, client):
+        assert client.get("/api/debug/phases", environ_base={"REMOTE_ADDR": "10.0.0.7"}).status_code == 403
+
+
+class TestMetrics:
+    def test_requests_are_measured_per_action(self, client):
+        client.get("/api/state")
+        client.post("/api/action", json={"type": "fire_staff", "staff_type": "quant", "name": "Nobody"})
+        client.post("/api/action", json={"type": "no such action"})
+
+        response = client.get("/api/metrics")
+        text = response.get_data(as_text=True)
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+        assert 'pm_sim_request_errors_total{endpoint="/api/action",action="fire_staff"} 1' in text
+        assert 'pm_sim_request_duration_seconds_count{endpoint="/api/state",action=""} 1' in text
+        assert 'action="unknown"' in text
+        assert "pm_sim_sessions 1" in text
+
+    def test_metrics_are_local_only(self, client):
+        for path in ("/api/metrics", "/api/autosave", "/api/sessions"):
+            assert client.get(path, environ_base={"REMOTE_ADDR": "10.0.0.7"}).status_code == 403
+
+
+def profiled(token):
+    session = server.sessions.open(token)
+    server.sessions.release(session)
+    return session.profile is not None
+
+
+class TestProfiler:
+    def test_profiles_the_next_actions_of_one_session(self, client):
+        client.get("/api/state")
+        token = client.get_cookie(server.SESSION_COOKIE).value
+        other = server.app.test_client()
+        other.get("/api/state")
+
+        result = {}
+        admin = threading.Thread(target=lambda: result.update(server.app.test_client().post(
+            "/api/admin/profile", json={"token": token, "actions": 2, "seconds": 10, "top": 3}).get_json()))
+        admin.start()
+        while not profiled(token):
+            time.sleep(0.001)
+        other.post("/api/next_turn")  # another session: not traced
+        client.post("/api/next_turn?weeks=2")
+        client.post("/api/action", json={"type": "upgrade_infra", "infra_type": "compute_level"})
+        admin.join(10)
+
+        assert result["status"] == "ok" and result["complete"] and result["actions"] == 2
+        assert len(result["top"]) == 3
+        assert "GameState.upgrade_infra" in result["collapsed"]
+        assert result["collapsed"].count("GameState.perform:") >= 2
+        assert game_of(client).week == 3
+
+    def test_only_sessions_in_memory_can_be_profiled(self, client):
+        response = client.post("/api/admin/profile", json={"token": "x" * 20})
+        assert response.status_code == 404
+
+
+class TestDebugMemory:
+    def test_memory_report_for_a_session(self, client):
+        client.post("/api/next_turn?weeks=4")
+        token = client.get_cookie(server.SESSION_COOKIE).value
+
+        mine = client.get("/api/debug/memory").get_json()
+        assert mine["token"] == token and mine["subsystems"]["pnl_history"] > 0
+        other = server.app.test_client(use_cookies=False)
+        assert other.get(f"/api/debug/memory?token={token}").get_json()["total_bytes"] > 0
+        assert other.get("/api/debug/memory?token=" + "x" * 20).status_code == 404
+
+    def test_tracemalloc_snapshot_diffs(self, client, monkeypatch):
+        monkeypatch.setattr(server, "trace_snapshots", memory.TraceSnapshots())
+        try:
+            first = client.post("/api/debug/memory/snapshot").get_json()["id"]
+            client.post("/api/next_turn?weeks=2")
+            diff = client.get(f"/api/debug/memory/diff?from={first}&top=5").get_json()
+            assert diff["status"] == "ok" and len(diff["top"]) <= 5
+            assert client.get("/api/debug/memory/diff?from=999").status_code == 404
+        finally:
+            client.post("/api/debug/memory/stop")
+
+
+class TestStream:
+    def test_stream_pushes_state_then_deltas(self, client):
+        response = client.get("/api/stream", buffered=False)
+        assert response.mimetype == "text/event-stream"
+        messages = response.response  # one server-sent event per chunk
+
+        event, data = next(messages).decode().strip().split("\n")
+        assert event == "event: state"
+        first = json.loads(data.removeprefix("data: "))
+        assert first["state"]["week"] == 1
+
+        reply = client.post("/api/next_turn?stream=1").get_json()
+        assert "state" not in reply and "patch" not in reply
+        event, data = next(messages).decode().strip().split("\n")
+        assert event == "event: patch"
+        patch = json.loads(data.removeprefix("data: "))
+        assert patch["version"] == reply["version"] and patch["state_id"] == first["state_id"]
+        assert next(messages).decode().startswith("event: log")
+        response.close()
+
+    def test_finished_saves_are_announced(self, client):
+        client.get("/api/state")
+        response = client.get("/api/stream", buffered=False)
+        messages = response.response
+        next(messages)
+
+        client.post("/api/action?stream=1", json={"type": "save_game", "name": "slot"})
+        server.save_writer.flush()
+        assert next(messages).decode() == 'event: saved\ndata: {"name": "slot", "format": "binary"}\n\n'
+        response.close()
+
+
+class TestAutosave:
+    def test_every_action_is_journaled_to_the_session(self, client, monkeypatch):
+        monkeypatch.setattr(server, "sessions", SessionStore(game_factory=seeded_game, journaled=True))
+
+        client.post("/api/action", json={"type": "hire_quant", "name": "Ann", "skill": 55, "salary": 100_000})
+        client.post("/api/next_turn?weeks=3")
+        token = client.get_cookie(server.SESSION_COOKIE).value
+        assert GameState.load(token, SESSION_DIR).save_document() == game_of(client).save_document()
+
+        client.post("/api/action", json={"type": "restart_game"})
+        client.post("/api/next_turn")
+        assert GameState.load(token, SESSION_DIR).save_document() == game_of(client).save_document()
+
+    def test_saves_are_written_in_the_background(self, client, monkeypatch):
+        monkeypatch.setattr(server, "save_writer", AutosaveWriter())
+        for _ in range(3):
+            client.post("/api/action", json={"type": "save_game", "name": "slot"})
+        saves = client.post("/api/action", json={"type": "list_saves"}).get_json()["saves"]
+
+        assert saves == ["slot"]
+        stats = client.get("/api/autosave").get_json()
+        assert stats["pending"] == 0 and stats["errors"] == 0
+        assert stats["written"] + stats["coalesced"] == 3
+        loaded = client.post("/api/action", json={"type": "load_game", "name": "slot"}).get_json()
+        assert loaded["state"]["player"]["cash"] == game_of(client).player.cash
+
+
+class TestSessions:
+    def test_save_slots_belong_to_their_session(self, client):
+        other = server.app.test_client()
+        other.get("/api/state")
+        client.post("/api/action", json={"type": "upgrade_infra", "infra_type": "compute_level"})
+        client.post("/api/action", json={"type": "save_game", "name": "mine"})
+        server.save_writer.flush()
+
+        assert client.post("/api/action", json={"type": "list_saves"}).get_json()["saves"] == ["mine"]
+        assert other.post("/api/action", json={"type": "list_saves"}).get_json()["saves"] == []
+        loaded = other.post("/api/action", json={"type": "load_game", "name": "mine"}).get_json()
+        assert loaded["state"]["infrastructure"]["compute_level"] != game_of(client).infrastructure.compute_level
+
+    def test_each_client_gets_its_own_fund(self, client):
+        other = server.app.test_client()
+        client.post("/api/action", json={"type": "upgrade_infra", "infra_type": "compute_level"})
+
+        mine = client.get("/api/state").get_json()["infrastructure"]["compute_level"]
+        theirs = other.get("/api/state").get_json()["infrastructure"]["compute_level"]
+        assert mine == theirs + 1
+        assert client.get_cookie(server.SESSION_COOKIE).value != other.get_cookie(server.SESSION_COOKIE).value
+
+    def test_header_token_selects_the_session(self, client):
+        client.post("/api/next_turn?weeks=2")
+        token = client.get_cookie(server.SESSION_COOKIE).value
+
+        api = server.app.test_client(use_cookies=False)
+        state = api.get("/api/state", headers={server.SESSION_HEADER: token}).get_json()
+        assert state["week"] == game_of(client).week == 3
+
+    def test_evicted_session_comes_back_from_disk(self, client):
+        client.post("/api/next_turn?weeks=4")
+        token = client.get_cookie(server.SESSION_COOKIE).value
+        expected = game_of(client).save_document()
+
+        assert server.sessions.evict(token)
+        assert token not in server.sessions
+        assert client.get("/api/state").get_json()["week"] == 5
+        assert game_of(client).save_document() == expected
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+import savefile
+from autosave import AutosaveWriter
+from game_engine import GameState
+
+
+@pytest.fixture
+def writer(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    writer = AutosaveWriter()
+    yield writer
+    writer.close()
+
+
+class TestAutosaveWriter:
+    def test_burst_to_one_slot_is_coalesced(self, writer, game_state):
+        release = threading.Event()
+        writer.submit(game_state, "blocker", on_written=release.wait)
+        for week in range(3):
+            game_state.advance(1, stop_on=())
+            writer.submit(game_state, "slot")
+        expected = game_state.save_document()
+        release.set()
+
+        assert writer.flush(timeout=10)
+        stats = writer.stats()
+        assert (stats["written"], stats["coalesced"], stats["errors"]) == (2, 2, 0)
+        assert stats["max_ms"] >= stats["last_ms"] > 0
+        assert GameState.load("slot").save_document() == expected
+
+    def test_snapshot_is_taken_at_submit(self, writer, game_state):
+        release = threading.Event()
+        writer.submit(game_state, "blocker", on_written=release.wait)
+        writer.submit(game_state, "slot")
+        expected = game_state.save_document()
+        game_state.advance(3, stop_on=())
+        release.set()
+
+        assert writer.flush(timeout=10)
+        assert GameState.load("slot").save_document() == expected
+
+    def test_failed_write_keeps_the_previous_save(self, writer, game_state, tmp_path, monkeypatch):
+        game_state.save("slot")
+        before = GameState.load("slot").save_document()
+
+        def fail(f, **arrays):
+            f.write(b"partial")
+            raise OSError("disk full")
+        monkeypatch.setattr(savefile.np, "savez_compressed", fail)
+        game_state.advance(2, stop_on=())
+        writer.submit(game_state, "slot")
+
+        assert writer.flush(timeout=10)
+        assert writer.stats()["errors"] == 1
+        assert "disk full" in writer.stats()["last_error"]
+        assert GameState.load("slot").save_document() == before
+        assert sorted(p.name for p in (tmp_path / "saves").iterdir()) == [".manifest.json", "slot.npz"]
@@ -0,0 +1,159 @@
+import json
+import sys
+import threading
+import urllib.request
+from collections import Counter
+
+import pytest
+from werkzeug.serving import make_server
+
+import app as server
+from game_engine import AlphaStrategy, GameState, Quant
+from sessions import SessionStore
+
+CLIENTS = 16
+ROUNDS = 12
+TOKENS = [f"stress-session-{i:02d}" for i in range(4)]
+
+
+def busy_fund():
+    """A fund big enough that a turn takes a while, and rich enough to survive the test."""
+    game = GameState(seed=0)
+    game.player.cash = game.player.aum = 1e12
+    game.team = [Quant(f"Q{i}", 60, 200_000) for i in range(30)]
+    for i in range(300):
+        alpha = AlphaStrategy(f"Alpha {i}", ("Trend", "MeanReversion", "Value")[i % 3], 3)
+        alpha.current_expected_return = 0.1
+        alpha.volatility = 0.1
+        game.alphas["live"].append(alpha)
+    game.portfolio.positions = [{"alpha_id": a.id, "weight": 1 / 300} for a in game.alphas["live"]]
+    game.process_start_of_week()
+    return game
+
+
+def check_consistent(state):
+    """Sections of one response must come from the same moment of the game."""
+    weeks_played = (state["year"] - 1) * 52 + state["week"] - 1
+    assert state["player"]["pnl_history"]["total_weeks"] == weeks_played
+
+
+@pytest.fixture
+def base_url(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(server, "sessions", SessionStore(game_factory=busy_fund))
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    thread.join()
+
+
+@pytest.fixture
+def frequent_switches():
+    """Switch threads often, so unsynchronized code would interleave mid-turn."""
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def call(base_url, path, token, body=None, method="GET", timeout=30):
+    data = None if body is None and method == "GET" else json.dumps(body or {}).encode()
+    request = urllib.request.Request(base_url + path, data=data, method=method, headers={
+        server.SESSION_HEADER: token,
+        "Content-Type": "application/json",
+    })
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, json.loads(response.read())
+
+
+class TestConcurrentClients:
+    def test_mutations_are_serialized_per_session(self, base_url, frequent_switches):
+        turns, actions, errors = Counter(), Counter(), []
+        done = threading.Event()
+
+        def client(index):
+            token = TOKENS[index % len(TOKENS)]
+            seen = -1
+            try:
+                for round_ in range(ROUNDS):
+                    if round_ % 3 == 0:
+                        call(base_url, "/api/action", token, {"type": "upgrade_infra", "infra_type": "compute_level"}, "POST")
+                        actions[token] += 1
+                    else:
+                        call(base_url, "/api/next_turn", token, method="POST")
+                        turns[token] += 1
+                    status, envelope = call(base_url, "/api/state?since=-1", token)
+                    assert status == 200
+                    assert envelope["version"] >= seen  # a client never sees the state go back
+                    seen = envelope["version"]
+                    check_consistent(envelope["state"])
+            except Exception as exc:  # surfaced below, with the thread that failed
+                errors.append(f"client {index}: {exc!r}")
+
+        def reader(index):
+            try:
+                while not done.is_set():
+                    check_consistent(call(base_url, "/api/state", TOKENS[index % len(TOKENS)])[1])
+            except Exception as exc:
+                errors.append(f"reader {index}: {exc!r}")
+
+        writers = [threading.Thread(target=client, args=(i,)) for i in range(CLIENTS)]
+        readers = [threading.Thread(target=reader, args=(i,)) for i in range(4)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        assert errors == []
+        for token in TOKENS:
+            game = server.sessions.open(token).game
+            assert (game.year - 1) * 52 + game.week == 1 + turns[token]
+            assert game.action_count == turns[token] + actions[token]
+
+    def test_reads_do_not_wait_for_a_turn_in_progress(self, base_url):
+        token = TOKENS[0]
+        call(base_url, "/api/next_turn", token, method="POST")
+        session = server.sessions.open(token)
+
+        with session.lock:  # a long turn holding the session
+            status, state = call(base_url, "/api/state", token, timeout=5)
+
+        server.sessions.release(session)
+        assert status == 200
+        assert state["week"] == 2
+
+    def test_other_sessions_are_served_while_one_is_restored(self, base_url, monkeypatch):
+        restoring, token = TOKENS[0], TOKENS[1]
+        call(base_url, "/api/next_turn", restoring, method="POST")
+        call(base_url, "/api/state", token)
+        assert server.sessions.evict(restoring)
+
+        started, finish = threading.Event(), threading.Event()
+        load = GameState.load
+
+        def slow_load(name, directory):
+            started.set()
+            finish.wait(30)
+            return load(name, directory)
+
+        monkeypatch.setattr(GameState, "load", staticmethod(slow_load))
+        responses = []
+        thread = threading.Thread(target=lambda: responses.append(call(base_url, "/api/state", restoring)))
+        thread.start()
+        try:
+            assert started.wait(5)
+            status, state = call(base_url, "/api/state", token, timeout=5)
+            assert status == 200 and state["week"] == 1
+            assert restoring in server.sessions  # still loading, held by its placeholder
+        finally:
+            finish.set()
+            thread.join()
+
+        assert responses[0][0] == 200
+        assert responses[0][1]["week"] == 2
+        assert server.sessions.stats()["restored"] == 1
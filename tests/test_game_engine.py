@@ -1,6 +1,11 @@
+import copy
+import json
+
 import pytest
 
-from game_engine import AlphaStrategy, GameState, Quant
+import state_cache
+
+from game_engine import AlphaStrategy, Event, GameState, Player, Quant
 
 
 class TestPortfolio:
@@ -61,3 +66,313 @@ class TestResearch:
         assert alpha.success_prob == pytest.approx(0.65)
         assert alpha.potential_super == pytest.approx(0.03)
         assert alpha.resilience == pytest.approx(0.3)
+
+
+class TestAdvance:
+    def test_advance_plays_requested_weeks(self, game_state):
+        summary = game_state.advance(5, stop_on=())
+
+        assert [s["week"] for s in summary] == [1, 2, 3, 4, 5]
+        assert game_state.week == 6
+        assert len(game_state.player.pnl_history) == 5
+
+    def test_advance_stops_on_game_over(self, game_state):
+        game_state.player.job_security = 0
+
+        summary = game_state.advance(10)
+
+        assert len(summary) == 1
+        assert "GAME OVER" in summary[0]["events"]
+
+    def test_advance_ignores_blocking_events_already_queued(self, game_state):
+        game_state.events_queue.append(Event("Infrastructure Ask", "An old ask", []))
+
+        summary = game_state.advance(5, stop_on=("Infrastructure Ask",))
+
+        assert len(summary) == 5
+
+
+class TestRandomStreams:
+    def test_same_seed_replays_identically(self):
+        runs = []
+        for _ in range(2):
+            game = GameState(seed=42)
+            game.process_start_of_week()
+            game.hire_quant("Alice", 60, 120_000)
+            game.start_research("Trend", 3)
+            game.advance(20, stop_on=())
+            runs.append(game.player.pnl_history)
+
+        assert runs[0] == runs[1]
+
+    def test_loaded_save_continues_the_same_stream(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game = GameState(seed=7)
+        game.process_start_of_week()
+        game.hire_quant("Alice", 60, 120_000)
+        game.advance(5, stop_on=())
+        game.save("replay")
+
+        loaded = GameState.load("replay")
+        game.advance(10, stop_on=())
+        loaded.advance(10, stop_on=())
+
+        assert loaded.seed == 7
+        assert loaded.player.pnl_history == game.player.pnl_history
+        assert loaded.rng.random() == game.rng.random()
+
+    def test_spawned_streams_are_independent_and_reproducible(self):
+        first = GameState(seed=3).spawn_rng(2)
+        second = GameState(seed=3).spawn_rng(2)
+
+        draws = [g.random(4).tolist() for g in first]
+        assert draws == [g.random(4).tolist() for g in second]
+        assert draws[0] != draws[1]
+
+
+class TestAlphaRegistry:
+    def test_research_ids_are_unique_and_increasing(self, game_state):
+        alphas = [game_state.start_research("Value", 12) for _ in range(300)]
+
+        ids = [a.id for a in alphas]
+        assert len(set(ids)) == 300
+        assert [int(i.split("_")[1]) for i in ids] == sorted(int(i.split("_")[1]) for i in ids)
+        assert game_state.get_alpha_by_id(ids[150]) is alphas[150]
+
+    def test_move_updates_status_and_buckets(self, game_state):
+        alpha = AlphaStrategy("Stored Alpha", "Value", 3)
+        game_state.alphas["stored_for_ensemble"].append(alpha)
+
+        game_state.alphas.move(alpha, "live")
+
+        assert alpha.status == "live"
+        assert list(game_state.alphas["live"]) == [alpha]
+        assert len(game_state.alphas["stored_for_ensemble"]) == 0
+
+    def test_save_and_load_keep_ids(self, game_state, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        first = game_state.start_research("Trend", 3)
+        game_state.save("registry")
+
+        loaded = GameState.load("registry")
+        second = loaded.start_research("Trend", 3)
+
+        assert loaded.get_alpha_by_id(first.id).name == first.name
+        assert second.id != first.id
+
+    def test_old_save_with_duplicate_ids_loads_with_fresh_ids(self, game_state, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        first, second = (AlphaStrategy(name, "Value", 3) for name in ("First", "Second"))
+        for alpha in (first, second):
+            alpha.status = "live"
+            game_state.alphas["live"].append(alpha)
+        data = game_state.to_dict(full_history=True)
+        for alpha in data["alphas"]["live"]:
+            alpha["id"] = "alpha_4242"
+        data["portfolio"]["positions"] = [{"alpha_id": "alpha_4242", "weight": 0.3},
+                                          {"alpha_id": "alpha_4242", "weight": 0.2}]
+        (tmp_path / "saves").mkdir()
+        (tmp_path / "saves" / "old.json").write_text(json.dumps(data))
+
+        loaded = GameState.load("old")
+
+        live = list(loaded.alphas["live"])
+        assert [a.name for a in live] == ["First", "Second"]
+        assert live[0].id == "alpha_4242" and live[1].id not in ("alpha_4242", None)
+        assert loaded.get_alpha_by_id(live[1].id) is live[1]
+        assert loaded.portfolio.positions == [{"alpha_id": "alpha_4242", "weight": 0.3},
+                                              {"alpha_id": live[1].id, "weight": 0.2}]
+        assert loaded.start_research("Trend", 3).id not in {a.id for a in live}
+
+
+class TestAlphaBook:
+    def _live_alpha(self, game_state, expected_return, weight):
+        alpha = AlphaStrategy("Live", "Value", 3)
+        alpha.current_expected_return = expected_return
+        alpha.volatility = 0.0
+        alpha.beta = 0.0
+        game_state.alphas["live"].append(alpha)
+        return {"alpha_id": alpha.id, "weight": weight}
+
+    def test_weekly_pnl_is_weighted_sum_of_alpha_returns(self, game_state):
+        game_state.portfolio.positions = [
+            self._live_alpha(game_state, 0.52, 0.5),
+            self._live_alpha(game_state, 0.26, 0.25),
+        ]
+        aum = game_state.player.aum
+
+        game_state.process_end_of_week()
+
+        expected = aum * (0.5 * 0.52 + 0.25 * 0.26) / 52
+        assert game_state.player.pnl_history[-1] == pytest.approx(expected)
+
+    def test_decay_updates_views_in_place(self, game_state):
+        live = AlphaStrategy("Live", "Trend", 3)
+        live.current_expected_return = 0.2
+        live.decay_rate = 0.1
+        game_state.alphas["live"].append(live)
+        researching = game_state.start_research("Trend", 6)
+        researching.current_expected_return = 0.2
+
+        game_state.process_start_of_week()
+
+        assert live.current_expected_return == pytest.approx(0.18)
+        assert researching.current_expected_return == pytest.approx(0.2)
+        assert live.to_dict()["current_expected_return"] == pytest.approx(0.18)
+
+
+class TestRecords:
+    def test_to_dict_walks_declared_fields_only(self, game_state):
+        alpha = AlphaStrategy("Fresh", "Trend", 3)
+        assert "success_prob" not in alpha.to_dict()
+        assert not hasattr(alpha, "__dict__")
+
+        alpha = game_state.start_research("Trend", 3)
+        data = alpha.to_dict()
+
+        assert list(data)[:3] == ["id", "name", "style"]
+        assert data["success_prob"] == alpha.success_prob
+        assert AlphaStrategy.from_dict(data).to_dict() == data
+
+    def test_player_from_old_save_keeps_defaults(self):
+        player = Player.from_dict({"cash": 5, "aum": 7_000_000, "retired_field": 1})
+
+        assert player.cash == 5
+        assert player.starting_aum == 7_000_000
+        assert player.reset_offer_cooldown == 0
+        assert "retired_field" not in player.to_dict()
+
+
+class TestStateCache:
+    def _fresh(self, game_state):
+        game_state.mark_dirty()
+        return game_state.to_dict()
+
+    def test_cached_state_matches_a_full_rebuild_after_actions(self, game_state):
+        game_state.process_start_of_week()
+        game_state.player.cash = 5_000_000
+        steps = [
+            lambda: game_state.hire_quant("Alice", 60, 120_000),
+            lambda: game_state.start_research("Trend", 2),
+            lambda: game_state.upgrade_infra("compute_level"),
+            lambda: game_state.advance(3, stop_on=()),
+            lambda: game_state.clear_event(),
+            lambda: game_state.fire_staff("quant", "Alice"),
+        ]
+        for step in steps:
+            step()
+            cached = game_state.to_dict()
+            assert cached == self._fresh(game_state)
+
+    def test_untouched_sections_are_reused(self, game_state):
+        first = game_state.to_dict()
+        game_state.clear_event()
+        second = game_state.to_dict()
+
+        assert second["alphas"] is first["alphas"]
+        assert second["team"] is first["team"]
+        assert second["events_queue"] is not first["events_queue"]
+
+    def test_turn_marks_every_section_even_when_it_raises(self, game_state, monkeypatch):
+        game_state.to_dict()
+        monkeypatch.setattr(GameState, "log_week_story", lambda *args: 1 / 0)
+
+        with pytest.raises(ZeroDivisionError):
+            game_state.process_end_of_week()
+
+        assert game_state._state_cache.deferred == 0
+        assert game_state._state_cache.dirty == set(state_cache.SECTIONS)
+
+    def test_to_json_matches_to_dict(self, game_state):
+        game_state.process_start_of_week()
+        game_state.to_json()
+        game_state.hire_quant("Alice", 60, 120_000)
+
+        assert json.loads(game_state.to_json()) == json.loads(json.dumps(game_state.to_dict()))
+
+
+def apply_patch(doc, ops):
+    for op in ops:
+        *parents, last = [k.replace("~1", "/").replace("~0", "~") for k in op["path"].split("/")[1:]]
+        node = doc
+        for key in parents:
+            node = node[key]
+        if op["op"] == "remove":
+            del node[last]
+        else:
+            node[last] = op["value"]
+    return doc
+
+
+class TestStateVersions:
+    def test_patches_replay_to_the_current_state(self, game_state):
+        game_state.process_start_of_week()
+        game_state.player.cash = 5_000_000
+        start_version = game_state.version
+        client = copy.deepcopy(game_state.to_dict())
+
+        game_state.hire_quant("Alice", 60, 120_000)
+        game_state.advance(4, stop_on=())
+        game_state.upgrade_infra("data_quality")
+
+        assert game_state.version > start_version
+        patched = apply_patch(client, copy.deepcopy(game_state.patch_since(start_version)))
+        assert json.loads(json.dumps(patched)) == json.loads(game_state.to_json())
+
+    def test_version_only_moves_on_real_changes(self, game_state):
+        version = game_state.version
+        game_state.mark_dirty()
+
+        assert game_state.version == version
+        assert game_state.patch_since(version) == []
+        assert game_state.patch_since(version + 5) is None
+
+
+class TestSaveFormats:
+    def _played(self):
+        game = GameState(seed=5)
+        game.process_start_of_week()
+        game.hire_quant("Alice", 60, 120_000)
+        game.hire_infra_specialist("Bob", 55)
+        game.start_research("Trend", 3)
+        game.advance(30, stop_on=())
+        return game
+
+    def test_binary_round_trip_matches_json(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game = self._played()
+        game.save("bin")
+        game.save("text", format="json")
+
+        assert sorted(p.name for p in (tmp_path / "saves").iterdir()) == [".manifest.json", "bin.npz", "text.json"]
+        from_binary, from_json = GameState.load("bin"), GameState.load("text")
+        expected = game.save_document()
+        assert from_binary.save_document() == expected
+        assert from_json.save_document() == expected
+        assert GameState.list_saves() == ["bin", "text"]
+
+    def test_binary_save_continues_the_same_stream(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game = self._played()
+        game.save("replay")
+
+        loaded = GameState.load("replay")
+        game.advance(10, stop_on=())
+        loaded.advance(10, stop_on=())
+
+        assert loaded.save_document() == game.save_document()
+
+    def test_old_json_save_still_loads(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game = self._played()
+        data = game.to_dict(full_history=True)
+        for key in ("infra_team", "pending_infra", "pending_hires", "risk_research"):
+            data.pop(key, None)
+        (tmp_path / "saves").mkdir()
+        (tmp_path / "saves" / "old.json").write_text(json.dumps(data))
+
+        loaded = GameState.load("old")
+
+        assert loaded.player.pnl_history == game.player.pnl_history
+        assert [q.name for q in loaded.team] == [q.name for q in game.team]
+        assert loaded.infra_team == [] and loaded.risk_research == []
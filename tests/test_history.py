@@ -0,0 +1,38 @@
+import pytest
+
+from game_engine import GameState
+from history import PnLHistory
+
+
+class TestPnLHistory:
+    def test_tiered_series_is_bounded_and_sums_match(self):
+        history = PnLHistory(float(week) for week in range(520))
+
+        series = history.tiered(weekly_points=52, monthly_points=24)
+
+        assert len(series["pnl"]) < 100
+        assert sum(series["weeks"]) == 520
+        assert sum(series["pnl"]) == pytest.approx(sum(range(520)))
+        assert series["weeks"][0] == 52 and series["weeks"][-1] == 1
+        # Buckets are contiguous
+        ends = [start + weeks for start, weeks in zip(series["start"], series["weeks"])]
+        assert series["start"][1:] == ends[:-1]
+
+    def test_short_history_stays_weekly(self):
+        history = PnLHistory([1.0, -2.0, 3.0])
+
+        assert history.tiered()["weeks"] == [1, 1, 1]
+        assert history == [1.0, -2.0, 3.0]
+        assert history[-1] == 3.0
+
+
+class TestPnLHistoryState:
+    def test_state_is_tiered_and_saves_keep_every_week(self, game_state, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game_state.player.pnl_history = [1.0] * 400
+
+        assert game_state.to_dict()["player"]["pnl_history"]["total_weeks"] == 400
+        assert game_state.to_dict(full_history=True)["player"]["pnl_history"] == [1.0] * 400
+
+        game_state.save("history")
+        assert GameState.load("history").player.pnl_history == [1.0] * 400
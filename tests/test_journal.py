@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from autosave import AutosaveWriter
+from game_engine import GameState
+from journal import ActionJournal
+
+ACTIONS = [
+    {"type": "hire_quant", "name": "Alice", "skill": 60, "salary": 120_000},
+    {"type": "next_turn", "weeks": 3},
+    {"type": "start_research", "style": "Trend", "duration": 3},
+    {"type": "start_mm_game"},
+    {"type": "submit_mm_action", "spread": 0.5},
+    {"type": "next_turn", "weeks": 4},
+    {"type": "upgrade_infra", "infra_type": "compute_level"},
+    {"type": "clear_event"},
+    {"type": "next_turn", "weeks": 2},
+]
+
+
+@pytest.fixture
+def saves_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "saves"
+
+
+class HeldWriter:
+    """Autosave writer stand-in that writes only when told to."""
+
+    def __init__(self):
+        self.pending = []
+
+    def submit(self, game, name, on_written=None, directory="saves"):
+        self.pending.append((game.save_document(), name, on_written, directory))
+
+    def finish(self):
+        for document, name, on_written, directory in self.pending:
+            GameState.write_save(name, document, "binary", directory)
+            on_written()
+        self.pending = []
+
+
+def play(journal, game, actions=ACTIONS):
+    for action in actions:
+        journal.perform(game, action)
+
+
+class TestActionJournal:
+    def test_restore_replays_the_tail_exactly(self, saves_dir):
+        game = GameState(seed=11)
+        game.process_start_of_week()
+        journal = ActionJournal("auto", snapshot_every=1000)
+        play(journal, game)
+
+        assert len(journal) == len(ACTIONS)
+        restored = GameState.load("auto")
+        assert restored.save_document() == game.save_document()
+
+        journal.perform(game, {"type": "next_turn", "weeks": 5})
+        restored.perform({"type": "next_turn", "weeks": 5})
+        assert restored.save_document() == game.save_document()
+
+    def test_snapshots_compact_the_journal(self, saves_dir):
+        game = GameState(seed=11)
+        game.process_start_of_week()
+        journal = ActionJournal("auto", snapshot_every=2)
+        play(journal, game)
+
+        assert len(journal) < len(ACTIONS)
+        assert GameState.load("auto").save_document() == game.save_document()
+
+    def test_unknown_actions_are_not_journaled(self, saves_dir):
+        game = GameState(seed=11)
+        journal = ActionJournal("auto")
+
+        assert journal.perform(game, {"type": "dance"}) is None
+        assert len(journal) == 0
+
+    def test_divergent_journal_fails_loudly(self, saves_dir):
+        game = GameState(seed=11)
+        game.process_start_of_week()
+        journal = ActionJournal("auto", snapshot_every=1000)
+        play(journal, game)
+        journal.close()
+
+        path = saves_dir / "auto.journal"
+        lines = path.read_text().splitlines()
+        entry = json.loads(lines[3])
+        entry["rng"]["spawned"] += 1
+        lines[3] = json.dumps(entry)
+        path.write_text("\n".join(lines) + "\n")
+
+        with pytest.raises(ValueError, match="diverged"):
+            GameState.load("auto")
+
+    def test_journal_of_another_game_is_ignored(self, saves_dir):
+        journal = ActionJournal("auto", snapshot_every=1000)
+        play(journal, GameState(seed=11))
+        other = GameState(seed=12)
+        other.save("auto")
+
+        assert GameState.load("auto").save_document() == other.save_document()
+
+    def test_background_snapshots_compact_once_written(self, saves_dir):
+        writer = AutosaveWriter()
+        game = GameState(seed=11)
+        game.process_start_of_week()
+        journal = ActionJournal("auto", snapshot_every=2, writer=writer)
+        play(journal, game)
+        writer.close()
+
+        assert len(journal) < len(ACTIONS)
+        assert GameState.load("auto").save_document() == game.save_document()
+
+    def test_replaced_game_keeps_the_old_journal_until_its_snapshot_is_written(self, saves_dir):
+        old = GameState(seed=11)
+        old.process_start_of_week()
+        journal = ActionJournal("auto", snapshot_every=1000)
+        play(journal, old)
+        journal.writer = HeldWriter()
+
+        new = GameState(seed=12)
+        journal.perform(new, {"type": "next_turn", "weeks": 2})
+
+        # A crash now restores the old game with its whole journal tail
+        assert GameState.load("auto").save_document() == old.save_document()
+        journal.writer.finish()
+        assert GameState.load("auto").save_document() == new.save_document()
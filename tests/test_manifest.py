@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+import savefile
+from game_engine import GameState
+
+
+@pytest.fixture
+def saves_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "saves"
+
+
+def save_at_week(name, weeks, format="binary"):
+    game = GameState(seed=len(name))
+    game.process_start_of_week()
+    if weeks:
+        game.advance(weeks, stop_on=())
+    game.save(name, format=format)
+    return game
+
+
+class TestSaveManifest:
+    def test_each_save_updates_its_slot(self, saves_dir):
+        game = save_at_week("alpha", 3)
+        save_at_week("beta", 0, format="json")
+
+        total, slots = GameState.save_slots()
+
+        assert total == 2
+        alpha, beta = slots
+        assert (alpha["name"], alpha["week"], alpha["year"]) == ("alpha", game.week, 1)
+        assert alpha["aum"] == game.player.aum and alpha["level"] == game.player.level
+        assert alpha["size"] == (saves_dir / "alpha.npz").stat().st_size
+        assert (alpha["format"], alpha["format_version"]) == ("binary", savefile.FORMAT_VERSION)
+        assert beta["format"] == "json"
+
+        game.advance(2, stop_on=())
+        game.save("alpha")
+        assert GameState.save_slots()[1][0]["week"] == game.week
+
+    def test_sorting_and_paging(self, saves_dir):
+        for i, name in enumerate(["c", "a", "d", "b"]):
+            save_at_week(name, i)
+
+        assert GameState.list_saves() == ["a", "b", "c", "d"]
+        total, page = GameState.save_slots(sort="week", descending=True, offset=1, limit=2)
+        assert total == 4
+        assert [slot["name"] for slot in page] == ["d", "a"]
+        with pytest.raises(ValueError):
+            GameState.save_slots(sort="cash")
+
+    def test_week_sort_follows_progress_across_years(self, saves_dir):
+        for name, year, week in [("late", 3, 2), ("early", 1, 40), ("middle", 2, 10)]:
+            game = GameState(seed=1)
+            game.year, game.week = year, week
+            game.save(name)
+
+        _, page = GameState.save_slots(sort="week")
+
+        assert [slot["name"] for slot in page] == ["early", "middle", "late"]
+
+    def test_listing_does_not_open_saves(self, saves_dir, monkeypatch):
+        save_at_week("alpha", 1)
+
+        def fail(*args):
+            raise AssertionError("save file opened")
+        monkeypatch.setattr(savefile, "read", fail)
+
+        assert GameState.list_saves() == ["alpha"]
+
+    def test_missing_manifest_is_rebuilt_from_old_saves(self, saves_dir):
+        game = save_at_week("old", 2)
+        data = game.to_dict(full_history=True)
+        (saves_dir / "legacy.json").write_text(json.dumps(data))
+        (saves_dir / ".manifest.json").unlink()
+
+        total, slots = GameState.save_slots()
+
+        assert total == 2
+        assert [(slot["name"], slot["week"]) for slot in slots] == [("legacy", game.week), ("old", game.week)]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import memory
+
+leak = []
+
+
+def allocate(n):
+    leak.extend(bytearray(1000) for _ in range(n))
+
+
+class TestMemoryReport:
+    def test_subsystems_add_up_and_grow_with_the_game(self, game_state):
+        before = game_state.memory_report()
+        assert before["total_bytes"] == sum(before["subsystems"].values())
+        assert set(before["subsystems"]) == set(memory.SUBSYSTEMS) | {"other"}
+
+        game_state.message_log.extend(f"line {i}" for i in range(1000))
+        game_state.advance(52, stop_on=())
+
+        after = game_state.memory_report()["subsystems"]
+        assert after["message_log"] > before["subsystems"]["message_log"] + 50_000
+        assert after["pnl_history"] >= before["subsystems"]["pnl_history"]
+
+    def test_shared_objects_are_counted_once(self):
+        shared = np.zeros(10_000)
+        seen = set()
+        first = memory.deep_sizeof([shared], seen)
+        assert first > shared.nbytes
+        assert memory.deep_sizeof({"again": shared}, seen) < 1_000
+        assert memory.deep_sizeof(shared[:10], set()) > shared.nbytes  # a view keeps its base alive
+
+
+class TestTraceSnapshots:
+    @pytest.fixture
+    def snapshots(self):
+        snapshots = memory.TraceSnapshots()
+        yield snapshots
+        snapshots.stop()
+        leak.clear()
+
+    def test_diff_points_at_the_growing_site(self, snapshots):
+        first = snapshots.take()
+        allocate(2_000)
+
+        diff = snapshots.diff(first, top=3)
+        assert diff["from"] == first and diff["to"] == first + 1
+        assert diff["size_diff_bytes"] > 2_000_000
+        assert "test_memory.py" in diff["top"][0]["site"][0]
+        assert diff["top"][0]["count_diff"] >= 2_000
+
+    def test_only_recent_snapshots_are_kept(self, snapshots):
+        ids = [snapshots.take() for _ in range(memory.MAX_SNAPSHOTS + 1)]
+        snapshots.diff(ids[1], ids[-1])
+        with pytest.raises(ValueError):
+            snapshots.diff(ids[0], ids[-1])
@@ -0,0 +1,39 @@
+from metrics import LATENCY_BUCKETS, RequestMetrics
+
+
+def samples(text):
+    """`{metric line name with labels: value}` from Prometheus text."""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+class TestRequestMetrics:
+    def test_histograms_are_cumulative(self):
+        metrics = RequestMetrics()
+        for seconds in (0.0005, 0.003, 0.003, 20.0):
+            metrics.observe("/api/state", "", seconds, 100)
+
+        values = samples(metrics.render())
+        labels = 'endpoint="/api/state",action=""'
+        assert values[f'pm_sim_request_duration_seconds_bucket{{{labels},le="0.001"}}'] == 1
+        assert values[f'pm_sim_request_duration_seconds_bucket{{{labels},le="0.005"}}'] == 3
+        assert values[f'pm_sim_request_duration_seconds_bucket{{{labels},le="{LATENCY_BUCKETS[-1]}"}}'] == 3
+        assert values[f'pm_sim_request_duration_seconds_bucket{{{labels},le="+Inf"}}'] == 4
+        assert values[f'pm_sim_request_duration_seconds_count{{{labels}}}'] == 4
+        assert values[f'pm_sim_response_size_bytes_bucket{{{labels},le="256"}}'] == 4
+
+    def test_quantiles_cover_the_recent_window(self):
+        metrics = RequestMetrics(window=100)
+        for i in range(200):
+            metrics.observe("/api/action", "next_turn", 1.0 if i < 100 else i / 1000, 10, error=i % 50 == 0)
+
+        values = samples(metrics.render())
+        labels = 'endpoint="/api/action",action="next_turn"'
+        assert values[f'pm_sim_request_latency_seconds{{{labels},quantile="0.5"}}'] < 1.0
+        assert values[f'pm_sim_request_latency_seconds_count{{{labels}}}'] == 200
+        assert values[f'pm_sim_request_errors_total{{{labels}}}'] == 4
+
+    def test_label_values_are_escaped(self):
+        metrics = RequestMetrics()
+        metrics.observe('/api/"x"', "", 0.1, 1)
+        assert 'endpoint="/api/\\"x\\""' in metrics.render()
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from game_engine import GameState
+from performance import RollingStats
+from utils import calculate_sharpe
+
+
+class TestRollingStats:
+    def test_windows_match_a_full_rescan(self):
+        returns = np.random.default_rng(7).normal(0.002, 0.01, 300)
+        stats = RollingStats(windows=(13, 52))
+        for ret in returns:
+            stats.push(ret)
+
+        for size in (13, 52):
+            tail = returns[-size:]
+            window = stats.window(size)
+            downside = np.sqrt(np.mean(np.minimum(tail, 0) ** 2))
+            assert window["weeks"] == size
+            assert window["mean"] == pytest.approx(tail.mean())
+            assert window["sharpe"] == pytest.approx(calculate_sharpe(tail))
+            assert window["sortino"] == pytest.approx(tail.mean() / downside * np.sqrt(52))
+            assert window["hit_rate"] == pytest.approx((tail > 0).mean())
+
+    def test_flat_series_and_round_trip(self):
+        stats = RollingStats(windows=(4,))
+        for _ in range(6):
+            stats.push(0.01)
+
+        assert stats.window(4)["sharpe"] == 0.0
+        assert calculate_sharpe([0.01] * 4) == 0.0
+        restored = RollingStats.from_dict(stats.to_dict())
+        restored.push(-0.02)
+        stats.push(-0.02)
+        assert restored.summary() == stats.summary()
+
+
+class TestPerformanceState:
+    def test_end_of_week_updates_rolling_sharpe(self, game_state, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        game_state.advance(30, stop_on=())
+        assert game_state.performance.count == 30
+        assert game_state.to_dict()["performance"]["13w"]["weeks"] == 13
+
+        game_state.save("perf")
+        loaded = GameState.load("perf")
+
+        assert loaded.performance.summary() == game_state.performance.summary()
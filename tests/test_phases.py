@@ -0,0 +1,36 @@
+from phases import HISTOGRAM_BOUNDS_US, PhaseTimer
+
+TURN_PHASES = {"hints", "regime", "decay", "research", "risk_research", "market_news", "outages", "team_requests",
+               "returns", "performance", "payroll", "bonuses", "hiring", "mentoring", "management", "story",
+               "calendar", "morale", "meetings", "reset_offer", "win_loss"}
+
+
+class TestPhaseTimer:
+    def test_disabled_timer_records_nothing(self, game_state):
+        game_state.advance(3, stop_on=())
+        assert game_state.phase_report() == {"enabled": False, "histogram_bounds_us": list(HISTOGRAM_BOUNDS_US),
+                                             "phases": {}}
+
+    def test_every_turn_phase_is_timed(self, game_state):
+        game_state.phase_timer.enabled = True
+        game_state.advance(4, stop_on=())
+
+        phases = game_state.phase_report()["phases"]
+        assert set(phases) == TURN_PHASES
+        for summary in phases.values():
+            assert summary["calls"] == summary["window"] == 4
+            assert sum(summary["histogram"]) == 4
+            assert summary["p50_us"] <= summary["p99_us"] <= summary["max_us"]
+
+    def test_window_keeps_the_latest_calls(self):
+        timer = PhaseTimer(enabled=True, window=3)
+        for _ in range(5):
+            timer.start()
+            timer.lap("step")
+            timer.stop()
+        timer.lap("step")  # outside start()/stop(): ignored
+
+        summary = timer.report()["phases"]["step"]
+        assert summary["calls"] == 5 and summary["window"] == 3
+        timer.reset()
+        assert timer.report()["phases"] == {}
@@ -0,0 +1,53 @@
+import time
+
+from profiler import ProfileCapture
+
+
+def slow_step(seconds):
+    time.sleep(seconds)
+
+
+def action(steps, seconds):
+    for _ in range(steps):
+        slow_step(seconds)
+
+
+class TestProfileCapture:
+    def test_traces_the_requested_number_of_actions(self, game_state):
+        capture = ProfileCapture(actions=2, seconds=10)
+        capture.run(game_state.perform, {"type": "next_turn", "weeks": 2})
+        assert not capture.finished.is_set()
+        capture.run(game_state.perform, {"type": "next_turn", "weeks": 1})
+        assert capture.wait()
+
+        report = capture.report(top=5)
+        assert report["actions"] == 2 and report["complete"]
+        assert len(report["top"]) == 5
+        calls = {row["function"].rsplit(":", 1)[0]: row["calls"] for row in capture.report(top=10_000)["top"]}
+        assert calls["game_engine.py:GameState.perform"] == 2
+        assert calls["game_engine.py:GameState.process_end_of_week"] == 3
+        capture.run(game_state.perform, {"type": "next_turn"})  # untraced from now on
+        assert capture.report()["actions"] == 2
+
+    def test_collapsed_stacks_charge_time_to_the_full_stack(self):
+        capture = ProfileCapture(actions=1, seconds=10)
+        capture.run(action, 3, 0.01)
+
+        stacks = dict(line.rsplit(" ", 1) for line in capture.report()["collapsed"].splitlines())
+        sleep_stack = next(stack for stack in stacks if stack.endswith("time:sleep"))
+        frames = [frame.rsplit(":", 1)[0] for frame in sleep_stack.split(";")[:-1]]  # drop line numbers
+        assert frames == ["test_profiler.py:action", "test_profiler.py:slow_step"]
+        assert 25_000 < int(stacks[sleep_stack]) < 100_000  # microseconds
+        top = capture.report(top=1)["top"][0]
+        assert top["function"] == "time:sleep" and top["calls"] == 3
+
+    def test_tracing_stops_at_the_deadline(self):
+        capture = ProfileCapture(actions=5, seconds=0.05)
+        start = time.perf_counter()
+        capture.run(action, 20, 0.01)
+        assert not capture.wait()
+
+        report = capture.report(top=1)
+        assert not report["complete"] and report["actions"] == 1
+        assert report["top"][0]["calls"] < 10
+        assert report["traced_ms"] <= 60 < (time.perf_counter() - start) * 1e3
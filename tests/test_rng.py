@@ -0,0 +1,40 @@
+import numpy as np
+
+from rng import RandomStream
+
+
+class TestRandomStream:
+    def test_restore_resumes_mid_block(self):
+        stream = RandomStream(np.random.SeedSequence(11), block_size=8)
+        for _ in range(13):
+            stream.random()
+        stream.normal()
+        saved = stream.state()
+
+        expected = [stream.random() for _ in range(10)] + [stream.normal() for _ in range(10)]
+        restored = RandomStream(np.random.SeedSequence(99), block_size=8)
+        restored.restore(saved)
+
+        assert [restored.random() for _ in range(10)] + [restored.normal() for _ in range(10)] == expected
+
+    def test_restore_resumes_array_draws(self):
+        stream = RandomStream(np.random.SeedSequence(11), block_size=8)
+        stream.standard_normal(5)
+        stream.random(3)
+        saved = stream.state()
+
+        expected = [stream.random(4).tolist(), stream.random(), stream.standard_normal(20).tolist()]
+        restored = RandomStream(np.random.SeedSequence(99), block_size=8)
+        restored.restore(saved)
+
+        assert [restored.random(4).tolist(), restored.random(), restored.standard_normal(20).tolist()] == expected
+
+    def test_draws_respect_bounds(self):
+        stream = RandomStream(np.random.SeedSequence(5), block_size=64)
+
+        uniforms = [stream.uniform(0.05, 0.15) for _ in range(500)]
+        picks = {stream.integers(3) for _ in range(500)}
+
+        assert min(uniforms) >= 0.05 and max(uniforms) < 0.15
+        assert picks == {0, 1, 2}
+        assert stream.standard_normal(200).shape == (200,)
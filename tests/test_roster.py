@@ -0,0 +1,59 @@
+from game_engine import InfraSpecialist, Quant
+from roster import TeamRoster
+
+
+class TestTeamRoster:
+    def test_running_sums_follow_hires_edits_and_departures(self):
+        alice, bob, carol = Quant("Alice", 70, 130_000), Quant("Bob", 50, 100_000), Quant("Carol", 60, 110_000)
+        roster = TeamRoster([alice, bob, carol])
+
+        bob.happiness = 40
+        roster.remove(alice)
+
+        assert list(roster) == [bob, carol]
+        assert roster.total("salary") == 210_000
+        assert roster.mean("skill") == 55
+        assert roster.mean("happiness") == 55
+        # Departed staff keep their values and later rows shift up
+        assert alice.skill == 70 and alice not in roster
+        assert carol.happiness == 70
+
+    def test_bump_clamps_every_member(self):
+        roster = TeamRoster([InfraSpecialist("Dee", 40), InfraSpecialist("Eve", 80)])
+        roster[0].happiness = 98
+
+        roster.bump("happiness", 5)
+
+        assert [m.happiness for m in roster] == [100, 75]
+        assert roster.total("happiness") == 175
+
+    def test_fractional_values_are_rounded_not_truncated(self):
+        quant = Quant("Fay", 72.9, 120_000.6)
+        roster = TeamRoster([quant])
+
+        quant.happiness = 64.7
+
+        assert (quant.skill, quant.salary, quant.happiness) == (73, 120_001, 65)
+        assert roster.total("salary") == 120_001
+
+    def test_hires_round_skill_and_salary(self, game_state):
+        game_state.hire_quant("Gus", 72.9, 150_000.4)
+        game_state.hire_infra_specialist("Hal", 55.6)
+
+        assert (game_state.pending_hires[0].skill, game_state.pending_hires[0].salary) == (73, 150_000)
+        assert game_state.pending_infra[0].skill == 56
+
+
+class TestTeamMorale:
+    def test_fire_and_attrition_keep_team_averages_consistent(self, game_state):
+        game_state.team = [Quant("Alice", 70, 20_000), Quant("Bob", 50, 20_000), Quant("Cy", 40, 100_000)]
+        for quant in game_state.team:
+            quant.happiness = 10
+        game_state.fire_staff("quant", "Cy")
+
+        for _ in range(20):
+            game_state.apply_team_morale_effects()
+
+        happiness = [q.happiness for q in game_state.team]
+        assert game_state.avg_team_happiness() == (sum(happiness) / len(happiness) if happiness else None)
+        assert game_state.pay_weekly_salaries() == 20_000 * len(happiness) / 52
@@ -0,0 +1,163 @@
+import pytest
+
+from game_engine import GameState
+from sessions import Session, SessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, clock):
+    monkeypatch.chdir(tmp_path)
+    return SessionStore(max_sessions=2, idle_timeout=100, minigame_timeout=10, clock=clock,
+                        game_factory=lambda: GameState(seed=0))
+
+
+def visit(store, token):
+    session = store.open(token)
+    store.release(session)
+    return session
+
+
+class TestSessionStore:
+    def test_least_recently_used_session_is_spilled(self, store, clock):
+        first = visit(store, "a" * 16)
+        first.game.advance(3, stop_on=())
+        visit(store, "b" * 16)
+        visit(store, "a" * 16)
+        visit(store, "c" * 16)
+
+        assert "b" * 16 not in store and "a" * 16 in store
+        visit(store, "b" * 16)
+        assert store.stats()["restored"] == 1
+        assert "a" * 16 not in store
+        assert visit(store, "a" * 16).game.save_document() == first.game.save_document()
+
+    def test_memory_budget_limits_hot_sessions(self, store):
+        store.max_sessions = 100
+        session = visit(store, "a" * 16)
+        store.memory_budget = session.size * 2
+
+        for token in "bcd":
+            visit(store, token * 16)
+
+        assert len(store) == 2
+        assert store.memory <= store.memory_budget
+
+    def test_idle_sessions_and_minigames_are_cleaned_up(self, store, clock):
+        game = visit(store, "a" * 16).game
+        game.start_market_making()
+
+        clock.now = 20
+        visit(store, "b" * 16)
+        assert game.active_minigame_instance is None
+        assert store.stats()["minigames_abandoned"] == 1
+
+        clock.now = 110
+        visit(store, "c" * 16)
+        assert "a" * 16 not in store and "b" * 16 in store
+
+    def test_abandoned_minigame_is_not_replayed_from_the_journal(self, store, clock):
+        store.journaled = True
+        session = visit(store, "a" * 16)
+        store.perform(session, {"type": "start_mm_game"})
+
+        clock.now = 20
+        visit(store, "b" * 16)
+        for _ in range(20):  # enough rounds to finish the game had it still been running
+            store.perform(session, {"type": "submit_mm_action", "spread": 0.5})
+
+        restored = GameState.load("a" * 16, store.directory)
+        assert restored.save_document() == session.game.save_document()
+
+    def test_sessions_in_use_are_not_evicted(self, store):
+        held = store.open("a" * 16)
+        for token in "bcd":
+            visit(store, token * 16)
+
+        assert "a" * 16 in store
+        store.release(held)
+
+    def test_malformed_tokens_get_a_fresh_session(self, store):
+        session = visit(store, "../../etc/passwd")
+
+        assert session.token != "../../etc/passwd"
+        assert len(session.token) >= 16
+
+
+class TestUpdates:
+    def test_listener_gets_state_then_patches_with_log_lines(self, store):
+        session = visit(store, "a" * 16)
+        updates = session.updates()
+
+        event, snapshot = next(updates)
+        assert event == "state" and snapshot.version == session.snapshot.version
+        store.perform(session, {"type": "next_turn", "weeks": 1})
+
+        event, data = next(updates)
+        assert event == "patch" and data["version"] == session.snapshot.version
+        assert "/message_log" in [op["path"] for op in data["patch"]]
+        event, data = next(updates)
+        assert event == "log" and data["lines"] == session.game.message_log[-len(data["lines"]):]
+
+    def test_listener_resuming_from_its_version_gets_a_patch(self, store):
+        session = visit(store, "a" * 16)
+        version, state_id = session.snapshot.version, session.snapshot.state_id
+        store.perform(session, {"type": "next_turn", "weeks": 1})
+
+        event, data = next(session.updates(version, state_id))
+        assert event == "patch" and data["version"] == session.snapshot.version
+
+    def test_long_turns_publish_progress_to_listeners(self, store, monkeypatch):
+        monkeypatch.setattr("sessions.PROGRESS_INTERVAL", 0)
+        session = visit(store, "a" * 16)
+        published = []
+        publish = Session.publish
+        monkeypatch.setattr(Session, "publish", lambda self: published.append(self.game.week) or publish(self))
+
+        store.perform(session, {"type": "next_turn", "weeks": 3})
+        assert len(published) == 1  # nobody listening: only the final publish
+        session.listeners = 1
+        store.perform(session, {"type": "next_turn", "weeks": 3})
+        assert len(published) == 1 + 3 + 1
+
+    def test_notices_and_keepalives(self, store):
+        session = visit(store, "a" * 16)
+        updates = session.updates(session.snapshot.version, session.snapshot.state_id, keepalive=0.01)
+
+        assert next(updates) == ("keepalive", None)
+        session.post("saved", {"name": "slot"})
+        assert next(updates) == ("saved", {"name": "slot"})
+        assert session.listeners == 1
+        updates.close()
+        assert session.listeners == 0
+
+
+class TestBatch:
+    def test_rolled_back_batch_leaves_nothing_in_the_journal(self, store):
+        store.journaled = True
+        session = visit(store, "a" * 16)
+        store.perform(session, {"type": "next_turn", "weeks": 2})
+        before = session.game.save_document()
+
+        responses, rolled_back = store.perform_batch(session, [
+            {"type": "upgrade_infra", "infra_type": "compute_level"},
+            {"type": "next_turn"},
+            {"type": "fire_staff", "staff_type": "infra", "name": "Nobody"},
+        ], atomic=True)
+
+        assert rolled_back and [r["status"] for r in responses] == ["ok", "ok", "error"]
+        assert session.game.save_document() == before
+        assert store.evict("a" * 16)
+        assert visit(store, "a" * 16).game.save_document() == before
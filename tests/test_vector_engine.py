@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from game_engine import AlphaStrategy, GameState, Quant
+from vector_engine import LIVE, STORED, VectorGameState
+
+
+class TestVectorGameState:
+    def test_from_game_state_clones_player_and_team(self, game_state):
+        game_state.player.cash = 750_000
+        game_state.team = [Quant("Alice", 70, 130_000), Quant("Bob", 55, 110_000)]
+
+        vec = VectorGameState.from_game_state(game_state, 8, seed=1)
+
+        assert np.all(vec.cash == 750_000)
+        assert np.all(vec.team_size() == 2)
+        assert np.allclose(vec.avg_team_skill(), 62.5)
+
+    def test_same_seed_replays_identically(self, game_state):
+        game_state.team = [Quant("Alice", 70, 130_000)]
+        runs = []
+        for _ in range(2):
+            vec = VectorGameState.from_game_state(game_state, 200, seed=7)
+            vec.start_research("Trend", 2)
+            vec.run(10)
+            runs.append(vec.aum.copy())
+
+        assert np.array_equal(runs[0], runs[1])
+
+    def test_weekly_payroll_matches_scalar_engine(self, game_state):
+        game_state.team = [Quant("Alice", 70, 130_000), Quant("Bob", 55, 110_000)]
+        vec = VectorGameState.from_game_state(game_state, 4, seed=1)
+        cash_before = game_state.player.cash
+
+        game_state.process_end_of_week()
+        vec.process_end_of_week()
+
+        # No live alphas, so the only cash movement is the weekly payroll
+        assert np.allclose(vec.cash, game_state.player.cash)
+        assert game_state.player.cash == pytest.approx(cash_before - 240_000 / 52)
+
+    def test_morale_changes_skip_onboarding_quants(self, game_state):
+        game_state.team = [Quant("Alice", 70, 130_000)]
+        game_state.hire_quant("Bob", 65, 140_000)
+        vec = VectorGameState.from_game_state(game_state, 4, seed=1)
+        onboarding = vec.quant_happiness[1].copy()
+
+        vec._bump_team_happiness(np.full(4, -10))
+
+        assert np.all(vec.quant_happiness[0] == game_state.team[0].happiness - 10)
+        assert np.array_equal(vec.quant_happiness[1], onboarding)
+
+    def test_matches_scalar_engine_statistically(self):
+        def fund(seed):
+            game = GameState(seed=seed)
+            game.team = [Quant(f"Q{i}", 60, 120_000) for i in range(3)]
+            for style in ("Trend", "Value"):
+                alpha = AlphaStrategy(style, style, 3)
+                alpha.status = "live"
+                alpha.current_expected_return = 0.15
+                alpha.volatility = 0.1
+                game.alphas["live"].append(alpha)
+            game.portfolio.positions = [{"alpha_id": a.id, "weight": 0.4} for a in game.alphas["live"]]
+            game.hire_quant("P1", 70, 150_000)
+            game.hire_quant("P2", 65, 140_000)
+            return game
+
+        worlds, weeks = 200, 20
+        aum, happiness = [], []
+        for seed in range(worlds):
+            game = fund(seed)
+            game.advance(weeks, stop_on=())
+            aum.append(game.player.aum)
+            happiness.append(game.avg_team_happiness())
+        vec = VectorGameState.from_game_state(fund(worlds), worlds, seed=1)
+        vec.run(weeks)
+
+        assert vec.aum.mean() == pytest.approx(np.mean(aum), rel=0.03)
+        assert vec.aum.std() == pytest.approx(np.std(aum), rel=0.35)
+        assert np.nanmean(vec.avg_team_happiness()) == pytest.approx(np.mean(happiness), abs=2)
+
+    def test_set_weights_promotes_stored_alphas(self):
+        vec = VectorGameState(3, max_alphas=2, seed=1)
+        vec.alpha_status[0] = STORED
+        vec.alpha_expected_return[0] = 0.1
+        vec.alpha_volatility[0] = 0.05
+
+        vec.set_weights([1.5, 0.5])
+
+        assert np.all(vec.alpha_status[0] == LIVE)
+        assert np.all(vec.weights[0] == 1.0)
+        assert np.all(vec.weights[1] == 0.0)
+
+    def test_failed_worlds_stop_trading(self):
+        vec = VectorGameState(4, max_alphas=1, seed=1)
+        vec.alpha_status[0] = STORED
+        vec.alpha_expected_return[0] = 0.1
+        vec.alpha_volatility[0] = 0.2
+        vec.set_weights([1.0])
+        vec.job_security[0] = -1.0
+
+        vec.step()
+        aum = vec.aum[0]
+        vec.run(5)
+
+        assert not vec.alive[0]
+        assert vec.alive[1:].all()
+        assert vec.aum[0] == aum
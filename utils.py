@@ -1,24 +1,26 @@
 import numpy as np
 
 def calculate_sharpe(returns):
-    if not returns:
-        return 0.0
-    return np.mean(returns) / np.std(returns) * np.sqrt(52)
+    returns = np.asarray(returns, dtype=float)
+    std = returns.std() if returns.size > 1 else 0.0
+    if std == 0:
+        return 0.0  # flat or too-short series
+    return float(returns.mean() / std * np.sqrt(52))
 
-def generate_market_return(regime):
+def generate_market_return(regime, rng):
     # Simple regime-based market return generation
     if regime == "Trendy":
-        return np.random.normal(0.002, 0.01) # Positive drift
+        return rng.normal(0.002, 0.01) # Positive drift
     elif regime == "MeanReverting":
-        return np.random.normal(0.0, 0.015) # Higher vol, no drift
+        return rng.normal(0.0, 0.015) # Higher vol, no drift
     elif regime == "HighVol":
-        return np.random.normal(-0.001, 0.03) # Negative drift, high vol
+        return rng.normal(-0.001, 0.03) # Negative drift, high vol
     elif regime == "LowVol":
-        return np.random.normal(0.001, 0.005) # Low vol
+        return rng.normal(0.001, 0.005) # Low vol
     else:
-        return np.random.normal(0.0, 0.01)
+        return rng.normal(0.0, 0.01)
 
-def simulate_alpha_return(alpha, regime):
+def simulate_alpha_return(alpha, regime, rng):
     # Simulate return for a single alpha
     # Adjust based on regime preference (simplified)
     base_ret = alpha.current_expected_return / 52.0
@@ -30,4 +32,13 @@ def simulate_alpha_return(alpha, regime):
     elif regime == "MeanReverting" and alpha.style == "Trend":
         base_ret *= 0.5
     
-    return np.random.normal(base_ret, vol)
+    return rng.normal(base_ret, vol)
+
+def simulate_alpha_returns(expected_returns, volatilities, is_trend, regime, rng):
+    # Vectorized simulate_alpha_return for a whole book: one normal draw per alpha
+    base_ret = expected_returns / 52.0
+    if regime == "Trendy":
+        base_ret = np.where(is_trend, base_ret * 1.2, base_ret)
+    elif regime == "MeanReverting":
+        base_ret = np.where(is_trend, base_ret * 0.5, base_ret)
+    return base_ret + volatilities / np.sqrt(52.0) * rng.standard_normal(len(base_ret))
@@ -0,0 +1,725 @@
+"""Batched engine that advances many independent funds with NumPy array ops.
+
+`VectorGameState` mirrors the economic core of `GameState` (regimes, market and
+alpha returns, decay, research, payroll, bonuses, hiring pipelines, mentoring,
+morale, management reaction and game over) for N worlds at once. Choices that
+need a player (infra asks, reset offers, mini-games) are not modelled. Worlds
+that hit a fail state stop trading and their player stats are frozen.
+
+Per-world values are 1-D arrays of length `n_worlds`. Alpha, quant and infra
+slots are stored slot-major, shaped `(slots, n_worlds)`, so that per-world
+reductions run over contiguous rows. Staff skill, happiness and loyalty are
+whole numbers in `GameState` and are held as int16 here.
+"""
+import numpy as np
+
+REGIMES = ("Trendy", "MeanReverting", "HighVol", "LowVol")
+STYLES = ("Trend", "MeanReversion", "Value")
+INFRA_FIELDS = ("compute_level", "data_quality", "devops_tooling", "risk_tools_level", "optimization_tool_level")
+
+# Alpha slot status codes
+EMPTY, IN_RESEARCH, STORED, LIVE = 0, 1, 2, 3
+# Staff slot status codes
+ONBOARDING, ACTIVE = 1, 2
+
+MARKET_MU = np.array([0.002, 0.0, -0.001, 0.001])
+MARKET_SIGMA = np.array([0.01, 0.015, 0.03, 0.005])
+# Expected-return multiplier for Trend alphas by regime; other styles are neutral
+TREND_MULT = np.array([1.2, 0.5, 1.0, 1.0])
+TREND_DRIFT = TREND_MULT / 52
+
+COMPUTE, DATA_QUALITY, DEVOPS, RISK_TOOLS, OPTIMIZATION = range(len(INFRA_FIELDS))
+SQRT_52 = np.sqrt(52.0)
+STAFF_INT = np.int16
+# Thresholds on 16-bit raw draws for mentoring: skill +1 with p=2/3, +1 morale with p=2/3*0.4
+MENTOR_GROW = round(65536 * 2 / 3)
+MENTOR_CHEER = round(65536 * 2 / 3 * 0.4)
+
+
+class VectorGameState:
+    def __init__(self, n_worlds, max_alphas=16, max_quants=16, max_infra=8, seed=None):
+        self.n_worlds = n = int(n_worlds)
+        self.rng = np.random.default_rng(seed)
+        self.week = 1
+        self.year = 1
+
+        # Player
+        self.cash = np.full(n, 1_000_000.0)
+        self.aum = np.full(n, 50_000_000.0)
+        self.peak_aum = self.aum.copy()
+        self.current_drawdown = np.zeros(n)
+        self.max_drawdown = np.zeros(n)
+        self.yearly_pnl = np.zeros(n)
+        self.weekly_pnl = np.zeros(n)
+        self.market_return = np.zeros(n)
+        self.job_security = np.full(n, 100.0)
+        self.reputation_management = np.full(n, 50.0)
+        self.reputation_quants = np.full(n, 50.0)
+        self.reputation_infra = np.full(n, 50.0)
+        self.xp = np.zeros(n, dtype=np.int64)
+        self.xp_to_next_level = np.full(n, 1000, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.startup_grace_weeks = np.full(n, 4, dtype=np.int64)
+        self.alpha_difficulty = np.ones(n)
+        self.alive = np.ones(n, dtype=bool)
+
+        # Environment and infra
+        self.regime = np.zeros(n, dtype=np.int64)
+        self.weeks_in_regime = np.zeros(n, dtype=np.int64)
+        self.infra = np.ones((len(INFRA_FIELDS), n), dtype=np.int64)
+        self.market_neutral = np.zeros(n, dtype=bool)
+        self.factor_neutral = np.zeros(n, dtype=bool)
+
+        # Alpha book
+        shape = (max_alphas, n)
+        self.alpha_status = np.zeros(shape, dtype=np.int8)
+        self.alpha_style = np.zeros(shape, dtype=np.int8)
+        self.alpha_weeks_remaining = np.zeros(shape, dtype=np.int32)
+        self.alpha_base_return = np.zeros(shape)
+        self.alpha_expected_return = np.zeros(shape)
+        self.alpha_volatility = np.zeros(shape)
+        self.alpha_decay = np.full(shape, 0.01)
+        self.alpha_beta = np.ones(shape)
+        self.alpha_success_prob = np.zeros(shape)
+        self.alpha_potential_super = np.zeros(shape)
+        self.alpha_resilience = np.zeros(shape)
+        self.weights = np.zeros(shape)
+
+        # Quants (active and onboarding)
+        shape = (max_quants, n)
+        self.quant_status = np.zeros(shape, dtype=np.int8)
+        self.quant_skill = np.zeros(shape, dtype=STAFF_INT)
+        self.quant_happiness = np.zeros(shape, dtype=STAFF_INT)
+        self.quant_loyalty = np.zeros(shape, dtype=STAFF_INT)
+        self.quant_salary = np.zeros(shape)
+        self.quant_onboarding = np.zeros(shape, dtype=np.int32)
+
+        # Infra specialists (active and onboarding)
+        shape = (max_infra, n)
+        self.infra_status = np.zeros(shape, dtype=np.int8)
+        self.infra_skill = np.zeros(shape, dtype=STAFF_INT)
+        self.infra_happiness = np.zeros(shape, dtype=STAFF_INT)
+        self.infra_salary = np.zeros(shape)
+        self.infra_onboarding = np.zeros(shape, dtype=np.int32)
+
+        self._refresh_masks()
+        self._refresh_book()
+        self.process_start_of_week()
+
+    @classmethod
+    def from_game_state(cls, state, n_worlds, max_alphas=None, max_quants=None, max_infra=None, seed=None):
+        """Clone a single `GameState` into `n_worlds` identical starting worlds.
+
+        Slot capacities default to the template's current size plus a little
+        headroom for research and hiring done through the batched actions.
+        """
+        alphas = state.alphas["live"] + state.alphas["stored_for_ensemble"] + state.alphas["in_research"]
+        quants = list(state.team) + list(state.pending_hires)
+        infra = list(state.infra_team) + list(state.pending_infra)
+        vec = cls(
+            n_worlds,
+            max_alphas=max(max_alphas or len(alphas) + 4, len(alphas)),
+            max_quants=max(max_quants or len(quants) + 2, len(quants)),
+            max_infra=max(max_infra or len(infra) + 1, len(infra)),
+            seed=seed,
+        )
+        player = state.player
+        vec.week = state.week
+        vec.year = state.year
+        vec.cash[:] = player.cash
+        vec.aum[:] = player.aum
+        vec.peak_aum[:] = player.peak_aum
+        vec.current_drawdown[:] = player.current_drawdown
+        vec.max_drawdown[:] = player.max_drawdown
+        vec.yearly_pnl[:] = player.yearly_pnl
+        vec.job_security[:] = player.job_security
+        vec.reputation_management[:] = player.reputation_management
+        vec.reputation_quants[:] = player.reputation_quants
+        vec.reputation_infra[:] = player.reputation_infra
+        vec.xp[:] = player.xp
+        vec.xp_to_next_level[:] = player.xp_to_next_level
+        vec.level[:] = player.level
+        vec.startup_grace_weeks[:] = player.startup_grace_weeks
+        vec.alpha_difficulty[:] = player.alpha_difficulty
+        vec.regime[:] = REGIMES.index(state.environment["regime"])
+        vec.weeks_in_regime[:] = state.environment["weeks_in_regime"]
+        for row, field in enumerate(INFRA_FIELDS):
+            vec.infra[row] = getattr(state.infrastructure, field)
+        vec.market_neutral[:] = state.risk_model.market_neutral
+        vec.factor_neutral[:] = state.risk_model.factor_neutral
+
+        vec.alpha_status[:] = EMPTY
+        weights = {p["alpha_id"]: p["weight"] for p in state.portfolio.positions}
+        status_codes = {"live": LIVE, "stored_for_ensemble": STORED, "in_research": IN_RESEARCH}
+        default_success = 0.5 + state.infrastructure.data_quality * 0.05
+        for slot, alpha in enumerate(alphas):
+            vec.alpha_status[slot] = status_codes[alpha.status]
+            vec.alpha_style[slot] = STYLES.index(alpha.style) if alpha.style in STYLES else 0
+            vec.alpha_weeks_remaining[slot] = alpha.weeks_remaining
+            vec.alpha_base_return[slot] = alpha.base_expected_return
+            vec.alpha_expected_return[slot] = alpha.current_expected_return
+            vec.alpha_volatility[slot] = alpha.volatility
+            vec.alpha_decay[slot] = alpha.decay_rate
+            vec.alpha_beta[slot] = getattr(alpha, "beta", 1.0)
+            vec.alpha_success_prob[slot] = getattr(alpha, "success_prob", default_success)
+            vec.alpha_potential_super[slot] = getattr(alpha, "potential_super", 0.02)
+            vec.alpha_resilience[slot] = getattr(alpha, "resilience", 0.0)
+            vec.weights[slot] = weights.get(alpha.id, 0.0)
+
+        for slot, q in enumerate(quants):
+            vec.quant_status[slot] = ACTIVE if slot < len(state.team) else ONBOARDING
+            vec.quant_skill[slot] = q.skill
+            vec.quant_happiness[slot] = q.happiness
+            vec.quant_loyalty[slot] = q.loyalty
+            vec.quant_salary[slot] = q.salary
+            vec.quant_onboarding[slot] = getattr(q, "onboarding_weeks", 0)
+        for slot, m in enumerate(infra):
+            vec.infra_status[slot] = ACTIVE if slot < len(state.infra_team) else ONBOARDING
+            vec.infra_skill[slot] = m.skill
+            vec.infra_happiness[slot] = m.happiness
+            vec.infra_salary[slot] = getattr(m, "salary", 80_000)
+            vec.infra_onboarding[slot] = getattr(m, "onboarding_weeks", 0)
+        vec._refresh_masks()
+        vec._refresh_book()
+        return vec
+
+    # ------------------------------------------------------------------
+    # Derived per-world quantities
+    # ------------------------------------------------------------------
+    def _refresh_masks(self):
+        """Rebuild cached staff masks and payroll; call after any status or `alive` change."""
+        self._team = (self.quant_status == ACTIVE) & self.alive
+        self._team_i = self._team.astype(STAFF_INT)
+        self._team_count = self._team_i.sum(axis=0, dtype=np.int32)
+        self._infra_team = (self.infra_status == ACTIVE) & self.alive
+        self._infra_i = self._infra_team.astype(STAFF_INT)
+        self._infra_count = self._infra_i.sum(axis=0, dtype=np.int32)
+        self._payroll = (np.einsum("ij,ij->j", self.quant_salary, self._team_i)
+                         + np.einsum("ij,ij->j", self.infra_salary, self._infra_i))
+        # Highest whole skill each salary covers; above it the quant is underpaid
+        self._salary_skill_cap = np.floor((self.quant_salary - 40_000) / 1_200)
+        self._salary_gap = np.floor(40_000 - self.quant_salary).astype(np.int32)
+
+    def _refresh_book(self):
+        """Rebuild the cached position index and decay factors after alpha changes."""
+        slots, cols = np.nonzero((self.weights != 0) & (self.alpha_status == LIVE) & self.alive)
+        # Flat indices into the (slot, world) arrays: `take` is far cheaper than 2-D fancy indexing
+        flat = slots * self.n_worlds + cols
+        self._pos_cols = cols
+        self._pos_flat = flat
+        self._pos_trend = self.alpha_style.ravel().take(flat) == 0
+        self._pos_weight = self.weights.ravel().take(flat)
+        self._pos_beta = self.alpha_beta.ravel().take(flat)
+        self._pos_vol = self.alpha_volatility.ravel().take(flat) / SQRT_52
+        self._decay_keep = 1 - self.alpha_decay
+
+    @staticmethod
+    def _masked_mean(values, mask_i, count):
+        total = np.einsum("ij,ij->j", values, mask_i, dtype=np.int32)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(count > 0, total / count, np.nan)
+
+    def team_size(self):
+        return self._team_count.astype(np.int64)
+
+    def _team_happiness_total(self):
+        """Per-world sum of quant happiness; compare against `k * _team_count` to avoid dividing."""
+        return np.einsum("ij,ij->j", self.quant_happiness, self._team_i, dtype=np.int32)
+
+    def avg_team_happiness(self):
+        """Per-world average quant happiness (NaN where the team is empty)."""
+        return self._masked_mean(self.quant_happiness, self._team_i, self._team_count)
+
+    def avg_team_skill(self):
+        return self._masked_mean(self.quant_skill, self._team_i, self._team_count)
+
+    def resilience_score(self):
+        base = 30 + self.infra.sum(axis=0) * 6.0
+        has_team = self._infra_count > 0
+        if has_team.any():
+            avg_skill = self._masked_mean(self.infra_skill, self._infra_i, self._infra_count)
+            avg_happy = self._masked_mean(self.infra_happiness, self._infra_i, self._infra_count)
+            base = base + np.where(has_team, avg_skill * 0.1 + np.maximum(0, (avg_happy - 50) * 0.1), 0.0)
+        return np.clip(np.trunc(base), 0, 100)
+
+    def is_market_shielded(self):
+        return self.market_neutral | self.factor_neutral | (self.infra[RISK_TOOLS] >= 2)
+
+    def alpha_handicap(self):
+        return np.maximum(1.0, self.alpha_difficulty)
+
+    @staticmethod
+    def minimum_salary_for_skill(skill):
+        return 40_000 + np.trunc(np.asarray(skill, dtype=float) * 1_200)
+
+    def _random16(self, shape):
+        """Uniform 16-bit integers, four per raw 64-bit draw."""
+        size = int(np.prod(shape))
+        raw = self.rng.bit_generator.random_raw((size + 3) // 4)
+        return raw.view(np.uint16)[:size].reshape(shape)
+
+    def _gain_xp(self, amount):
+        self.xp += np.where(self.alive, amount, 0).astype(np.int64)
+        up = self.xp >= self.xp_to_next_level
+        if up.any():
+            self.level += up
+            self.xp -= np.where(up, self.xp_to_next_level, 0)
+            self.xp_to_next_level = np.where(up, (self.xp_to_next_level * 1.2).astype(np.int64), self.xp_to_next_level)
+
+    def _bump_team_happiness(self, delta, loyalty_delta=None):
+        """Clamped morale change for every active quant; `delta` is per-world.
+
+        Onboarding quants are left alone, as in `GameState`, where they are
+        not on the team until they join.
+        """
+        delta = self._team_i * np.asarray(delta).astype(STAFF_INT)
+        if loyalty_delta is None:
+            loyalty_delta = np.where(delta > 0, delta // 2, delta)
+        else:
+            loyalty_delta = self._team_i * np.asarray(loyalty_delta).astype(STAFF_INT)
+        if delta.any():
+            self.quant_happiness += delta
+            np.clip(self.quant_happiness, 0, 100, out=self.quant_happiness)
+        if loyalty_delta.any():
+            self.quant_loyalty += loyalty_delta
+            np.clip(self.quant_loyalty, 0, 100, out=self.quant_loyalty)
+
+    # ------------------------------------------------------------------
+    # Player actions (vectorized across worlds, optionally masked)
+    # ------------------------------------------------------------------
+    def _first_free(self, status, mask):
+        free = status == EMPTY
+        slot = free.argmax(axis=0)
+        ok = free.any(axis=0) & self.alive
+        if mask is not None:
+            ok &= mask
+        cols = np.nonzero(ok)[0]
+        return ok, slot[cols], cols
+
+    def calculate_research_duration(self, base_weeks):
+        team = self._team_count
+        reduction = np.minimum(
+            0.5,
+            0.05 * team + 0.05 * (self.infra[DATA_QUALITY] - 1) + 0.03 * (self.infra[COMPUTE] - 1),
+        )
+        multiplier = 1 - reduction
+        projects = (self.alpha_status == IN_RESEARCH).sum(axis=0)
+        load = projects / np.maximum(team, 1)
+        multiplier = np.where((team > 0) & (load > 1), multiplier * (1 + 0.15 * (load - 1)), multiplier)
+        avg_h = self.avg_team_happiness()
+        multiplier = np.where(avg_h >= 75, multiplier * 0.9, np.where(avg_h <= 40, multiplier * 1.1, multiplier))
+        # np.round is round-half-even, like Python's round()
+        return np.maximum(1, np.round(base_weeks * multiplier)).astype(np.int64)
+
+    def start_research(self, style, duration, mask=None):
+        """Start alpha research in every (masked) world with a free alpha slot."""
+        ok, slots, cols = self._first_free(self.alpha_status, mask)
+        if cols.size == 0:
+            return ok
+        effective = self.calculate_research_duration(duration)[cols]
+        # `avg or 50` in GameState: an empty team (or a zero average) counts as 50
+        avg_skill = np.nan_to_num(self.avg_team_skill()[cols], nan=50.0)
+        avg_skill[avg_skill == 0] = 50.0
+        avg_happy = np.nan_to_num(self.avg_team_happiness()[cols], nan=50.0)
+        avg_happy[avg_happy == 0] = 50.0
+        dq = self.infra[DATA_QUALITY, cols]
+        penalty = self.alpha_handicap()[cols]
+        infra_count = self._infra_count[cols]
+
+        success = np.minimum(0.95, 0.5 + dq * 0.05 + 0.02 * (self.infra[COMPUTE, cols] - 1)
+                             + np.minimum(0.2, avg_skill * 0.002) + np.maximum(0, (avg_happy - 50) * 0.002))
+        success = np.clip(success / penalty, 0.05, 0.95)
+        super_chance = (0.02 + avg_skill * 0.0002 + np.maximum(0, avg_happy - 50) * 0.0001
+                        + 0.01 * np.maximum(0, dq - 1) + 0.005 * infra_count)
+        super_chance = np.maximum(0.0, np.minimum(0.2, super_chance) / penalty)
+        resilience = (0.2 + avg_skill * 0.002 + np.maximum(0, avg_happy - 50) * 0.002
+                      + 0.05 * np.maximum(0, self.infra[DEVOPS, cols] - 1)
+                      + 0.05 * np.maximum(0, self.infra[RISK_TOOLS, cols] - 1)
+                      + np.where(infra_count > 0, 0.05, 0.0))
+        resilience = np.clip(resilience / penalty, 0.05, 0.9)
+
+        self.alpha_status[slots, cols] = IN_RESEARCH
+        self.alpha_style[slots, cols] = STYLES.index(style)
+        self.alpha_weeks_remaining[slots, cols] = effective
+        self.alpha_base_return[slots, cols] = 0.0
+        self.alpha_expected_return[slots, cols] = 0.0
+        self.alpha_volatility[slots, cols] = 0.0
+        self.alpha_decay[slots, cols] = 0.01
+        self.alpha_beta[slots, cols] = 1.0
+        self.alpha_success_prob[slots, cols] = success
+        self.alpha_potential_super[slots, cols] = super_chance
+        self.alpha_resilience[slots, cols] = resilience
+        self.weights[slots, cols] = 0.0
+        self._refresh_book()
+        return ok
+
+    def _onboarding_weeks(self, base_weeks, cols):
+        rep = self.reputation_management[cols]
+        return np.where(rep >= 70, max(1, base_weeks - 1), np.where(rep <= 30, base_weeks + 1, base_weeks))
+
+    def hire_quant(self, skill, salary, mask=None):
+        """Put a quant into the onboarding pipeline where affordable and a slot is free."""
+        min_salary = 40_000 + int(skill * 1_200)
+        signing_bonus = int(salary * 0.2)
+        if salary < min_salary:
+            return np.zeros(self.n_worlds, dtype=bool)
+        affordable = self.cash >= signing_bonus
+        ok, slots, cols = self._first_free(self.quant_status, affordable if mask is None else affordable & mask)
+        if cols.size == 0:
+            return ok
+        base_weeks = 1 if skill < 40 else 2 if skill < 70 else 4
+        self.quant_status[slots, cols] = ONBOARDING
+        self.quant_skill[slots, cols] = skill
+        self.quant_happiness[slots, cols] = min(100, 65 + int((salary - min_salary) / 3000))
+        self.quant_loyalty[slots, cols] = 50
+        self.quant_salary[slots, cols] = salary
+        self.quant_onboarding[slots, cols] = self._onboarding_weeks(base_weeks, cols)
+        self.cash[cols] -= signing_bonus
+        self._salary_skill_cap[slots, cols] = (salary - 40_000) // 1_200
+        self._salary_gap[slots, cols] = int(np.floor(40_000 - salary))
+        return ok
+
+    def hire_infra_specialist(self, skill, mask=None):
+        cost = 30000 + int(skill * 1500)
+        affordable = self.cash >= cost
+        ok, slots, cols = self._first_free(self.infra_status, affordable if mask is None else affordable & mask)
+        if cols.size == 0:
+            return ok
+        base_weeks = 1 if skill < 50 else 2 if skill < 75 else 4
+        self.infra_status[slots, cols] = ONBOARDING
+        self.infra_skill[slots, cols] = skill
+        self.infra_happiness[slots, cols] = 70
+        self.infra_salary[slots, cols] = 80_000
+        self.infra_onboarding[slots, cols] = self._onboarding_weeks(base_weeks, cols)
+        self.cash[cols] -= cost
+        return ok
+
+    def set_weights(self, weights):
+        """Assign portfolio weights, shaped `(max_alphas,)` or `(max_alphas, n_worlds)`.
+
+        Mirrors `GameState.update_portfolio`: overweight books are normalized and
+        stored alphas that receive weight go live. Weight on empty or in-research
+        slots is dropped.
+        """
+        weights = np.asarray(weights, dtype=float)
+        if weights.ndim == 1:
+            weights = weights[:, None]
+        weights = np.array(np.broadcast_to(weights, self.weights.shape))
+        weights[self.alpha_status < STORED] = 0.0
+        total = weights.sum(axis=0)
+        weights /= np.where(total > 1.0, total, 1.0)
+        promote = (weights > 0) & (self.alpha_status == STORED) & self.alive
+        self.alpha_status[promote] = LIVE
+        np.copyto(self.weights, weights, where=self.alive)
+        self._refresh_book()
+
+    # ------------------------------------------------------------------
+    # Weekly turn
+    # ------------------------------------------------------------------
+    def step(self):
+        """Advance every world one week (end of week, then start of the next)."""
+        self.process_end_of_week()
+        self.process_start_of_week()
+
+    def run(self, weeks):
+        for _ in range(weeks):
+            self.step()
+        return self
+
+    def process_start_of_week(self):
+        n = self.n_worlds
+        rng = self.rng
+        alive = self.alive
+
+        # 1. Regime evolution
+        switch = (rng.random(n) < 0.05) & alive
+        if switch.any():
+            self.regime[switch] = rng.integers(0, len(REGIMES), int(switch.sum()))
+        self.weeks_in_regime += alive
+        self.weeks_in_regime[switch] = 0
+
+        # 2. Alpha decay. Empty and in-research slots carry a zero expected
+        # return, so the multiply only changes live and stored alphas.
+        self.alpha_expected_return *= self._decay_keep
+
+        # 3. Research completion
+        researching = (self.alpha_status == IN_RESEARCH) & alive
+        any_research = researching.any()
+        if any_research:
+            self.alpha_weeks_remaining -= researching
+            slots, cols = np.nonzero(researching & (self.alpha_weeks_remaining <= 0))
+        else:
+            cols = ()
+        if len(cols):
+            k = cols.size
+            success = rng.random(k) < self.alpha_success_prob[slots, cols]
+            breakthrough = success & (rng.random(k) < self.alpha_potential_super[slots, cols])
+            normal = success & ~breakthrough
+            penalty = self.alpha_handicap()[cols]
+            resilience = self.alpha_resilience[slots, cols]
+            u_ret, u_vol = rng.random(k), rng.random(k)
+            base = np.where(breakthrough, 0.18 + 0.17 * u_ret, 0.05 + 0.13 * u_ret) / penalty
+            vol = np.where(breakthrough, 0.08 + 0.10 * u_vol, 0.05 + 0.10 * u_vol)
+            decay = np.where(
+                breakthrough,
+                np.maximum(0.003, 0.01 * (1 - resilience)),
+                np.maximum(0.005, 0.015 * (1 - resilience)),
+            ) * penalty
+            ok_s, ok_c = slots[success], cols[success]
+            self.alpha_base_return[ok_s, ok_c] = base[success]
+            self.alpha_expected_return[ok_s, ok_c] = base[success]
+            self.alpha_volatility[ok_s, ok_c] = vol[success]
+            self.alpha_decay[ok_s, ok_c] = decay[success]
+            self.alpha_status[slots, cols] = np.where(success, STORED, EMPTY)
+            self._decay_keep[ok_s, ok_c] = 1 - decay[success]
+
+            n_super = np.bincount(cols, weights=breakthrough, minlength=n)
+            n_normal = np.bincount(cols, weights=normal, minlength=n)
+            self._gain_xp(150 * n_super + 100 * n_normal)
+            self._bump_team_happiness(6 * n_super + 3 * n_normal, 3 * n_super + n_normal)
+
+        # 4. Infra outages delay research
+        res = self.resilience_score()
+        chance = np.maximum(0.02, 0.18 + np.maximum(0, 60 - self.reputation_infra) * 0.002 - res / 400)
+        outage = (rng.random(n) < chance) & alive
+        if any_research:
+            self.alpha_weeks_remaining += (self.alpha_status == IN_RESEARCH) & outage
+        if (self._infra_count * outage).any():
+            self.infra_happiness -= self._infra_team & outage
+            np.maximum(self.infra_happiness, 0, out=self.infra_happiness)
+
+    def process_end_of_week(self):
+        n = self.n_worlds
+        rng = self.rng
+        alive = self.alive
+        frozen = self._freeze_world_state()
+
+        # Returns: one market draw per world plus one normal per weighted live alpha
+        market_ret = MARKET_MU.take(self.regime) + MARKET_SIGMA.take(self.regime) * rng.standard_normal(n)
+        hedged_market = np.where(self.is_market_shielded(), 0.0, market_ret)
+        cols = self._pos_cols
+        drift = self.alpha_expected_return.ravel().take(self._pos_flat)
+        drift *= np.where(self._pos_trend, TREND_DRIFT.take(self.regime.take(cols)), 1 / 52)
+        ret = rng.standard_normal(cols.size)
+        ret *= self._pos_vol
+        ret += drift
+        ret += hedged_market.take(cols) * self._pos_beta
+        ret *= self._pos_weight
+        weekly_pnl = self.aum * np.bincount(cols, weights=ret, minlength=n)
+        self.weekly_pnl = weekly_pnl
+        self.market_return = market_ret
+
+        self.cash += weekly_pnl
+        self.aum += weekly_pnl
+        self.yearly_pnl += weekly_pnl
+        self._update_drawdowns()
+
+        gain = weekly_pnl > 0
+        self._gain_xp(np.where(gain, np.trunc(weekly_pnl / 10000), 0))
+        choppy = (weekly_pnl < 0) & (weekly_pnl > -50_000)
+        boost = np.where(gain, np.minimum(4, 1 + np.trunc(weekly_pnl / 100000)), choppy * 1.0)
+        self._bump_team_happiness(boost)
+        self.reputation_quants = np.minimum(100, self.reputation_quants + gain)
+        self.reputation_management = np.minimum(100, self.reputation_management + choppy)
+
+        # Compensation
+        payroll = np.where(alive, self._payroll / 52, 0.0)
+        self.cash -= payroll
+        self.aum -= payroll
+        if self.week == 52:
+            q_rate = np.where(self.quant_happiness >= 80, 0.10, np.where(self.quant_happiness >= 50, 0.05, 0.0))
+            i_rate = np.where(self.infra_happiness >= 80, 0.06, np.where(self.infra_happiness >= 50, 0.03, 0.0))
+            bonuses = (np.einsum("ij,ij->j", self.quant_salary * q_rate, self._team_i)
+                       + np.einsum("ij,ij->j", self.infra_salary * i_rate, self._infra_i))
+            bonuses = np.where(self.yearly_pnl > 0, bonuses, 0.0)
+            self.cash -= bonuses
+            self.aum -= bonuses
+
+        # Hiring pipelines
+        joined = False
+        for status, onboarding in ((self.quant_status, self.quant_onboarding),
+                                   (self.infra_status, self.infra_onboarding)):
+            pending = (status == ONBOARDING) & alive
+            if pending.any():
+                onboarding -= pending
+                ready = pending & (onboarding <= 0)
+                if ready.any():
+                    status[ready] = ACTIVE
+                    joined = True
+        if joined:
+            self._refresh_masks()
+
+        self._mentor_quants()
+        self._management_reaction(weekly_pnl)
+
+        self.week += 1
+        if self.week > 52:
+            self.week = 1
+            self.year += 1
+            self.yearly_pnl[:] = 0.0
+        self.startup_grace_weeks -= alive & (self.startup_grace_weeks > 0)
+
+        self._apply_team_morale_effects()
+        self._maybe_team_meeting()
+
+        self._restore_world_state(frozen)
+        still_alive = alive & (self.job_security > 0) & (self.aum >= 10_000_000)
+        if not np.array_equal(still_alive, alive):
+            self._retire_worlds(still_alive)
+
+    def _retire_worlds(self, still_alive):
+        """Drop newly failed worlds from the cached masks and positions without a full rebuild."""
+        self.alive = still_alive
+        self._team &= still_alive
+        self._team_i *= still_alive
+        self._infra_team &= still_alive
+        self._infra_i *= still_alive
+        self._team_count *= still_alive
+        self._infra_count *= still_alive
+        self._payroll *= still_alive
+        keep = still_alive.take(self._pos_cols)
+        for name in ("_pos_cols", "_pos_flat", "_pos_trend", "_pos_weight", "_pos_beta", "_pos_vol"):
+            setattr(self, name, getattr(self, name)[keep])
+
+    def _freeze_world_state(self):
+        if self.alive.all():
+            return None
+        dead = ~self.alive
+        fields = ("cash", "aum", "peak_aum", "current_drawdown", "max_drawdown", "yearly_pnl",
+                  "job_security", "reputation_management", "reputation_quants")
+        return dead, {f: getattr(self, f)[dead] for f in fields}
+
+    def _restore_world_state(self, frozen):
+        if frozen is None:
+            return
+        dead, saved = frozen
+        for field, values in saved.items():
+            getattr(self, field)[dead] = values
+
+    def _update_drawdowns(self):
+        np.maximum(self.peak_aum, self.aum, out=self.peak_aum)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dd = np.where(self.peak_aum > 0, (self.peak_aum - self.aum) / self.peak_aum, 0.0)
+        self.current_drawdown = dd
+        np.maximum(self.max_drawdown, dd, out=self.max_drawdown)
+
+    def _mentor_quants(self):
+        count = self._team_count
+        eligible = (count > 0) & (self._team_happiness_total() >= 60 * count)
+        if not eligible.any():
+            return
+        u = self._random16(self._team.shape)
+        team = self._team & eligible
+        # random.choice([0, 1, 1]) grows skill two times in three; 40% of those also cheer up
+        grows = team & (u < MENTOR_GROW)
+        cheer = team & (u < MENTOR_CHEER)
+        self.quant_skill += grows
+        np.minimum(self.quant_skill, 100, out=self.quant_skill)
+        self.quant_happiness += cheer
+        np.minimum(self.quant_happiness, 100, out=self.quant_happiness)
+
+    def _management_reaction(self, weekly_pnl):
+        dd = self.current_drawdown
+        grace = self.startup_grace_weeks > 0
+        alarm = ~grace & (dd > 0.25)
+        watch = ~grace & ~alarm & (dd > 0.15)
+        big_loss = ~grace & (weekly_pnl < -100_000)
+        rep_hit = (grace & (dd > 0.3)) * 1.0 + alarm * 4.0 + watch * 2.0 + big_loss * 2.0
+        self.reputation_management = np.maximum(0, self.reputation_management - rep_hit)
+        self.job_security -= alarm * 5.0 + big_loss * 3.0
+        self._bump_team_happiness(alarm * -3 + big_loss * -2)
+
+    def _apply_team_morale_effects(self):
+        if not self._team_count.any():
+            return
+        team = self._team
+        h, loy = self.quant_happiness, self.quant_loyalty
+        underpaid = team & (self.quant_skill > self._salary_skill_cap)
+        if underpaid.any():
+            # Dense integer form of min(15, 3 + shortfall // 5000); cheaper than gathering
+            drop = self.quant_skill * np.int32(1_200)
+            drop += self._salary_gap
+            drop //= 5_000
+            drop += 3
+            np.minimum(drop, 15, out=drop)
+            drop *= underpaid
+            drop = drop.astype(STAFF_INT)
+            h -= drop
+            np.maximum(h, 0, out=h)
+            drop //= 2
+            loy -= drop
+            np.maximum(loy, 0, out=loy)
+            bump = team & ~underpaid & (h < 95)
+        else:
+            bump = team & (h < 95)
+        h += bump
+        loy += bump
+        np.minimum(loy, 100, out=loy)
+        low = team & (h < 25)
+        if low.any():
+            loy -= low
+            loy -= low
+            np.maximum(loy, 0, out=loy)
+
+        unhappy = (team & (h < 40)).sum(axis=0)
+        content = self._team_count - unhappy
+        self.reputation_quants = np.clip(self.reputation_quants + 0.2 * content - unhappy, 0, 100)
+
+        count = self._team_count
+        warn = self._team_happiness_total() < 35 * count
+        if not warn.any():
+            return
+        avg = np.nan_to_num(self.avg_team_happiness(), nan=100.0)
+        penalty = np.maximum(5, np.trunc((35 - avg) * 0.8))
+        self.job_security -= np.where(warn, penalty, 0)
+        revolt = warn & (avg < 20) & (self.rng.random(self.n_worlds) < 0.35)
+        self.job_security -= revolt * 20.0
+        self.reputation_management = np.maximum(0, self.reputation_management - revolt * 3.0)
+
+        # Attrition: one random flight risk leaves
+        flight = team & (h < 30)
+        leave = (avg < 30) & (self.rng.random(self.n_worlds) < 0.2) & flight.any(axis=0)
+        if leave.any():
+            cols = np.nonzero(leave)[0]
+            keys = np.where(flight[:, cols], self.rng.random((len(h), cols.size)), -1.0)
+            slots = keys.argmax(axis=0)
+            self.quant_status[slots, cols] = EMPTY
+            self._team[slots, cols] = False
+            self._team_i[slots, cols] = 0
+            self._team_count[cols] -= 1
+            self._payroll[cols] -= self.quant_salary[slots, cols]
+            self._bump_team_happiness(leave * -5, leave * -3)
+            self.reputation_management = np.maximum(0, self.reputation_management - leave * 2.0)
+
+    def _maybe_team_meeting(self):
+        meets = (self._team_count > 0) & (self.rng.random(self.n_worlds) <= 0.25)
+        if not meets.any():
+            return
+        total, count = self._team_happiness_total(), self._team_count
+        harmony = meets & (total >= 70 * count)
+        discord = meets & (total < 45 * count)
+        self._gain_xp(harmony * 60)
+        if discord.any():
+            self.job_security -= discord * 10.0
+            hit = self._team & discord
+            self.quant_loyalty -= hit
+            self.quant_loyalty -= hit
+            np.maximum(self.quant_loyalty, 0, out=self.quant_loyalty)
+            self.reputation_management = np.maximum(0, self.reputation_management - discord * 2.0)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def summary(self):
+        return {
+            "worlds": self.n_worlds,
+            "week": self.week,
+            "year": self.year,
+            "alive": int(self.alive.sum()),
+            "aum_mean": float(self.aum.mean()),
+            "aum_median": float(np.median(self.aum)),
+            "aum_p05": float(np.percentile(self.aum, 5)),
+            "aum_p95": float(np.percentile(self.aum, 95)),
+            "max_drawdown_mean": float(self.max_drawdown.mean()),
+            "job_security_mean": float(self.job_security.mean()),
+        }